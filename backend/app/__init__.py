@@ -13,12 +13,13 @@ sys.path.insert(0, os.path.dirname(backend_dir))
 
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from backend.config import config
+from backend.app.database import RoutingSession, init_engines
+from backend.app.auth.tokens import JWTManager
 
 # Create database and JWT objects
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
 
@@ -41,11 +42,15 @@ def create_app(config_name='development'):
     app.config.from_object(config[config_name])
     
     # Enable CORS (allow frontend to communicate)
-    CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]}})
+    CORS(app, resources={r"/api/*": {
+        "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],
+        "expose_headers": ["ETag", "Last-Modified"]
+    }})
 
     
     # Initialize SQLAlchemy with this app
     db.init_app(app)
+    init_engines(app, db)
     
     # Initialize JWT with this app
     jwt.init_app(app)
@@ -72,13 +77,40 @@ def create_app(config_name='development'):
             'msg': 'The token has expired'
         }, 401
     
-    # Create all database tables in app context
-    with app.app_context():
-        # Import models here (AFTER db is initialized)
-        from backend.app.models import User, Item, Supplier, PurchaseOrder, PurchaseOrderItem
-        
-        # Create all tables if they don't exist
-        db.create_all()
+    # Import models here (AFTER db is initialized)
+    from backend.app.models import User, Item, Supplier, PurchaseOrder, PurchaseOrderItem, ItemEmission, SupplierEmissionBucket
+    
+    # Session hooks that bump table generations on commit
+    import backend.app.generations
+    
+    # Report result cache, cleared by commits to the tables reports read
+    from backend.app.reports.cache import init_report_cache
+    init_report_cache(app)
+    
+    # Request latency / SQL statement metrics and GET /metrics
+    from backend.app.metrics import init_metrics
+    init_metrics(app)
+    
+    # Bounded pool for password hashing (see app/auth/passwords.py)
+    from backend.app.auth.passwords import init_password_hasher
+    init_password_hasher(app)
+    
+    # Thread pool for the read sub-requests of POST /api/batch
+    from backend.app.batch.dispatch import init_batch
+    init_batch(app)
+    
+    # Background job pool (see app/jobs/runner.py)
+    from backend.app.jobs.runner import init_jobs
+    init_jobs(app)
+    
+    # Schema is managed by versioned migrations ('flask db upgrade');
+    # development and testing apply pending ones at startup
+    from backend.app.migrations import db_cli, upgrade
+    app.cli.add_command(db_cli)
+    
+    if app.config['AUTO_MIGRATE']:
+        with app.app_context():
+            upgrade()
     
     # Register blueprints (route groups)
     # Format: app.register_blueprint(blueprint, url_prefix='/api/endpoint')
@@ -97,6 +129,15 @@ def create_app(config_name='development'):
     from backend.app.reports.routes import reports_bp
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
     
+    from backend.app.search.routes import search_bp
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    
+    from backend.app.jobs.routes import jobs_bp
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    
+    from backend.app.batch.routes import batch_bp
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    
     # Health check endpoint (no authentication needed)
     @app.route('/ping', methods=['GET'])
     def ping():
@@ -0,0 +1,89 @@
+"""
+Role-based access decorator
+
+The role travels in the access token's 'role' claim (set at login) and is
+checked against a small in-process TTL cache of each user's current role,
+so a protected request costs no database round trip once the cache is
+warm. Call invalidate_role() after changing a user's role to apply it
+immediately in this process; other workers pick it up within
+ROLE_CACHE_TTL seconds.
+"""
+
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from backend.app import db
+from backend.app.models import User
+
+_role_cache = {}
+_role_cache_lock = threading.Lock()
+
+
+def current_role(user_id):
+    """
+    Current role of a user, served from the TTL cache when possible.
+
+    Returns:
+        str or None if the user no longer exists
+    """
+
+    now = time.monotonic()
+    with _role_cache_lock:
+        cached = _role_cache.get(user_id)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    role = db.session.query(User.role).filter(User.id == user_id).scalar()
+    with _role_cache_lock:
+        _role_cache[user_id] = (role, now + current_app.config['ROLE_CACHE_TTL'])
+    return role
+
+
+def invalidate_role(user_id=None):
+    """Drop one user's cached role, or the whole cache when user_id is None."""
+    with _role_cache_lock:
+        if user_id is None:
+            _role_cache.clear()
+        else:
+            _role_cache.pop(user_id, None)
+
+
+def require_roles(*roles):
+    """
+    Require a valid access token whose user holds one of the given roles.
+
+    Usage:
+        @items_bp.route('', methods=['POST'])
+        @require_roles('admin', 'procurement_manager')
+        def create_item(): ...
+
+    Tokens issued before a role change are rejected with 401 so the
+    client logs in again and picks up the new role.
+    """
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            verify_jwt_in_request()
+            role = current_role(int(get_jwt_identity()))
+
+            if role is None:
+                return jsonify({"error": "User not found"}), 401
+
+            token_role = get_jwt().get('role')
+            if token_role is not None and token_role != role:
+                return jsonify({
+                    "code": "role_changed",
+                    "error": "Role has changed, please log in again"
+                }), 401
+
+            if roles and role not in roles:
+                return jsonify({"error": "Unauthorized"}), 403
+
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
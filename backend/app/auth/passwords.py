@@ -0,0 +1,102 @@
+"""
+Password hashing - a bounded pool for the slow key derivation
+
+scrypt/pbkdf2 take tens of milliseconds of CPU by design. Verification
+runs in a small thread pool (PASSWORD_HASH_WORKERS) with at most
+PASSWORD_HASH_QUEUE more waiting; beyond that verify_password raises
+HashPoolFull and the login answers 429 at once. Waiting logins hold their
+request threads, so the two together must stay below the server's
+threads for a login rush not to take all of them.
+
+New hashes use PASSWORD_HASH_METHOD (a Werkzeug method string such as
+'scrypt:32768:8:1'). needs_rehash() tells whether a stored hash was made
+with other parameters, so the login can upgrade it while it still has the
+plain password.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashPoolFull(Exception):
+    """No free slot for another password check"""
+
+
+class PasswordHasher:
+    """Bounded executor for the password hashing of one app"""
+
+    def __init__(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix='pwhash')
+        self.slots = threading.BoundedSemaphore(self.workers + app.config.get('PASSWORD_HASH_QUEUE', 32))
+        self._prefix = None
+
+    @property
+    def prefix(self):
+        """Method part of a current hash, as Werkzeug writes it (defaults filled in)."""
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._prefix
+
+    def hash(self, password):
+        """Hash a password with the configured method (in the calling thread)."""
+        return generate_password_hash(password, self.method)
+
+    def _submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HashPoolFull()
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def verify(self, pwhash, password):
+        """
+        Check a password against a stored hash in the pool.
+
+        Raises:
+            HashPoolFull: all workers busy and the queue is full
+        """
+        return self._submit(check_password_hash, pwhash, password)
+
+    def rehash(self, password):
+        """hash() in the pool. Raises HashPoolFull like verify()."""
+        return self._submit(self.hash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if the hash was made with another method or other parameters."""
+        return pwhash.split('$', 1)[0] != self.prefix
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def init_password_hasher(app):
+    """Create the app's password hasher and store it in app.extensions."""
+    app.extensions['passwords'] = PasswordHasher(app)
+    return app.extensions['passwords']
+
+
+def get_hasher():
+    """Password hasher of the current app."""
+    return current_app.extensions['passwords']
+
+
+def hash_password(password):
+    return get_hasher().hash(password)
+
+
+def verify_password(pwhash, password):
+    return get_hasher().verify(pwhash, password)
+
+
+def needs_rehash(pwhash):
+    return get_hasher().needs_rehash(pwhash)
@@ -6,10 +6,12 @@ Authentication endpoints
 - GET /api/auth/me - Get current user
 """
 
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import select, update, case, or_
 from backend.app import db
+from backend.app.auth.passwords import HashPoolFull, get_hasher
 from backend.app.models import User
 
 # Create blueprint FIRST
@@ -56,6 +58,9 @@ def login():
     
     POST /api/auth/login
     Body: {"username": "admin", "password": "admin123"}
+    
+    429 with Retry-After after LOGIN_MAX_FAILURES failed attempts for the
+    username (for LOGIN_LOCKOUT_SECONDS) or while the hashing pool is full.
     """
     
     data = request.get_json()
@@ -63,16 +68,69 @@ def login():
     if not data or not data.get('username') or not data.get('password'):
         return jsonify({"error": "Missing username or password"}), 400
     
-    user = User.query.filter_by(username=data.get('username')).first()
+    user = db.session.execute(
+        select(User.id, User.role, User.password_hash)
+        .where(User.username == data.get('username'))
+    ).first()
+    
+    if not user:
+        db.session.rollback()
+        return jsonify({"error": "Invalid credentials"}), 401
+    
+    # Count the attempt as a failure before hashing, in one conditional
+    # UPDATE that refuses locked usernames, so concurrent guesses cannot all
+    # pass the lockout check. A failure older than the lockout counts from 1.
+    now = datetime.utcnow()
+    lockout = timedelta(seconds=current_app.config['LOGIN_LOCKOUT_SECONDS'])
+    expired = or_(User.last_failed_login.is_(None), User.last_failed_login <= now - lockout)
+    reserved = db.session.execute(
+        update(User)
+        .where(User.id == user.id, or_(User.failed_logins < current_app.config['LOGIN_MAX_FAILURES'], expired))
+        .values(failed_logins=case((expired, 1), else_=User.failed_logins + 1), last_failed_login=now)
+    ).rowcount
+    
+    if not reserved:
+        last_failed = db.session.execute(select(User.last_failed_login).where(User.id == user.id)).scalar()
+        db.session.rollback()
+        retry_after = int((last_failed + lockout - now).total_seconds()) + 1
+        return jsonify({"error": "Too many failed logins, try again later"}), 429, {'Retry-After': str(retry_after)}
+    
+    # Hashing takes a while; don't hold the writer connection meanwhile
+    db.session.commit()
     
-    if user and user.check_password(data.get('password')):
-        access_token = create_access_token(identity=str(user.id))
-        return jsonify({
-            "access_token": access_token,
-            "role": user.role
-        }), 200
+    hasher = get_hasher()
+    try:
+        valid = hasher.verify(user.password_hash, data.get('password'))
+    except HashPoolFull:
+        # Not the user's failure: give the attempt back
+        db.session.execute(
+            update(User).where(User.id == user.id, User.failed_logins > 0)
+            .values(failed_logins=User.failed_logins - 1)
+        )
+        db.session.commit()
+        return jsonify({"error": "Too many logins at once, try again shortly"}), 429, {'Retry-After': '1'}
+    
+    if not valid:
+        return jsonify({"error": "Invalid credentials"}), 401
+    
+    values = {'failed_logins': 0, 'last_failed_login': None}
+    if hasher.needs_rehash(user.password_hash):
+        # Stored with older parameters: upgrade it now that we have the password
+        try:
+            values['password_hash'] = hasher.rehash(data.get('password'))
+        except HashPoolFull:
+            pass    # next login
+    db.session.execute(update(User).where(User.id == user.id).values(**values))
+    db.session.commit()
     
-    return jsonify({"error": "Invalid credentials"}), 401
+    access_token = create_access_token(
+        identity=str(user.id),
+        additional_claims={'role': user.role}
+    )
+    return jsonify({
+        "access_token": access_token,
+        "role": user.role
+    }), 200
 
 
 @auth_bp.route('/me', methods=['GET'])
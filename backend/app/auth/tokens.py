@@ -0,0 +1,26 @@
+"""
+JWT manager that reuses a token already decoded for the batch
+
+A batch sub-request carries the batch's Authorization header so the usual
+jwt_required / require_roles checks apply to it, and the batch puts the
+token it already verified, with its claims, in the sub-request's environ
+under BATCH_TOKEN_KEY. Decoding that same token again in the sub-request
+returns those claims instead of checking the signature once more. Any
+other token is decoded as usual.
+"""
+
+from flask import has_request_context, request
+from flask_jwt_extended import JWTManager as BaseJWTManager
+
+# (encoded token, decoded claims) of the batch a sub-request belongs to
+BATCH_TOKEN_KEY = 'green_erp.batch.token'
+
+
+class JWTManager(BaseJWTManager):
+    """flask_jwt_extended's manager, aware of the batch's decoded token"""
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        decoded = request.environ.get(BATCH_TOKEN_KEY) if has_request_context() else None
+        if decoded is not None and decoded[0] == encoded_token:
+            return dict(decoded[1])
+        return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
@@ -0,0 +1,2 @@
+# backend/app/batch/__init__.py
+"""Batch module"""
@@ -0,0 +1,202 @@
+"""
+Batch dispatch - several API requests served inside one HTTP request
+
+Each sub-request of POST /api/batch goes through the app like a normal
+request (routing, auth and role decorators, ETags, error handlers,
+metrics) with the batch's Authorization header, so the client pays for
+one round trip, one CORS check and one connection. The token is decoded
+once, by the batch: its claims go into every sub-request's environ and
+the auth checks there reuse them (see auth/tokens.py).
+
+Sub-requests run in order. A run of consecutive GET/HEAD sub-requests
+cannot depend on each other, so they run at once on a small thread pool
+(BATCH_WORKERS), each in its own app context and read session, since a
+SQLAlchemy session must not be shared between threads. Any other
+method runs on the batch's own thread and app context: writes share the
+batch's database session, and reads listed after a write see it. With
+BATCH_WORKERS = 0 (testing) everything runs on the batch's thread.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from backend.app import db
+from backend.app.auth.tokens import BATCH_TOKEN_KEY
+from backend.app.database import READ_METHODS
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Headers of the batch request every sub-request inherits
+FORWARDED_HEADERS = ('Authorization',)
+
+# Response headers worth passing back to the client
+RESPONSE_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Location', 'Retry-After')
+
+BATCH_ENDPOINT = 'batch.run_batch'
+
+# Set in the environ of every sub-request; run_batch refuses those
+SUB_REQUEST_KEY = 'green_erp.batch'
+
+
+def _endpoint(path, method):
+    """Endpoint a sub-request path resolves to (after percent-decoding), or None."""
+    try:
+        return current_app.create_url_adapter(request).match(unquote(path), method=method)[0]
+    except HTTPException:
+        return None
+
+
+def parse_requests(data, max_requests):
+    """
+    Validate a batch body: {"requests": [{"id", "method", "url", "headers", "body"}, ...]}
+
+    Returns:
+        list of dicts with every key filled in
+
+    Raises:
+        ValueError: describing the first problem found
+    """
+
+    entries = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("Body must be {\"requests\": [...]} with at least one request")
+    if len(entries) > max_requests:
+        raise ValueError(f"At most {max_requests} requests per batch")
+
+    parsed = []
+    for n, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Request {n} must be an object")
+
+        method = str(entry.get('method', 'GET')).upper()
+        url = entry.get('url')
+        headers = entry.get('headers') or {}
+
+        if method not in METHODS:
+            raise ValueError(f"Request {n}: method must be one of {', '.join(METHODS)}")
+        if not isinstance(url, str) or not url.startswith('/'):
+            raise ValueError(f"Request {n}: url must be a path starting with /")
+        if _endpoint(url.split('?', 1)[0], method) == BATCH_ENDPOINT:
+            raise ValueError(f"Request {n}: batches cannot be nested")
+        if not isinstance(headers, dict):
+            raise ValueError(f"Request {n}: headers must be an object")
+
+        parsed.append({
+            'id': entry.get('id', n),
+            'method': method,
+            'url': url,
+            'headers': {k: str(v) for k, v in headers.items() if k.title() not in FORWARDED_HEADERS},
+            'body': entry.get('body')
+        })
+    return parsed
+
+
+class BatchDispatcher:
+    """Thread pool for the read sub-requests of one app"""
+
+    def __init__(self, app):
+        self.app = app
+        self.workers = app.config.get('BATCH_WORKERS', 4)
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix='batch') if self.workers else None
+
+    def environ(self, sub, token=None):
+        """WSGI environ of a sub-request, built from the current (batch) request."""
+        headers = dict(sub['headers'])
+        for name in FORWARDED_HEADERS:
+            if name in request.headers:
+                headers[name] = request.headers[name]
+
+        body = sub['body']
+        builder = EnvironBuilder(
+            path=sub['url'],
+            base_url=request.host_url,
+            method=sub['method'],
+            headers=headers,
+            json=body if body is not None and not isinstance(body, str) else None,
+            data=body if isinstance(body, str) else None,
+            environ_base={'REMOTE_ADDR': request.remote_addr, SUB_REQUEST_KEY: True, BATCH_TOKEN_KEY: token}
+        )
+        try:
+            return builder.get_environ()
+        finally:
+            builder.close()
+
+    def dispatch(self, environ):
+        """Serve one sub-request; returns {'status', 'headers', 'body'}."""
+        app = self.app
+        with app.request_context(environ):
+            try:
+                response = app.full_dispatch_request()
+            except Exception:
+                logger.exception("Batch sub-request %s %s failed", request.method, request.full_path)
+                db.session.rollback()
+                response = app.make_response((jsonify({"error": "Internal server error"}), 500))
+
+            try:
+                if response.status_code == 304 or request.method == 'HEAD':
+                    body = None
+                elif response.is_json:
+                    body = response.get_json()
+                else:
+                    body = response.get_data(as_text=True)
+            finally:
+                response.close()
+
+        return {
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RESPONSE_HEADERS if name in response.headers},
+            'body': body
+        }
+
+    def run(self, subrequests):
+        """
+        Dispatch parsed sub-requests; consecutive reads run concurrently.
+
+        Returns:
+            list of {'id', 'status', 'headers', 'body'} in request order
+        """
+
+        # The batch's jwt_required has verified the token; pass it on decoded
+        encoded = request.headers.get('Authorization', '').rpartition(' ')[2]
+        token = (encoded, get_jwt()) if encoded else None
+        environs = [self.environ(sub, token) for sub in subrequests]
+        results = [None] * len(subrequests)
+
+        start = 0
+        while start < len(subrequests):
+            end = start + 1
+            if subrequests[start]['method'] in READ_METHODS:
+                while end < len(subrequests) and subrequests[end]['method'] in READ_METHODS:
+                    end += 1
+
+            if self.executor is not None and end - start > 1:
+                futures = [self.executor.submit(self.dispatch, environs[n]) for n in range(start, end)]
+                for n, future in zip(range(start, end), futures):
+                    results[n] = future.result()
+            else:
+                for n in range(start, end):
+                    results[n] = self.dispatch(environs[n])
+            start = end
+
+        return [{'id': sub['id'], **result} for sub, result in zip(subrequests, results)]
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+def init_batch(app):
+    """Create the app's batch dispatcher and store it in app.extensions."""
+    app.extensions['batch'] = BatchDispatcher(app)
+    return app.extensions['batch']
+
+
+def get_dispatcher():
+    """Batch dispatcher of the current app."""
+    return current_app.extensions['batch']
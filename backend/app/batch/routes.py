@@ -0,0 +1,31 @@
+# backend/app/batch/routes.py
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from backend.app.batch.dispatch import parse_requests, get_dispatcher, SUB_REQUEST_KEY
+
+batch_bp = Blueprint('batch', __name__)
+
+
+@batch_bp.route('', methods=['POST'])
+@jwt_required()
+def run_batch():
+    """
+    POST /api/batch - Several API requests in one round trip
+    Body: {"requests": [{"id": "items", "method": "GET", "url": "/api/items?limit=50",
+                         "headers": {"If-None-Match": "..."}, "body": {...}}, ...]}
+
+    Every sub-request runs with the caller's token and its own role checks.
+    Returns 200 with {"responses": [{"id", "status", "headers", "body"}, ...]}
+    in request order; each sub-request has its own status.
+    """
+    # parse_requests turns away batch urls; this catches any that resolve
+    # to the batch endpoint some other way
+    if request.environ.get(SUB_REQUEST_KEY):
+        return jsonify({"error": "Batches cannot be nested"}), 400
+
+    try:
+        subrequests = parse_requests(request.get_json(silent=True), current_app.config['BATCH_MAX_REQUESTS'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"responses": get_dispatcher().run(subrequests)}), 200
@@ -0,0 +1,80 @@
+"""
+SQLite engine profile - connection pragmas and read/write routing
+
+SQLITE_PRAGMAS from the config are applied to every new connection.
+When a 'read' bind is configured (see ProductionConfig), GET/HEAD
+requests run their queries on that read-only pool, while flushes and all
+other requests use the default (writer) engine.
+"""
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_BIND = 'read'
+
+READ_METHODS = ('GET', 'HEAD')
+
+# Pragmas that only make sense on the connection that writes
+WRITER_ONLY_PRAGMAS = ('journal_mode',)
+
+
+class RoutingSession(Session):
+    """Session that sends read-only request traffic to the 'read' bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and READ_BIND in self._db.engines
+            and has_request_context()
+            and request.method in READ_METHODS
+        ):
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_engine(db):
+    """Engine for read-only work outside the ORM (exports, reports)."""
+    return db.engines.get(READ_BIND, db.engine)
+
+
+def install_pragmas(engine, pragmas, read_only=False):
+    """
+    Run PRAGMA statements on every new DBAPI connection of an engine.
+
+    Args:
+        engine: SQLite engine
+        pragmas (dict): pragma name -> value, e.g. {'synchronous': 'NORMAL'}
+        read_only (bool): skip writer-only pragmas and set query_only
+    """
+
+    statements = [
+        f"PRAGMA {name}={value}"
+        for name, value in pragmas.items()
+        if not (read_only and name in WRITER_ONLY_PRAGMAS)
+    ]
+    if read_only:
+        statements.append("PRAGMA query_only=1")
+
+    if not statements:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def init_engines(app, db):
+    """Apply the configured pragmas to every SQLite engine of the app."""
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite':
+                install_pragmas(engine, pragmas, read_only=bind_key == READ_BIND)
@@ -0,0 +1,80 @@
+"""
+Streaming exports - CSV / NDJSON responses fed by a server-side cursor
+
+Rows are fetched in batches of EXPORT_BATCH_SIZE and written out as they
+arrive, so memory stays flat no matter how many rows are exported.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, date
+from flask import Response, stream_with_context
+from backend.app import db
+from backend.app.database import read_engine
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_export(stmt, fmt, filename):
+    """
+    Stream the rows of a Core select as a file download.
+
+    Args:
+        stmt: SQLAlchemy select; its column labels become the CSV header
+            and NDJSON keys
+        fmt (str): 'csv' or 'ndjson'
+        filename (str): download name without extension
+
+    Returns:
+        Flask Response
+    """
+
+    columns = [c.key for c in stmt.selected_columns]
+
+    def generate():
+        with read_engine(db).connect() as conn:
+            result = conn.execution_options(
+                stream_results=True,
+                yield_per=EXPORT_BATCH_SIZE
+            ).execute(stmt)
+
+            if fmt == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                for rows in result.partitions():
+                    writer.writerows([_csv_value(v) for v in row] for row in rows)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                yield buffer.getvalue()
+            else:
+                for rows in result.partitions():
+                    yield ''.join(
+                        json.dumps(dict(zip(columns, row)), default=_json_default) + '\n'
+                        for row in rows
+                    )
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{fmt}'}
+    )
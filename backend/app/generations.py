@@ -0,0 +1,151 @@
+"""
+Table generation counters and conditional GET
+
+Every commit bumps table_generations.generation for the tables it wrote
+(ORM flushes and DML run through the session are both tracked). GET
+endpoints decorated with @conditional(...) derive their ETag from those
+counters and answer If-None-Match / If-Modified-Since with 304 after a
+single primary-key read, without loading any ORM objects.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request, make_response
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from backend.app import db
+from backend.app.database import RoutingSession
+from backend.app.models import TableGeneration
+
+GENERATION_TABLE = TableGeneration.__tablename__
+
+_CHANGED_KEY = 'changed_tables'
+
+# Tables bumped by the commit in progress, for after_commit listeners
+COMMITTED_KEY = 'committed_tables'
+
+
+def mark_changed(session, *tables):
+    """Record tables written in the session's current transaction."""
+    session.info.setdefault(_CHANGED_KEY, set()).update(
+        t for t in tables if t != GENERATION_TABLE
+    )
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _track_flush(session, flush_context):
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, '__table__') and (obj not in session.dirty or session.is_modified(obj))
+    }
+    mark_changed(session, *tables)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _track_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            mark_changed(orm_execute_state.session, table.name)
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _bump_generations(session):
+    session.flush()
+    tables = session.info.pop(_CHANGED_KEY, None)
+    if not tables:
+        return
+    session.info[COMMITTED_KEY] = frozenset(tables)
+
+    now = datetime.utcnow()
+    stmt = sqlite_insert(TableGeneration)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TableGeneration.table_name],
+        set_={
+            'generation': TableGeneration.generation + 1,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    session.execute(stmt, [
+        {'table_name': table, 'generation': 1, 'updated_at': now}
+        for table in sorted(tables)
+    ])
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_changes(session):
+    session.info.pop(_CHANGED_KEY, None)
+    session.info.pop(COMMITTED_KEY, None)
+
+
+def current_generations(tables):
+    """
+    Read the counters of some tables.
+
+    Returns:
+        (list of generations in the given order, latest updated_at or None)
+    """
+
+    rows = dict(
+        (name, (generation, updated_at))
+        for name, generation, updated_at in db.session.execute(
+            select(TableGeneration.table_name, TableGeneration.generation, TableGeneration.updated_at)
+            .where(TableGeneration.table_name.in_(tables))
+        )
+    )
+    generations = [rows.get(table, (0, None))[0] for table in tables]
+    stamps = [row[1] for row in rows.values() if row[1] is not None]
+    return generations, max(stamps) if stamps else None
+
+
+def conditional(*tables):
+    """
+    Make a GET endpoint answer conditional requests from table generations.
+
+    The ETag covers the request path and query string plus the
+    generations of the given tables, so it changes whenever one of them
+    is written. Put it below the auth decorator so 304s still require a
+    valid token.
+
+    Usage:
+        @items_bp.route('', methods=['GET'])
+        @jwt_required()
+        @conditional('items')
+        def get_items(): ...
+    """
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            generations, last_modified = current_generations(tables)
+            key = f"{request.full_path}|{','.join(map(str, generations))}"
+            etag = hashlib.sha1(key.encode()).hexdigest()[:24]
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (
+                    last_modified is not None
+                    and request.if_modified_since is not None
+                    and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+                )
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(current_app.ensure_sync(fn)(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            return response
+
+        return decorator
+
+    return wrapper
@@ -0,0 +1,174 @@
+"""
+Item catalogue import - streaming CSV upsert keyed on SKU
+
+The file is read row by row and written in chunks with SQLite's
+INSERT ... ON CONFLICT(sku) DO UPDATE, so a 50k row catalogue costs a
+few dozen statements instead of one API call per item. Stock values are
+booked as 'import' movements in the inventory ledger.
+
+Expected header (only sku and name are required):
+    sku,name,category,unit,stock,reorder_level,co2_per_unit,is_active
+
+Missing columns and blank cells leave an existing item's value as it is;
+new items get INSERT_DEFAULTS for them.
+"""
+
+import csv
+from itertools import groupby
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from backend.app import db
+from backend.app.models import Item
+from backend.app.items import inventory
+
+IMPORT_CHUNK_SIZE = 1000
+
+# Rejected rows listed in the summary (the count is always complete)
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_COLUMNS = {
+    'name': str,
+    'category': str,
+    'unit': str,
+    'stock': int,
+    'reorder_level': int,
+    'co2_per_unit': float,
+    'is_active': bool
+}
+
+# Values used for missing columns and blank cells when inserting
+INSERT_DEFAULTS = {
+    'category': '',
+    'unit': '',
+    'stock': 0,
+    'reorder_level': 10,
+    'co2_per_unit': 0.0,
+    'is_active': True
+}
+
+
+def _parse_bool(value):
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'y'):
+        return True
+    if value in ('0', 'false', 'no', 'n'):
+        return False
+    raise ValueError(f"invalid boolean '{value}'")
+
+
+def _parse_row(row, columns):
+    """
+    Convert one CSV row into column values, raising ValueError if invalid.
+
+    Blank cells are left out of the result.
+    """
+    sku = (row.get('sku') or '').strip()
+    if not sku:
+        raise ValueError("sku is required")
+
+    values = {'sku': sku}
+    for column in columns:
+        raw = (row.get(column) or '').strip()
+        kind = IMPORT_COLUMNS[column]
+
+        if column == 'name' and not raw:
+            raise ValueError("name is required")
+        if not raw:
+            continue
+
+        try:
+            if kind is bool:
+                values[column] = _parse_bool(raw)
+            else:
+                values[column] = kind(raw)
+        except ValueError:
+            raise ValueError(f"invalid {column} '{raw}'")
+
+    return values
+
+
+def _upsert_chunk(rows, columns, summary):
+    """Upsert one chunk of parsed rows and update the counters."""
+    skus = [row['sku'] for row in rows]
+    existing = dict(db.session.execute(
+        select(Item.sku, Item.stock).where(Item.sku.in_(skus))
+    ).all())
+
+    seen = set(existing)
+    for row in rows:
+        if row['sku'] in seen:
+            summary['updated'] += 1
+        else:
+            summary['inserted'] += 1
+            seen.add(row['sku'])
+
+    # Stock is never written directly: new rows start at 0 and the file's
+    # values are booked below as ledger movements. Existing rows only get
+    # the columns a row fills in, so consecutive rows filling the same
+    # columns share one statement (usually the whole chunk).
+    for filled, group in groupby(rows, key=lambda row: frozenset(row)):
+        stmt = sqlite_insert(Item)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Item.sku],
+            set_={column: stmt.excluded[column] for column in columns if column in filled and column != 'stock'}
+        )
+        db.session.execute(stmt, [{**INSERT_DEFAULTS, **row, 'stock': 0} for row in group])
+
+    wanted = {row['sku']: row['stock'] for row in rows if 'stock' in row}
+    if wanted:
+        ids = dict(db.session.execute(
+            select(Item.sku, Item.id).where(Item.sku.in_(list(wanted)))
+        ).all())
+        inventory.record_movements(
+            ((ids[sku], stock - existing.get(sku, 0)) for sku, stock in wanted.items()),
+            'import'
+        )
+
+
+def import_items(stream, on_chunk=None):
+    """
+    Import items from a CSV text stream.
+
+    Args:
+        stream: text file object positioned at the header row
+        on_chunk: optional callback(summary) after each written chunk
+
+    Returns:
+        dict: {'inserted', 'updated', 'rejected', 'errors': [{'line', 'error'}]}
+
+    Raises:
+        ValueError: if the header lacks sku or name
+    """
+
+    reader = csv.DictReader(stream)
+    header = [name.strip() for name in reader.fieldnames or []]
+    reader.fieldnames = header
+
+    if 'sku' not in header or 'name' not in header:
+        raise ValueError("CSV header must include sku and name")
+
+    columns = [column for column in IMPORT_COLUMNS if column in header]
+    summary = {'inserted': 0, 'updated': 0, 'rejected': 0, 'errors': []}
+    chunk = []
+
+    for row in reader:
+        try:
+            chunk.append(_parse_row(row, columns))
+        except ValueError as e:
+            summary['rejected'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'line': reader.line_num, 'error': str(e)})
+            continue
+
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            _upsert_chunk(chunk, columns, summary)
+            chunk = []
+            if on_chunk:
+                on_chunk(summary)
+
+    if chunk:
+        _upsert_chunk(chunk, columns, summary)
+
+    db.session.commit()
+
+    return summary
@@ -0,0 +1,243 @@
+"""
+Inventory ledger - every stock change is an inventory_movements row
+
+Item.stock is a cached projection: each writer appends movements and adds
+the same quantities to items.stock in one transaction, and
+'flask items rebuild-stock' recomputes it from the ledger.
+
+Stock at a past moment is the latest stock_snapshots row before it plus
+the movements since, so point-in-time queries read a short delta instead
+of the whole history. 'flask items snapshot-stock' (run daily) adds the
+snapshots.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time
+from sqlalchemy import select, insert, update, delete, func, or_, literal, bindparam, DateTime
+from sqlalchemy.orm import aliased
+from backend.app import db
+from backend.app.models import Item, InventoryMovement, PurchaseOrderItem, StockSnapshot
+
+_items = Item.__table__
+
+
+def record_movements(movements, reason, purchase_order_id=None, user_id=None, apply=True):
+    """
+    Append movements to the ledger and add them to items.stock.
+
+    Args:
+        movements: iterable of (item_id, quantity); quantities are summed
+            per item and zero totals are skipped
+        reason (str): one of InventoryMovement.REASONS
+        apply (bool): False when the caller already wrote items.stock
+            (e.g. the opening stock of a new item)
+
+    Returns:
+        int: number of movement rows written
+    """
+
+    if reason not in InventoryMovement.REASONS:
+        raise ValueError(f"Unknown movement reason: {reason}")
+
+    totals = defaultdict(int)
+    for item_id, quantity in movements:
+        totals[item_id] += quantity
+    totals = {item_id: quantity for item_id, quantity in totals.items() if quantity}
+    if not totals:
+        return 0
+
+    now = datetime.utcnow()
+    db.session.execute(insert(InventoryMovement), [
+        {
+            'item_id': item_id,
+            'quantity': quantity,
+            'reason': reason,
+            'purchase_order_id': purchase_order_id,
+            'user_id': user_id,
+            'created_at': now
+        }
+        for item_id, quantity in totals.items()
+    ])
+
+    if apply:
+        # stock = stock + ? keeps concurrent writers from losing updates
+        db.session.execute(
+            update(_items)
+            .where(_items.c.id == bindparam('b_item_id'))
+            .values(stock=_items.c.stock + bindparam('b_quantity')),
+            [{'b_item_id': item_id, 'b_quantity': quantity} for item_id, quantity in totals.items()]
+        )
+
+    return len(totals)
+
+
+def set_stock(item_id, stock, reason='adjustment', user_id=None):
+    """
+    Book the difference to a counted stock value and set items.stock to it.
+
+    The difference is computed in SQL from the stored stock, so a change
+    committed since the caller loaded the item is neither lost nor counted
+    twice; the INSERT holds the write lock until the caller commits.
+
+    Returns:
+        int: number of movement rows written (0 when the stock is unchanged)
+    """
+
+    if reason not in InventoryMovement.REASONS:
+        raise ValueError(f"Unknown movement reason: {reason}")
+
+    difference = select(
+        _items.c.id,
+        literal(stock) - _items.c.stock,
+        literal(reason),
+        literal(user_id),
+        literal(datetime.utcnow(), DateTime)
+    ).where(_items.c.id == item_id, _items.c.stock != stock)
+
+    moved = db.session.execute(
+        insert(InventoryMovement).from_select(
+            ['item_id', 'quantity', 'reason', 'user_id', 'created_at'], difference
+        )
+    ).rowcount
+    if moved:
+        db.session.execute(update(_items).where(_items.c.id == item_id).values(stock=stock))
+    return moved
+
+
+def receive_order(order_id, user_id=None):
+    """
+    Book an order's lines into stock as 'receipt' movements.
+
+    Both statements are set-based: the ledger rows come from an
+    INSERT ... SELECT over the order lines and the stock is raised by one
+    UPDATE, without loading the items.
+    """
+
+    lines = select(
+        PurchaseOrderItem.item_id,
+        func.sum(PurchaseOrderItem.quantity),
+        literal('receipt'),
+        literal(order_id),
+        literal(user_id),
+        literal(datetime.utcnow(), DateTime)
+    ).where(
+        PurchaseOrderItem.purchase_order_id == order_id
+    ).group_by(PurchaseOrderItem.item_id)
+
+    db.session.execute(
+        insert(InventoryMovement).from_select(
+            ['item_id', 'quantity', 'reason', 'purchase_order_id', 'user_id', 'created_at'], lines
+        )
+    )
+
+    line_quantity = select(func.sum(PurchaseOrderItem.quantity)).where(
+        PurchaseOrderItem.purchase_order_id == order_id,
+        PurchaseOrderItem.item_id == Item.id
+    ).scalar_subquery()
+
+    db.session.execute(
+        update(Item)
+        .where(Item.id.in_(
+            select(PurchaseOrderItem.item_id).where(PurchaseOrderItem.purchase_order_id == order_id)
+        ))
+        .values(stock=Item.stock + line_quantity),
+        execution_options={'synchronize_session': False}
+    )
+
+
+def _latest_snapshot(at):
+    """Correlated subquery: as_of of the item's latest snapshot at or before `at`."""
+    # A fresh alias per use keeps the nested lookups (and INSERT INTO
+    # stock_snapshots ... SELECT) from correlating to each other
+    snapshot = aliased(StockSnapshot)
+    return select(snapshot.as_of).where(
+        snapshot.item_id == Item.id, snapshot.as_of <= at
+    ).order_by(snapshot.as_of.desc()).limit(1).correlate(Item).scalar_subquery()
+
+
+def stock_expression(at):
+    """
+    Correlated SQL expression for an item's stock before `at`.
+
+    Latest snapshot with as_of <= at, plus the movements from that
+    snapshot up to (excluding) `at`.
+    """
+
+    snapshot = aliased(StockSnapshot)
+    snapshot_stock = select(snapshot.stock).where(
+        snapshot.item_id == Item.id, snapshot.as_of == _latest_snapshot(at)
+    ).correlate(Item).scalar_subquery()
+
+    latest = _latest_snapshot(at)
+    delta = select(func.sum(InventoryMovement.quantity)).where(
+        InventoryMovement.item_id == Item.id,
+        InventoryMovement.created_at < at,
+        or_(latest.is_(None), InventoryMovement.created_at >= latest)
+    ).correlate(Item).scalar_subquery()
+
+    return func.coalesce(snapshot_stock, 0) + func.coalesce(delta, 0)
+
+
+def stock_as_of(at, criteria=()):
+    """
+    Select item stock before a moment.
+
+    Returns:
+        select of (item_id, sku, name, co2_per_unit, stock)
+    """
+
+    return select(
+        Item.id.label('item_id'),
+        Item.sku,
+        Item.name,
+        Item.co2_per_unit,
+        stock_expression(at).label('stock')
+    ).where(*criteria).order_by(Item.id)
+
+
+def take_snapshot(as_of=None):
+    """
+    Store every item's stock before `as_of` (default: today 00:00 UTC).
+
+    Builds on the previous snapshot, so each run only sums the movements
+    since then. Re-running for the same as_of replaces the rows.
+
+    Returns:
+        datetime: the as_of used
+    """
+
+    as_of = as_of or datetime.combine(datetime.utcnow().date(), time.min)
+    db.session.execute(
+        insert(StockSnapshot).prefix_with('OR REPLACE').from_select(
+            ['item_id', 'as_of', 'stock'],
+            select(Item.id, literal(as_of, DateTime), stock_expression(as_of))
+        )
+    )
+    db.session.commit()
+    return as_of
+
+
+def rebuild_stock():
+    """
+    Recompute items.stock from the ledger.
+
+    Returns:
+        int: number of items whose stock was corrected
+    """
+
+    ledger = select(func.coalesce(func.sum(InventoryMovement.quantity), 0)).where(
+        InventoryMovement.item_id == Item.id
+    ).scalar_subquery()
+
+    result = db.session.execute(
+        update(Item).where(Item.stock != ledger).values(stock=ledger),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def remove_item(item_id):
+    """Drop the ledger and snapshots of an item about to be deleted."""
+    db.session.execute(delete(InventoryMovement).where(InventoryMovement.item_id == item_id))
+    db.session.execute(delete(StockSnapshot).where(StockSnapshot.item_id == item_id))
@@ -1,92 +1,290 @@
 # backend/app/items/routes.py
+import io
+import os
+import shutil
+import tempfile
+import click
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend.app.auth.decorators import require_roles
+from backend.app.generations import conditional
 from backend.app import db
-from backend.app.models import User, Item
+from backend.app.models import Item, InventoryMovement
+from backend.app.reports import rollups
+from backend.app.pagination import paginate, parse_bool, parse_date, date_range_criteria
+from backend.app.items.importer import import_items
+from backend.app.items import inventory
+from backend.app.jobs.runner import job_handler, accepted
 
 items_bp = Blueprint('items', __name__)
 
+ITEM_SORTS = {
+    'id': Item.id,
+    'name': Item.name,
+    'sku': Item.sku,
+    'stock': Item.stock,
+    'co2_per_unit': Item.co2_per_unit,
+    'created_at': Item.created_at
+}
+
+MOVEMENT_SORTS = {
+    'id': InventoryMovement.id,
+    'created_at': InventoryMovement.created_at
+}
+
 @items_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional('items')
 def get_items():
-    """GET /api/items - List all items"""
-    items = Item.query.all()
-    return jsonify([item.to_dict() for item in items]), 200
+    """
+    GET /api/items - List items
+    Query: ?category=&is_active=true|false&limit=&cursor=&sort=&order=&fields=
+    """
+    try:
+        query = Item.query
+        
+        if request.args.get('category'):
+            query = query.filter(Item.category == request.args['category'])
+        
+        is_active = parse_bool(request.args.get('is_active'))
+        if is_active is not None:
+            query = query.filter(Item.is_active == is_active)
+        
+        return jsonify(paginate(query, Item, ITEM_SORTS)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-@items_bp.route('', methods=['POST'])
+@items_bp.route('/low-stock', methods=['GET'])
 @jwt_required()
+@conditional('items')
+def get_low_stock_items():
+    """
+    GET /api/items/low-stock - Active items at or below their reorder level
+    Query: ?category=&limit=&cursor=&sort=&order=&fields=
+    """
+    try:
+        query = Item.query.filter(*Item.low_stock_criteria())
+        
+        if request.args.get('category'):
+            query = query.filter(Item.category == request.args['category'])
+        
+        return jsonify(paginate(query, Item, ITEM_SORTS)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@items_bp.route('', methods=['POST'])
+@require_roles('admin', 'procurement_manager')
 def create_item():
     """POST /api/items - Create new item"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role not in ['admin', 'procurement_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
-    
     data = request.get_json()
     
     if not data.get('name') or not data.get('sku'):
         return jsonify({"error": "Name and SKU required"}), 400
     
+    stock = data.get('stock', 0)
+    if isinstance(stock, bool) or not isinstance(stock, int):
+        return jsonify({"error": "Integer stock required"}), 400
+    
     item = Item(
         name=data.get('name'),
         sku=data.get('sku'),
         category=data.get('category', ''),
         unit=data.get('unit', ''),
-        stock=data.get('stock', 0),
+        stock=stock,
         reorder_level=data.get('reorder_level', 10),
         co2_per_unit=data.get('co2_per_unit', 0.0),
         is_active=data.get('is_active', True)
     )
     
     db.session.add(item)
+    db.session.flush()
+    # Opening stock is the first ledger entry (items.stock is already set)
+    inventory.record_movements([(item.id, item.stock)], 'initial',
+                               user_id=int(get_jwt_identity()), apply=False)
+    db.session.commit()
+    
+    return jsonify(item.to_dict()), 201
+
+@items_bp.route('/import', methods=['POST'])
+@require_roles('admin', 'procurement_manager')
+def import_items_csv():
+    """
+    POST /api/items/import - Upsert items from a CSV file, matched on SKU
+    Body: multipart form with a 'file' field, or a raw text/csv body
+    Query: ?async=true to run as a background job (202 + job, poll /api/jobs/<id>)
+    """
+    if 'file' in request.files:
+        raw = request.files['file'].stream
+    elif request.mimetype == 'text/csv':
+        raw = request.stream
+    else:
+        return jsonify({"error": "CSV file required"}), 400
+    
+    if parse_bool(request.args.get('async')):
+        fd, path = tempfile.mkstemp(prefix='items-import-', suffix='.csv')
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(raw, f)
+        response = accepted('items.import', {'path': path}, int(get_jwt_identity()))
+        if response[1] != 202:
+            # Not queued, so no handler will remove it
+            os.remove(path)
+        return response
+    
+    try:
+        summary = import_items(io.TextIOWrapper(raw, encoding='utf-8-sig', newline=''))
+    except (ValueError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(summary), 200
+
+@job_handler('items.import')
+def import_items_job(ctx, path):
+    """Background CSV import of a file saved by import_items_csv."""
+    try:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            total = max(sum(1 for _ in f) - 1, 1)
+            f.seek(0)
+            return import_items(f, on_chunk=lambda summary: ctx.progress(
+                (summary['inserted'] + summary['updated'] + summary['rejected']) / total
+            ))
+    finally:
+        os.remove(path)
+
+@items_bp.cli.command('import-csv')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_items_command(path):
+    """Upsert items from a CSV catalogue file, matched on SKU."""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        summary = import_items(f)
+    click.echo(
+        f"Inserted {summary['inserted']}, updated {summary['updated']}, "
+        f"rejected {summary['rejected']}"
+    )
+    for error in summary['errors']:
+        click.echo(f"  line {error['line']}: {error['error']}")
+
+@items_bp.cli.command('snapshot-stock')
+@click.option('--as-of', default=None, help='YYYY-MM-DD; defaults to today 00:00 UTC.')
+def snapshot_stock_command(as_of):
+    """Snapshot every item's stock from the inventory ledger."""
+    taken = inventory.take_snapshot(parse_date(as_of))
+    click.echo(f"Stock snapshot taken as of {taken.isoformat(' ')}")
+
+@items_bp.cli.command('rebuild-stock')
+def rebuild_stock_command():
+    """Recompute items.stock from the inventory ledger."""
+    corrected = inventory.rebuild_stock()
+    click.echo(f"Corrected stock of {corrected} items")
+
+@items_bp.route('/stock', methods=['GET'])
+@jwt_required()
+@conditional('items', 'inventory_movements', 'stock_snapshots')
+def get_stock_as_of():
+    """
+    GET /api/items/stock?as_of=YYYY-MM-DD[THH:MM:SS]&category=
+    Stock of every item at the end of a day (or before a moment), read
+    from the inventory ledger, with stock_co2 = stock x co2_per_unit.
+    """
+    try:
+        at = parse_date(request.args.get('as_of'), end=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if at is None:
+        return jsonify({"error": "as_of is required"}), 400
+    
+    criteria = []
+    if request.args.get('category'):
+        criteria.append(Item.category == request.args['category'])
+    
+    rows = db.session.execute(inventory.stock_as_of(at, criteria)).mappings()
+    return jsonify([
+        {**row, 'stock_co2': row['stock'] * row['co2_per_unit']}
+        for row in rows
+    ]), 200
+
+@items_bp.route('/<int:item_id>/movements', methods=['GET'])
+@jwt_required()
+@conditional('inventory_movements')
+def get_item_movements(item_id):
+    """
+    GET /api/items/<id>/movements - Inventory ledger of an item
+    Query: ?from=&to=&limit=&cursor=&sort=&order=
+    """
+    try:
+        query = InventoryMovement.query.filter(
+            InventoryMovement.item_id == item_id,
+            *date_range_criteria(InventoryMovement.created_at, request.args)
+        )
+        return jsonify(paginate(query, InventoryMovement, MOVEMENT_SORTS)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@items_bp.route('/<int:item_id>/movements', methods=['POST'])
+@require_roles('admin', 'procurement_manager')
+def create_item_movement(item_id):
+    """
+    POST /api/items/<id>/movements - Book a stock change
+    Body: {"quantity": -5, "reason": "consumption" | "adjustment"}
+    """
+    item = Item.query.get_or_404(item_id)
+    data = request.get_json()
+    
+    try:
+        quantity = int(data.get('quantity'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Integer quantity required"}), 400
+    reason = data.get('reason', 'adjustment')
+    if reason not in ('adjustment', 'consumption') or quantity == 0:
+        return jsonify({"error": "reason must be adjustment or consumption, quantity non-zero"}), 400
+    
+    inventory.record_movements([(item.id, quantity)], reason, user_id=int(get_jwt_identity()))
     db.session.commit()
     
     return jsonify(item.to_dict()), 201
 
 @items_bp.route('/<int:item_id>', methods=['GET'])
 @jwt_required()
+@conditional('items')
 def get_item(item_id):
     """GET /api/items/<id> - Get single item"""
     item = Item.query.get_or_404(item_id)
     return jsonify(item.to_dict()), 200
 
 @items_bp.route('/<int:item_id>', methods=['PUT'])
-@jwt_required()
+@require_roles('admin', 'procurement_manager')
 def update_item(item_id):
     """PUT /api/items/<id> - Update item"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role not in ['admin', 'procurement_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
-    
     item = Item.query.get_or_404(item_id)
     data = request.get_json()
     
+    stock = data.get('stock')
+    if stock is not None and (isinstance(stock, bool) or not isinstance(stock, int)):
+        return jsonify({"error": "Integer stock required"}), 400
+    
     item.name = data.get('name', item.name)
     item.category = data.get('category', item.category)
     item.unit = data.get('unit', item.unit)
-    item.stock = data.get('stock', item.stock)
     item.reorder_level = data.get('reorder_level', item.reorder_level)
     item.co2_per_unit = data.get('co2_per_unit', item.co2_per_unit)
     item.is_active = data.get('is_active', item.is_active)
     
+    # A new stock value is booked as an adjustment of the difference to
+    # the stored stock (not item.stock, which may be stale by now)
+    if stock is not None:
+        inventory.set_stock(item.id, stock, user_id=int(get_jwt_identity()))
+    
     db.session.commit()
     
     return jsonify(item.to_dict()), 200
 
 @items_bp.route('/<int:item_id>', methods=['DELETE'])
-@jwt_required()
+@require_roles('admin')
 def delete_item(item_id):
     """DELETE /api/items/<id> - Delete item"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({"error": "Unauthorized"}), 403
-    
     item = Item.query.get_or_404(item_id)
+    rollups.remove_item(item.id)
+    inventory.remove_item(item.id)
     db.session.delete(item)
     db.session.commit()
     
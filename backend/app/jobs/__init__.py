@@ -0,0 +1,2 @@
+# backend/app/jobs/__init__.py
+"""Jobs module"""
@@ -0,0 +1,56 @@
+# backend/app/jobs/routes.py
+import click
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from backend.app import db
+from backend.app.models import Job
+from backend.app.jobs.runner import get_runner
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def _visible_job(job_id):
+    """The job if the caller created it (or is an admin), else None."""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return None
+    if get_jwt().get('role') != 'admin' and job.created_by_user_id != int(get_jwt_identity()):
+        return None
+    return job
+
+
+@jobs_bp.cli.command('purge')
+def purge_jobs_command():
+    """Delete finished jobs past the JOB_RESULT_TTL retention."""
+    count = get_runner().purge_expired()
+    db.session.commit()
+    click.echo(f"Deleted {count} expired jobs")
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """
+    GET /api/jobs/<id> - Job status, progress and result
+    status: queued | running | succeeded | failed | cancelled
+    """
+    job = _visible_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(get_runner().live(job)), 200
+
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_job(job_id):
+    """POST /api/jobs/<id>/cancel - Cancel a queued or running job"""
+    job = _visible_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    if not get_runner().cancel(job):
+        return jsonify({"error": "Job already finished"}), 409
+    
+    db.session.refresh(job)
+    return jsonify(get_runner().live(job)), 202
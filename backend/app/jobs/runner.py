@@ -0,0 +1,291 @@
+"""
+Background jobs - a bounded local thread pool with state in the jobs table
+
+Routes submit work with submit_job(kind, params) and answer 202 with the
+job id; clients poll GET /api/jobs/<id>. Handlers are plain functions
+registered with @job_handler('kind'). They run in their own app context
+(and so their own database session) and report through a JobContext:
+
+    @job_handler('reports.rebuild')
+    def rebuild(ctx):
+        ...
+        ctx.progress(0.5)      # raises JobCancelled once cancel was requested
+        ...
+        return {'rows': n}     # stored as the job result (JSON)
+
+Progress is written in the handler's session, so it is persisted with the
+handler's next commit; the process running the job also keeps it in
+memory and GET /api/jobs/<id> shows the live value there.
+
+At most JOB_WORKERS jobs run at once and JOB_QUEUE_LIMIT more may wait;
+beyond that submit_job raises JobQueueFull. Finished jobs are deleted
+JOB_RESULT_TTL seconds after they finish. Jobs a crashed process left
+queued or running are marked failed when the server starts, and any
+still unfinished JOB_RESULT_TTL after they were created are failed by
+purge_expired. With JOB_WORKERS = 0 (testing) jobs run inline during
+submit_job.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app, jsonify, url_for
+from sqlalchemy import select, update, delete
+from backend.app import db
+from backend.app.models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+class JobQueueFull(Exception):
+    """No free slot for another job"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled"""
+
+
+def job_handler(kind):
+    """Register a function as the handler of a job kind."""
+
+    def wrapper(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+
+    return wrapper
+
+
+class JobContext:
+    """Handle passed to a job handler"""
+
+    def __init__(self, runner, job_id, params):
+        self.runner = runner
+        self.job_id = job_id
+        self.params = params
+
+    def cancelled(self):
+        """True once cancellation was requested (in any process)."""
+        if self.job_id in self.runner.cancelled:
+            return True
+        return bool(db.session.execute(
+            select(Job.cancel_requested).where(Job.id == self.job_id)
+        ).scalar())
+
+    def progress(self, fraction):
+        """Record progress (0..1) and stop the handler if it was cancelled."""
+        fraction = max(0.0, min(1.0, float(fraction)))
+        self.runner.live_progress[self.job_id] = fraction
+        if self.cancelled():
+            raise JobCancelled()
+        db.session.execute(update(Job).where(Job.id == self.job_id).values(progress=fraction))
+
+
+class JobRunner:
+    """Bounded executor for the jobs of one app"""
+
+    def __init__(self, app):
+        self.app = app
+        self.workers = app.config.get('JOB_WORKERS', 2)
+        self.result_ttl = timedelta(seconds=app.config.get('JOB_RESULT_TTL', 86400))
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix='job') if self.workers else None
+        self.slots = threading.BoundedSemaphore(self.workers + app.config.get('JOB_QUEUE_LIMIT', 20))
+        self.live_progress = {}
+        self.cancelled = set()
+        self.pending = set()
+
+    def submit(self, kind, params=None, user_id=None):
+        """
+        Store a queued job and hand it to the pool.
+
+        Returns:
+            Job (committed)
+
+        Raises:
+            KeyError: unknown kind
+            JobQueueFull: all workers busy and the queue is full
+        """
+
+        if kind not in JOB_HANDLERS:
+            raise KeyError(f"Unknown job kind: {kind}")
+        if not self.slots.acquire(blocking=False):
+            raise JobQueueFull()
+
+        # Kept outside the job: reading job.id after commit would reload it
+        # and hold a writer connection the inline run needs
+        job_id = uuid.uuid4().hex
+        try:
+            self.purge_expired()
+            job = Job(
+                id=job_id,
+                kind=kind,
+                status='queued',
+                params=json.dumps(params or {}),
+                created_by_user_id=user_id
+            )
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            self.slots.release()
+            raise
+
+        if self.executor is None:
+            self._run(job_id)
+            db.session.refresh(job)
+        else:
+            self.pending.add(job_id)
+            self.executor.submit(self._run, job_id)
+        return job
+
+    def cancel(self, job):
+        """
+        Cancel a job: a queued job is cancelled at once, a running one
+        stops at its next progress() call.
+
+        Returns:
+            bool: False if the job had already finished
+        """
+
+        if job.status in Job.FINISHED:
+            return False
+
+        self.cancelled.add(job.id)
+        db.session.execute(
+            update(Job).where(Job.id == job.id).values(cancel_requested=True)
+        )
+        db.session.execute(
+            update(Job).where(Job.id == job.id, Job.status == 'queued')
+            .values(status='cancelled', finished_at=datetime.utcnow())
+        )
+        db.session.commit()
+        return True
+
+    def fail_abandoned(self, created_before):
+        """
+        Mark queued and running jobs created before `created_before` as
+        failed, for jobs whose process is gone. The caller commits.
+
+        Returns:
+            int: jobs marked failed
+        """
+
+        result = db.session.execute(
+            update(Job).where(Job.finished_at.is_(None), Job.created_at < created_before)
+            .values(status='failed', error='Server stopped before the job finished',
+                    finished_at=datetime.utcnow())
+        )
+        return result.rowcount
+
+    def purge_expired(self):
+        """
+        Delete jobs that finished more than JOB_RESULT_TTL ago, and fail
+        those created longer ago than that which never finished.
+        """
+        cutoff = datetime.utcnow() - self.result_ttl
+        self.fail_abandoned(cutoff)
+        result = db.session.execute(delete(Job).where(Job.finished_at < cutoff))
+        return result.rowcount
+
+    def shutdown(self):
+        """
+        Stop the pool when the worker exits: running jobs are waited for,
+        jobs still waiting in this process are marked failed.
+        """
+
+        if self.executor is None:
+            return
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.pending:
+            with self.app.app_context():
+                db.session.execute(
+                    update(Job).where(Job.id.in_(self.pending), Job.status == 'queued')
+                    .values(status='failed', error='Server stopped before the job started',
+                            finished_at=datetime.utcnow())
+                )
+                db.session.commit()
+                db.session.remove()
+
+    def _finish(self, job_id, **values):
+        db.session.execute(
+            update(Job).where(Job.id == job_id).values(finished_at=datetime.utcnow(), **values)
+        )
+        db.session.commit()
+
+    def _run(self, job_id):
+        try:
+            with self.app.app_context():
+                try:
+                    self._execute(job_id)
+                finally:
+                    db.session.remove()
+        finally:
+            self.pending.discard(job_id)
+            self.live_progress.pop(job_id, None)
+            self.cancelled.discard(job_id)
+            self.slots.release()
+
+    def _execute(self, job_id):
+        started = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued')
+            .values(status='running', started_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if not started:
+            return  # cancelled while queued
+
+        job = db.session.get(Job, job_id)
+        ctx = JobContext(self, job_id, json.loads(job.params))
+
+        try:
+            result = JOB_HANDLERS[job.kind](ctx, **ctx.params)
+        except JobCancelled:
+            db.session.rollback()
+            self._finish(job_id, status='cancelled', progress=self.live_progress.get(job_id, 0.0))
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Job %s (%s) failed", job_id, job.kind)
+            self._finish(job_id, status='failed', error=str(e), progress=self.live_progress.get(job_id, 0.0))
+        else:
+            self._finish(job_id, status='succeeded', progress=1.0, result=json.dumps(result))
+
+    def live(self, job):
+        """Job dict with the in-memory progress of a job running here."""
+        data = job.to_dict()
+        if job.status == 'running' and job.id in self.live_progress:
+            data['progress'] = max(data['progress'], self.live_progress[job.id])
+        if job.finished_at:
+            data['expires_at'] = (job.finished_at + self.result_ttl).isoformat()
+        return data
+
+
+def init_jobs(app):
+    """Create the app's job runner and store it in app.extensions."""
+    app.extensions['jobs'] = JobRunner(app)
+    return app.extensions['jobs']
+
+
+def get_runner():
+    """Job runner of the current app."""
+    return current_app.extensions['jobs']
+
+
+def submit_job(kind, params=None, user_id=None):
+    """Submit a job on the current app's runner (see JobRunner.submit)."""
+    return get_runner().submit(kind, params, user_id)
+
+
+def accepted(kind, params=None, user_id=None):
+    """
+    Submit a job and build the route response: 202 with the job and a
+    Location header, or 503 when the queue is full.
+    """
+    try:
+        job = submit_job(kind, params, user_id)
+    except JobQueueFull:
+        return jsonify({"error": "Too many jobs queued, try again later"}), 503, {'Retry-After': '5'}
+
+    return jsonify(get_runner().live(job)), 202, {'Location': url_for('jobs.get_job', job_id=job.id)}
@@ -0,0 +1,312 @@
+"""
+Request metrics - latency, SQL statements per request and a slow-query log
+
+Request hooks time every request per blueprint and endpoint; engine
+events count the SQL statements it runs and the time spent in them.
+Statements slower than SLOW_QUERY_MS are logged (statement + parameters)
+on the 'backend.app.metrics.slow' logger. GET /metrics serves everything
+in the Prometheus text format.
+
+Recording is two perf_counter() calls per statement and one locked dict
+update per request. Under gunicorn every worker keeps its own registry
+and a background thread writes it to METRICS_DIR every
+METRICS_FLUSH_SECONDS;
+/metrics adds up the snapshots of all workers. The master folds exited
+workers into retired.json, so counters never go backwards.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, has_request_context, request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_logger = logging.getLogger(__name__ + '.slow')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# name -> (type, help, label names, histogram buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Requests handled', ('blueprint', 'endpoint', 'method', 'status'), None),
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency', ('blueprint', 'endpoint', 'method'), LATENCY_BUCKETS),
+    'db_statements_per_request': (
+        'histogram', 'SQL statements run by one request', ('blueprint', 'endpoint'), STATEMENT_BUCKETS),
+    'db_statement_seconds_total': (
+        'counter', 'Time spent in SQL statements', ('blueprint', 'endpoint'), None),
+    'db_slow_statements_total': (
+        'counter', 'SQL statements slower than SLOW_QUERY_MS', ('blueprint', 'endpoint'), None),
+}
+
+# Per-request state lives in the WSGI environ rather than g, so requests
+# dispatched inside another one (POST /api/batch) are timed on their own
+_STATE_KEY = 'green_erp.request_metrics'
+
+
+class Registry:
+    """Counters and histograms of one process"""
+
+    def __init__(self):
+        self.values = {name: {} for name in METRICS}
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels, amount=1.0):
+        with self._lock:
+            series = self.values[name]
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][3]
+        with self._lock:
+            series = self.values[name]
+            counts = series.get(labels)
+            if counts is None:
+                # one slot per bucket plus +Inf, then the sum
+                counts = series[labels] = [0.0] * (len(buckets) + 2)
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: [[list(labels), value if isinstance(value, float) else list(value)]
+                       for labels, value in series.items()]
+                for name, series in self.values.items()
+            }
+
+    def merge(self, snapshot):
+        """Add another process's snapshot to this registry."""
+        for name, series in snapshot.items():
+            if name not in self.values:
+                continue
+            for labels, value in series:
+                labels = tuple(labels)
+                if isinstance(value, list):
+                    counts = self.values[name].setdefault(labels, [0.0] * len(value))
+                    for i, v in enumerate(value):
+                        counts[i] += v
+                else:
+                    self.values[name][labels] = self.values[name].get(labels, 0.0) + value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render(registry):
+    """Prometheus text exposition (format 0.0.4) of a registry."""
+    lines = []
+    for name, (kind, help_text, label_names, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(registry.values[name].items()):
+            if kind == 'counter':
+                lines.append(f'{name}{_labels(label_names, labels)} {value}')
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*buckets, '+Inf'), value[:-1]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f'{name}_bucket{_labels(label_names, labels, le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(label_names, labels)} {value[-1]}')
+            lines.append(f'{name}_count{_labels(label_names, labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def _route_labels():
+    # Unmatched URLs share one label so scanners cannot blow up cardinality
+    return request.blueprint or '', request.endpoint or 'unmatched'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _statement_done(conn, statement, parameters)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # A statement that raised never reaches after_cursor_execute; without
+    # this its start time would stay on the pooled connection
+    if context.connection is not None:
+        _statement_done(context.connection, context.statement, context.parameters)
+
+
+def _statement_done(conn, statement, parameters):
+    started = conn.info.get('_metrics_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    in_request = has_request_context()
+    state = request.environ.get(_STATE_KEY) if in_request else None
+    if state is not None:
+        state[1] += 1
+        state[2] += elapsed
+
+    if in_request and elapsed * 1000 >= current_app.config.get('SLOW_QUERY_MS', 200):
+        if state is not None:
+            state[3] += 1
+        slow_logger.warning(
+            "Slow query (%.1f ms) in %s: %s; parameters: %.500r",
+            elapsed * 1000, request.endpoint, statement, parameters
+        )
+
+
+class RequestMetrics:
+    """Request hooks and the worker's registry for one app"""
+
+    def __init__(self, app):
+        self.registry = Registry()
+        self.directory = app.config.get('METRICS_DIR')
+        self.flush_seconds = app.config.get('METRICS_FLUSH_SECONDS', 5)
+        self.dirty = False
+        self.stopped = threading.Event()
+
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+
+    def before_request(self):
+        # [started, statements, db seconds, slow statements, recorded]
+        request.environ.setdefault(_STATE_KEY, [time.perf_counter(), 0, 0.0, 0, False])
+
+    def after_request(self, response):
+        self.record(response.status_code)
+        return response
+
+    def teardown_request(self, exc):
+        # Requests that raised never reach after_request
+        self.record(500)
+
+    def record(self, status):
+        state = request.environ.get(_STATE_KEY)
+        if state is None or state[4]:
+            return
+        state[4] = True
+
+        blueprint, endpoint = _route_labels()
+        registry = self.registry
+        registry.inc('http_requests_total', (blueprint, endpoint, request.method, str(status)))
+        registry.observe('http_request_duration_seconds', (blueprint, endpoint, request.method),
+                         time.perf_counter() - state[0])
+        registry.observe('db_statements_per_request', (blueprint, endpoint), state[1])
+        registry.inc('db_statement_seconds_total', (blueprint, endpoint), state[2])
+        if state[3]:
+            registry.inc('db_slow_statements_total', (blueprint, endpoint), state[3])
+        self.dirty = True
+
+    def start_flusher(self):
+        """Write the snapshot every METRICS_FLUSH_SECONDS (call in each worker after fork)."""
+        if not self.directory:
+            return
+
+        self.stopped.clear()
+
+        def loop():
+            while not self.stopped.wait(self.flush_seconds):
+                if self.dirty:
+                    self.flush()
+
+        threading.Thread(target=loop, name='metrics-flush', daemon=True).start()
+
+    def stop_flusher(self):
+        """End the flusher thread; call flush() afterwards to save the last counts."""
+        self.stopped.set()
+
+    def flush(self):
+        """Write this worker's snapshot to METRICS_DIR."""
+        if not self.directory:
+            return
+        self.dirty = False
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(path + '.tmp', path)
+
+    def collect(self):
+        """Registry of every worker (just this one without METRICS_DIR)."""
+        if not self.directory:
+            return self.registry
+
+        self.flush()
+        merged = Registry()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    merged.merge(json.load(f))
+            except (OSError, ValueError):
+                continue  # replaced while reading; picked up next scrape
+        return merged
+
+
+def retire_worker(app, pid):
+    """
+    Fold an exited worker's snapshot into retired.json (master only), so
+    recycled workers do not leave a file each behind.
+    """
+
+    directory = app.config.get('METRICS_DIR')
+    path = os.path.join(directory or '', f'{pid}.json')
+    if not directory or not os.path.exists(path):
+        return
+
+    retired = Registry()
+    for name in ('retired.json', f'{pid}.json'):
+        try:
+            with open(os.path.join(directory, name)) as f:
+                retired.merge(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    target = os.path.join(directory, 'retired.json')
+    with open(target + '.tmp', 'w') as f:
+        json.dump(retired.snapshot(), f)
+    os.replace(target + '.tmp', target)
+    os.remove(path)
+
+
+def reset_metrics_dir(app):
+    """Remove the snapshots of a previous server run (master, before fork)."""
+    directory = app.config.get('METRICS_DIR')
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+
+
+def init_metrics(app):
+    """Install the request hooks and the GET /metrics route."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+
+    metrics = app.extensions['metrics'] = RequestMetrics(app)
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """Prometheus scrape endpoint (Bearer METRICS_TOKEN when configured)."""
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return {"error": "Unauthorized"}, 401
+        return Response(render(metrics.collect()), mimetype='text/plain; version=0.0.4')
+
+    return metrics
@@ -0,0 +1,100 @@
+"""
+Schema migrations - versioned DDL tracked in the schema_migrations table
+
+Run pending steps with:
+    flask --app backend.run db upgrade
+
+create_app only upgrades automatically when AUTO_MIGRATE is set
+(development and testing); production runs the command at deploy time
+so worker startup does no DDL at all.
+"""
+
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+from backend.app import db
+from backend.app.migrations.versions import MIGRATIONS
+
+db_cli = AppGroup('db', help='Database schema commands.')
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    ))
+
+
+def current_version(engine=None):
+    """Highest applied migration version (0 for an empty database)."""
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return conn.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar() or 0
+
+
+def upgrade(engine=None, target=None):
+    """
+    Apply pending migrations in order, each in its own transaction.
+
+    Args:
+        engine: engine to migrate (defaults to db.engine)
+        target (int): stop after this version (defaults to the latest)
+
+    Returns:
+        list of applied (version, description)
+    """
+
+    engine = engine or db.engine
+    version = current_version(engine)
+    applied = []
+
+    for step, description, statements in MIGRATIONS:
+        if step <= version or (target is not None and step > target):
+            continue
+
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {'version': step, 'description': description,
+                 'applied_at': datetime.utcnow().isoformat(' ')}
+            )
+        applied.append((step, description))
+
+    return applied
+
+
+@db_cli.command('upgrade')
+@click.option('--target', type=int, default=None, help='Stop at this version.')
+def upgrade_command(target):
+    """Apply pending schema migrations."""
+    applied = upgrade(target=target)
+    for step, description in applied:
+        click.echo(f"Applied {step:04d} {description}")
+    click.echo(f"Schema at version {current_version()}")
+
+
+@db_cli.command('current')
+def current_command():
+    """Show the current schema version."""
+    latest = MIGRATIONS[-1][0]
+    click.echo(f"Schema at version {current_version()} (latest {latest})")
+
+
+@db_cli.command('check-plans')
+def check_plans_command():
+    """Fail if a report or list query no longer uses an index."""
+    from backend.app.migrations.plans import check_query_plans
+
+    problems = check_query_plans()
+    for name, plan in problems:
+        click.echo(f"{name}: {plan}")
+    if problems:
+        raise SystemExit(1)
+    click.echo("All query plans use indexes")
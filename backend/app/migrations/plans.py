@@ -0,0 +1,104 @@
+"""
+Query plan checks - EXPLAIN QUERY PLAN for the hot report and list queries
+
+Each check mirrors a query issued by a route. A plan step that scans a
+whole table without an index ("SCAN purchase_orders") is reported, so a
+schema or query change that drops an index shows up in the test suite
+and in 'flask db check-plans'.
+"""
+
+from datetime import datetime, date
+from sqlalchemy import select, func
+from backend.app import db
+from backend.app.items.inventory import stock_as_of
+from backend.app.models import (
+    Item, PurchaseOrder, PurchaseOrderItem, ItemEmission, SupplierEmissionBucket, Supplier
+)
+
+
+def _plan_checks():
+    """Named statements to check, as issued by the routes."""
+    since = datetime(2025, 1, 1)
+    until = datetime(2025, 4, 1)
+
+    return {
+        'orders by status': select(PurchaseOrder).where(
+            PurchaseOrder.status == 'draft'
+        ).order_by(PurchaseOrder.id).limit(51),
+        'orders by supplier': select(PurchaseOrder).where(
+            PurchaseOrder.supplier_id == 1
+        ).order_by(PurchaseOrder.id).limit(51),
+        'orders by date range': select(PurchaseOrder).where(
+            PurchaseOrder.order_date >= since, PurchaseOrder.order_date < until
+        ).order_by(PurchaseOrder.id).limit(51),
+        'orders keyset page': select(PurchaseOrder).where(
+            PurchaseOrder.id > 100
+        ).order_by(PurchaseOrder.id).limit(51),
+        'order lines of a page': select(PurchaseOrderItem).where(
+            PurchaseOrderItem.purchase_order_id.in_([1, 2, 3])
+        ),
+        'order lines by item': select(PurchaseOrderItem.line_co2).where(
+            PurchaseOrderItem.item_id == 1
+        ),
+        'highest emission orders': select(PurchaseOrder).where(
+            PurchaseOrder.total_co2 > 0
+        ).order_by(PurchaseOrder.total_co2.desc()).limit(3),
+        'item emissions rebuild': select(
+            PurchaseOrderItem.item_id,
+            func.sum(PurchaseOrderItem.line_co2),
+            func.sum(PurchaseOrderItem.quantity)
+        ).group_by(PurchaseOrderItem.item_id),
+        'emissions by item in category': select(
+            Item.id, func.coalesce(ItemEmission.total_co2, 0.0)
+        ).outerjoin(ItemEmission, ItemEmission.item_id == Item.id).where(
+            Item.category == 'metal'
+        ),
+        'low stock items': select(Item).where(*Item.low_stock_criteria()).order_by(Item.id).limit(51),
+        'items keyset page': select(Item).where(Item.id > 100).order_by(Item.id).limit(51),
+        'supplier buckets in range': select(
+            SupplierEmissionBucket.supplier_id, Supplier.name, SupplierEmissionBucket.total_co2
+        ).outerjoin(Supplier, Supplier.id == SupplierEmissionBucket.supplier_id).where(
+            SupplierEmissionBucket.granularity == 'month',
+            SupplierEmissionBucket.period_start >= date(2025, 1, 1),
+            SupplierEmissionBucket.period_start <= date(2025, 3, 31)
+        ),
+        'stock as of': stock_as_of(until, [Item.category == 'metal']),
+    }
+
+
+def _bind_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(' ') if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+def explain(stmt, engine=None):
+    """
+    Return the EXPLAIN QUERY PLAN detail lines for a statement.
+    """
+
+    engine = engine or db.engine
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    values = tuple(_bind_value(params[name]) for name in compiled.positiontup)
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", values).all()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(engine=None):
+    """
+    Run every plan check.
+
+    Returns:
+        list of (check name, offending plan step); empty when all queries
+        use an index
+    """
+
+    problems = []
+    for name, stmt in _plan_checks().items():
+        for step in explain(stmt, engine):
+            if step.startswith('SCAN ') and ' USING ' not in step:
+                problems.append((name, step))
+    return problems
@@ -0,0 +1,348 @@
+"""
+Migration steps - append new schema changes at the end, never edit old ones
+
+Each entry is (version, description, [SQL statements]). Statements of
+one step run in a single transaction together with its version row.
+"""
+
+MIGRATIONS = [
+    (1, 'initial schema', [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER NOT NULL,
+            username VARCHAR(80) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            role VARCHAR(50) NOT NULL,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (username)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER NOT NULL,
+            name VARCHAR(120) NOT NULL,
+            sku VARCHAR(50) NOT NULL,
+            category VARCHAR(80) NOT NULL,
+            unit VARCHAR(20) NOT NULL,
+            stock INTEGER NOT NULL,
+            reorder_level INTEGER NOT NULL,
+            co2_per_unit FLOAT NOT NULL,
+            is_active BOOLEAN NOT NULL,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (sku)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER NOT NULL,
+            name VARCHAR(120) NOT NULL,
+            contact_email VARCHAR(120),
+            phone VARCHAR(20),
+            address VARCHAR(255),
+            sustainability_score FLOAT,
+            certifications VARCHAR(255),
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS purchase_orders (
+            id INTEGER NOT NULL,
+            supplier_id INTEGER NOT NULL,
+            created_by_user_id INTEGER NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            order_date DATETIME NOT NULL,
+            total_amount FLOAT NOT NULL,
+            total_co2 FLOAT NOT NULL,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(supplier_id) REFERENCES suppliers (id),
+            FOREIGN KEY(created_by_user_id) REFERENCES users (id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS purchase_order_items (
+            id INTEGER NOT NULL,
+            purchase_order_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price FLOAT NOT NULL,
+            line_co2 FLOAT NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(purchase_order_id) REFERENCES purchase_orders (id),
+            FOREIGN KEY(item_id) REFERENCES items (id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS item_emissions (
+            item_id INTEGER NOT NULL,
+            total_co2 FLOAT NOT NULL,
+            total_quantity INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (item_id),
+            FOREIGN KEY(item_id) REFERENCES items (id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS supplier_emission_buckets (
+            supplier_id INTEGER NOT NULL,
+            granularity VARCHAR(10) NOT NULL,
+            period_start DATE NOT NULL,
+            total_co2 FLOAT NOT NULL,
+            total_amount FLOAT NOT NULL,
+            order_count INTEGER NOT NULL,
+            PRIMARY KEY (supplier_id, granularity, period_start),
+            FOREIGN KEY(supplier_id) REFERENCES suppliers (id)
+        )
+        """,
+        # Existing orders fill the rollups (the SQL of
+        # rollups.rebuild_item_emissions and rebuild_supplier_buckets)
+        "DELETE FROM item_emissions",
+        """
+        INSERT INTO item_emissions (item_id, total_co2, total_quantity, line_count, updated_at)
+        SELECT item_id, SUM(line_co2), SUM(quantity), COUNT(id), datetime('now')
+        FROM purchase_order_items GROUP BY item_id
+        """,
+        "DELETE FROM supplier_emission_buckets",
+        """
+        INSERT INTO supplier_emission_buckets
+            (supplier_id, granularity, period_start, total_co2, total_amount, order_count)
+        SELECT supplier_id, 'month', strftime('%Y-%m-01', order_date) AS period_start,
+               SUM(total_co2), SUM(total_amount), COUNT(id)
+        FROM purchase_orders GROUP BY supplier_id, period_start
+        UNION ALL
+        SELECT supplier_id, 'quarter',
+               printf('%s-%02d-01', strftime('%Y', order_date),
+                      (CAST(strftime('%m', order_date) AS INTEGER) - 1) / 3 * 3 + 1) AS period_start,
+               SUM(total_co2), SUM(total_amount), COUNT(id)
+        FROM purchase_orders GROUP BY supplier_id, period_start
+        """,
+    ]),
+    (2, 'indexes for report and list queries', [
+        # Lines by item: emissions rollup rebuild and per-item lookups (covering)
+        "CREATE INDEX IF NOT EXISTS ix_purchase_order_items_item_id "
+        "ON purchase_order_items (item_id, line_co2, quantity)",
+        # Lines by order: selectin loading of order lines
+        "CREATE INDEX IF NOT EXISTS ix_purchase_order_items_purchase_order_id "
+        "ON purchase_order_items (purchase_order_id)",
+        "CREATE INDEX IF NOT EXISTS ix_purchase_orders_supplier_id "
+        "ON purchase_orders (supplier_id, order_date)",
+        "CREATE INDEX IF NOT EXISTS ix_purchase_orders_status "
+        "ON purchase_orders (status, order_date)",
+        "CREATE INDEX IF NOT EXISTS ix_purchase_orders_order_date "
+        "ON purchase_orders (order_date)",
+        # ai-recommendations: ORDER BY total_co2 DESC LIMIT n
+        "CREATE INDEX IF NOT EXISTS ix_purchase_orders_total_co2 "
+        "ON purchase_orders (total_co2)",
+        "CREATE INDEX IF NOT EXISTS ix_items_category ON items (category)",
+        "CREATE INDEX IF NOT EXISTS ix_item_emissions_total_co2 ON item_emissions (total_co2)",
+        "CREATE INDEX IF NOT EXISTS ix_supplier_emission_buckets_period "
+        "ON supplier_emission_buckets (granularity, period_start)",
+    ]),
+    (3, 'table generation counters', [
+        """
+        CREATE TABLE IF NOT EXISTS table_generations (
+            table_name VARCHAR(64) NOT NULL,
+            generation INTEGER NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (table_name)
+        )
+        """,
+    ]),
+    (4, 'optimistic version on purchase orders', [
+        "ALTER TABLE purchase_orders ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+    ]),
+    (5, 'inventory movement ledger and stock snapshots', [
+        """
+        CREATE TABLE IF NOT EXISTS inventory_movements (
+            id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            reason VARCHAR(20) NOT NULL,
+            purchase_order_id INTEGER,
+            user_id INTEGER,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(item_id) REFERENCES items (id),
+            FOREIGN KEY(purchase_order_id) REFERENCES purchase_orders (id),
+            FOREIGN KEY(user_id) REFERENCES users (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_inventory_movements_item_id "
+        "ON inventory_movements (item_id, created_at)",
+        """
+        CREATE TABLE IF NOT EXISTS stock_snapshots (
+            item_id INTEGER NOT NULL,
+            as_of DATETIME NOT NULL,
+            stock INTEGER NOT NULL,
+            PRIMARY KEY (item_id, as_of),
+            FOREIGN KEY(item_id) REFERENCES items (id)
+        )
+        """,
+        # Existing stock becomes the opening balance of each item's ledger
+        "INSERT INTO inventory_movements (item_id, quantity, reason, created_at) "
+        "SELECT id, stock, 'initial', created_at FROM items WHERE stock != 0",
+    ]),
+    (6, 'partial index on low-stock items', [
+        "CREATE INDEX IF NOT EXISTS ix_items_low_stock ON items (id) "
+        "WHERE is_active = 1 AND stock <= reorder_level",
+    ]),
+    # External-content FTS5 indexes kept in sync by triggers, so every
+    # writer (ORM, bulk upserts, raw SQL) updates them in its transaction
+    (7, 'full-text search over items and suppliers', [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+        "name, sku, category, content='items', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        """
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, name, sku, category)
+            VALUES (new.id, new.name, new.sku, new.category);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, sku, category)
+            VALUES ('delete', old.id, old.name, old.sku, old.category);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name, sku, category ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, sku, category)
+            VALUES ('delete', old.id, old.name, old.sku, old.category);
+            INSERT INTO items_fts (rowid, name, sku, category)
+            VALUES (new.id, new.name, new.sku, new.category);
+        END
+        """,
+        "INSERT INTO items_fts (items_fts) VALUES ('rebuild')",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS suppliers_fts USING fts5("
+        "name, certifications, address, content='suppliers', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        """
+        CREATE TRIGGER IF NOT EXISTS suppliers_fts_insert AFTER INSERT ON suppliers BEGIN
+            INSERT INTO suppliers_fts (rowid, name, certifications, address)
+            VALUES (new.id, new.name, new.certifications, new.address);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS suppliers_fts_delete AFTER DELETE ON suppliers BEGIN
+            INSERT INTO suppliers_fts (suppliers_fts, rowid, name, certifications, address)
+            VALUES ('delete', old.id, old.name, old.certifications, old.address);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS suppliers_fts_update
+        AFTER UPDATE OF name, certifications, address ON suppliers BEGIN
+            INSERT INTO suppliers_fts (suppliers_fts, rowid, name, certifications, address)
+            VALUES ('delete', old.id, old.name, old.certifications, old.address);
+            INSERT INTO suppliers_fts (rowid, name, certifications, address)
+            VALUES (new.id, new.name, new.certifications, new.address);
+        END
+        """,
+        "INSERT INTO suppliers_fts (suppliers_fts) VALUES ('rebuild')",
+    ]),
+    (8, 'background jobs', [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id VARCHAR(32) NOT NULL,
+            kind VARCHAR(50) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            progress FLOAT NOT NULL,
+            params TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            cancel_requested BOOLEAN NOT NULL,
+            created_by_user_id INTEGER,
+            created_at DATETIME NOT NULL,
+            started_at DATETIME,
+            finished_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(created_by_user_id) REFERENCES users (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_jobs_finished_at ON jobs (finished_at)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_created_by_user_id ON jobs (created_by_user_id, created_at)",
+    ]),
+    (9, 'login limiter', [
+        "ALTER TABLE users ADD COLUMN failed_logins INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE users ADD COLUMN last_failed_login DATETIME",
+    ]),
+    (10, 'dashboard KPI counters', [
+        """
+        CREATE TABLE IF NOT EXISTS kpi_counters (
+            name VARCHAR(50) NOT NULL,
+            value FLOAT NOT NULL,
+            PRIMARY KEY (name)
+        )
+        """,
+        """
+        INSERT OR REPLACE INTO kpi_counters (name, value)
+        SELECT 'items', COUNT(*) FROM items
+        UNION ALL SELECT 'low_stock_items', COUNT(*) FROM items WHERE is_active = 1 AND stock <= reorder_level
+        UNION ALL SELECT 'suppliers', COUNT(*) FROM suppliers
+        UNION ALL SELECT 'open_orders', COUNT(*) FROM purchase_orders WHERE status IN ('draft', 'submitted')
+        UNION ALL SELECT 'total_co2', COALESCE(SUM(total_co2), 0.0) FROM purchase_orders
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS items_kpi_insert AFTER INSERT ON items BEGIN
+            UPDATE kpi_counters SET value = value + 1 WHERE name = 'items';
+            UPDATE kpi_counters SET value = value + 1
+            WHERE name = 'low_stock_items' AND new.is_active = 1 AND new.stock <= new.reorder_level;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS items_kpi_delete AFTER DELETE ON items BEGIN
+            UPDATE kpi_counters SET value = value - 1 WHERE name = 'items';
+            UPDATE kpi_counters SET value = value - 1
+            WHERE name = 'low_stock_items' AND old.is_active = 1 AND old.stock <= old.reorder_level;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS items_kpi_update AFTER UPDATE OF stock, reorder_level, is_active ON items
+        WHEN (new.is_active = 1 AND new.stock <= new.reorder_level)
+            != (old.is_active = 1 AND old.stock <= old.reorder_level)
+        BEGIN
+            UPDATE kpi_counters
+            SET value = value + (new.is_active = 1 AND new.stock <= new.reorder_level)
+                              - (old.is_active = 1 AND old.stock <= old.reorder_level)
+            WHERE name = 'low_stock_items';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS suppliers_kpi_insert AFTER INSERT ON suppliers BEGIN
+            UPDATE kpi_counters SET value = value + 1 WHERE name = 'suppliers';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS suppliers_kpi_delete AFTER DELETE ON suppliers BEGIN
+            UPDATE kpi_counters SET value = value - 1 WHERE name = 'suppliers';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS purchase_orders_kpi_insert AFTER INSERT ON purchase_orders BEGIN
+            UPDATE kpi_counters SET value = value + 1
+            WHERE name = 'open_orders' AND new.status IN ('draft', 'submitted');
+            UPDATE kpi_counters SET value = value + new.total_co2 WHERE name = 'total_co2';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS purchase_orders_kpi_delete AFTER DELETE ON purchase_orders BEGIN
+            UPDATE kpi_counters SET value = value - 1
+            WHERE name = 'open_orders' AND old.status IN ('draft', 'submitted');
+            UPDATE kpi_counters SET value = value - old.total_co2 WHERE name = 'total_co2';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS purchase_orders_kpi_update AFTER UPDATE OF status, total_co2 ON purchase_orders
+        BEGIN
+            UPDATE kpi_counters
+            SET value = value + (new.status IN ('draft', 'submitted')) - (old.status IN ('draft', 'submitted'))
+            WHERE name = 'open_orders';
+            UPDATE kpi_counters SET value = value + new.total_co2 - old.total_co2
+            WHERE name = 'total_co2' AND new.total_co2 != old.total_co2;
+        END
+        """,
+    ]),
+]
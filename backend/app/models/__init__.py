@@ -3,9 +3,11 @@
 Database models - represents tables in the database
 """
 
+import json
 from backend.app import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.security import check_password_hash
 
 
 class User(db.Model):
@@ -19,9 +21,14 @@ class User(db.Model):
     role = db.Column(db.String(50), nullable=False, default='sustainability_manager')
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
+    # Login limiter: consecutive failures and when the last one happened
+    failed_logins = db.Column(db.Integer, nullable=False, default=0)
+    last_failed_login = db.Column(db.DateTime)
+    
     def set_password(self, password):
-        """Hash password before storing"""
-        self.password_hash = generate_password_hash(password)
+        """Hash password before storing (PASSWORD_HASH_METHOD)"""
+        from backend.app.auth.passwords import hash_password
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Verify password"""
@@ -41,11 +48,17 @@ class Item(db.Model):
     """Item table - inventory products"""
     
     __tablename__ = 'items'
+    __table_args__ = (
+        # Partial index over low-stock rows only, so the low-stock list and
+        # the reorder engine read a small index however large the catalogue
+        db.Index('ix_items_low_stock', 'id',
+                 sqlite_where=db.text('is_active = 1 AND stock <= reorder_level')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     sku = db.Column(db.String(50), unique=True, nullable=False)
-    category = db.Column(db.String(80), nullable=False)
+    category = db.Column(db.String(80), nullable=False, index=True)
     unit = db.Column(db.String(20), nullable=False)
     stock = db.Column(db.Integer, nullable=False, default=0)
     reorder_level = db.Column(db.Integer, nullable=False, default=10)
@@ -67,6 +80,11 @@ class Item(db.Model):
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat()
         }
+    
+    @staticmethod
+    def low_stock_criteria():
+        """Filters matching the ix_items_low_stock index condition"""
+        return [Item.is_active == True, Item.stock <= Item.reorder_level]
 
 
 class Supplier(db.Model):
@@ -101,6 +119,14 @@ class PurchaseOrder(db.Model):
     """Purchase Order table - orders to suppliers"""
     
     __tablename__ = 'purchase_orders'
+    __table_args__ = (
+        db.Index('ix_purchase_orders_supplier_id', 'supplier_id', 'order_date'),
+        db.Index('ix_purchase_orders_status', 'status', 'order_date'),
+        db.Index('ix_purchase_orders_order_date', 'order_date'),
+        db.Index('ix_purchase_orders_total_co2', 'total_co2'),
+    )
+    
+    STATUSES = ('draft', 'submitted', 'received')
     
     id = db.Column(db.Integer, primary_key=True)
     supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), nullable=False)
@@ -109,15 +135,25 @@ class PurchaseOrder(db.Model):
     order_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     total_amount = db.Column(db.Float, nullable=False, default=0.0)
     total_co2 = db.Column(db.Float, nullable=False, default=0.0)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
+    # Optimistic locking: every ORM update checks and bumps version, so a
+    # concurrent change to the same order raises StaleDataError at flush
+    __mapper_args__ = {'version_id_col': version}
+    
     supplier = db.relationship('Supplier', backref='purchase_orders')
     created_by_user = db.relationship('User', backref='purchase_orders')
     items = db.relationship('PurchaseOrderItem', backref='purchase_order', cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert to dictionary"""
-        return {
+    def to_dict(self, include_items=True):
+        """
+        Convert to dictionary
+        
+        Args:
+            include_items (bool): serialize the line items as well
+        """
+        data = {
             'id': self.id,
             'supplier_id': self.supplier_id,
             'supplier_name': self.supplier.name if self.supplier else None,
@@ -126,15 +162,36 @@ class PurchaseOrder(db.Model):
             'order_date': self.order_date.isoformat(),
             'total_amount': self.total_amount,
             'total_co2': self.total_co2,
-            'items': [item.to_dict() for item in self.items],
-            'created_at': self.created_at.isoformat()
+            'version': self.version
         }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.items]
+        data['created_at'] = self.created_at.isoformat()
+        return data
+    
+    @staticmethod
+    def load_options(include_items=True):
+        """
+        Loader options for serializing orders with a fixed number of queries:
+        suppliers are joined, lines and their items are fetched with one
+        SELECT ... IN each.
+        """
+        options = [joinedload(PurchaseOrder.supplier)]
+        if include_items:
+            options.append(
+                selectinload(PurchaseOrder.items).joinedload(PurchaseOrderItem.item)
+            )
+        return options
 
 
 class PurchaseOrderItem(db.Model):
     """Purchase Order Item table - line items in orders"""
     
     __tablename__ = 'purchase_order_items'
+    __table_args__ = (
+        db.Index('ix_purchase_order_items_item_id', 'item_id', 'line_co2', 'quantity'),
+        db.Index('ix_purchase_order_items_purchase_order_id', 'purchase_order_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     purchase_order_id = db.Column(db.Integer, db.ForeignKey('purchase_orders.id'), nullable=False)
@@ -157,3 +214,162 @@ class PurchaseOrderItem(db.Model):
             'line_co2': self.line_co2,
             'line_total': self.quantity * self.unit_price
         }
+
+
+class ItemEmission(db.Model):
+    """Item emissions rollup - running CO2 totals per item from order lines"""
+    
+    __tablename__ = 'item_emissions'
+    
+    item_id = db.Column(db.Integer, db.ForeignKey('items.id'), primary_key=True)
+    total_co2 = db.Column(db.Float, nullable=False, default=0.0, index=True)
+    total_quantity = db.Column(db.Integer, nullable=False, default=0)
+    line_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'item_id': self.item_id,
+            'total_co2': self.total_co2,
+            'total_quantity': self.total_quantity,
+            'line_count': self.line_count,
+            'updated_at': self.updated_at.isoformat()
+        }
+
+
+class SupplierEmissionBucket(db.Model):
+    """Supplier emissions rollup - CO2 and spend per supplier per month/quarter"""
+    
+    __tablename__ = 'supplier_emission_buckets'
+    __table_args__ = (
+        db.Index('ix_supplier_emission_buckets_period', 'granularity', 'period_start'),
+    )
+    
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), primary_key=True)
+    granularity = db.Column(db.String(10), primary_key=True)
+    period_start = db.Column(db.Date, primary_key=True)
+    total_co2 = db.Column(db.Float, nullable=False, default=0.0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'supplier_id': self.supplier_id,
+            'granularity': self.granularity,
+            'period_start': self.period_start.isoformat(),
+            'total_co2': self.total_co2,
+            'total_amount': self.total_amount,
+            'order_count': self.order_count
+        }
+
+
+class TableGeneration(db.Model):
+    """Table generation counters - bumped by every commit that writes the table"""
+    
+    __tablename__ = 'table_generations'
+    
+    table_name = db.Column(db.String(64), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class KpiCounter(db.Model):
+    """Dashboard KPI counter - kept current by triggers on items, suppliers and purchase_orders (migration 10)"""
+    
+    __tablename__ = 'kpi_counters'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class InventoryMovement(db.Model):
+    """Inventory ledger - append-only stock changes; Item.stock is their running sum"""
+    
+    __tablename__ = 'inventory_movements'
+    __table_args__ = (
+        db.Index('ix_inventory_movements_item_id', 'item_id', 'created_at'),
+    )
+    
+    REASONS = ('initial', 'receipt', 'adjustment', 'import', 'consumption')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, db.ForeignKey('items.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(20), nullable=False)
+    purchase_order_id = db.Column(db.Integer, db.ForeignKey('purchase_orders.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'item_id': self.item_id,
+            'quantity': self.quantity,
+            'reason': self.reason,
+            'purchase_order_id': self.purchase_order_id,
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class StockSnapshot(db.Model):
+    """Stock snapshot - an item's stock summed over the ledger up to as_of"""
+    
+    __tablename__ = 'stock_snapshots'
+    
+    item_id = db.Column(db.Integer, db.ForeignKey('items.id'), primary_key=True)
+    as_of = db.Column(db.DateTime, primary_key=True)
+    stock = db.Column(db.Integer, nullable=False)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'item_id': self.item_id,
+            'as_of': self.as_of.isoformat(),
+            'stock': self.stock
+        }
+
+
+class Job(db.Model):
+    """Background job - status, progress and result of work run off the request thread"""
+    
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_finished_at', 'finished_at'),
+        db.Index('ix_jobs_created_by_user_id', 'created_by_user_id', 'created_at'),
+    )
+    
+    STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+    FINISHED = ('succeeded', 'failed', 'cancelled')
+    
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    params = db.Column(db.Text, nullable=False, default='{}')
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_by_user_id': self.created_by_user_id,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
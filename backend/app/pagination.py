@@ -0,0 +1,207 @@
+"""
+List endpoint helpers - keyset pagination, filters and field projection
+
+Query parameters understood by every list endpoint:
+    limit   page size (1..MAX_LIMIT); enables paging
+    cursor  opaque value from the previous page's next_cursor
+    sort    one of the endpoint's sort keys (default 'id')
+    order   'asc' or 'desc'
+    fields  comma separated column names to select, e.g. fields=id,name
+
+Without limit or cursor the full (filtered) list is returned as a plain
+JSON array, which keeps the existing frontend calls working.
+"""
+
+import base64
+import json
+from datetime import datetime, date, timedelta
+from flask import request
+from sqlalchemy import and_, or_
+from backend.app import db
+from backend.app.serializers import serializer_for
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def parse_bool(value):
+    """Parse a true/false query value (None stays None)."""
+    if value is None:
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+def parse_date(value, end=False):
+    """
+    Parse a date or datetime query value.
+
+    A plain YYYY-MM-DD used as an upper bound (end=True) covers the whole
+    day, so the caller should compare with '<'.
+    """
+
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            parsed = datetime.strptime(value, '%Y-%m-%d')
+            return parsed + timedelta(days=1) if end else parsed
+        parsed = datetime.fromisoformat(value)
+        return parsed + timedelta(microseconds=1) if end else parsed
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+
+def date_range_criteria(column, args):
+    """Build the ?from=&to= bounds on a datetime column as a list of criteria."""
+    date_from = parse_date(args.get('from'))
+    date_to = parse_date(args.get('to'), end=True)
+
+    criteria = []
+    if date_from:
+        criteria.append(column >= date_from)
+    if date_to:
+        criteria.append(column < date_to)
+    return criteria
+
+
+def filter_date_range(query, column, args):
+    """Apply ?from=&to= bounds on a datetime column."""
+    return query.filter(*date_range_criteria(column, args))
+
+
+def encode_cursor(value, row_id):
+    """Encode the last row's sort value and id as an opaque cursor."""
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, column):
+    """Decode a cursor back into (sort value, id) for the given sort column."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if isinstance(value, (list, dict)):
+            raise ValueError
+        if value is not None and column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    return value, row_id
+
+
+def serialize_value(value):
+    """Make a selected column value JSON friendly."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def paginate(query, model, sorts, serializer=None):
+    """
+    Apply sorting, keyset pagination and projection to a list query.
+
+    Args:
+        query: filtered SQLAlchemy query over model
+        model: model class being listed (must have an 'id' column)
+        sorts (dict): sort key -> column allowed for this endpoint
+        serializer: RowSerializer used when no fields projection is
+            requested (default: the model's, see app/serializers.py);
+            models without one are loaded as objects and to_dict()'ed
+
+    Returns:
+        list, or {'data': [...], 'next_cursor': ..., 'limit': n} when paging
+
+    Raises:
+        ValueError: on invalid query parameters
+    """
+
+    args = request.args
+    sort = args.get('sort', 'id')
+    order = args.get('order', 'asc')
+
+    if sort not in sorts:
+        raise ValueError(f"Invalid sort, expected one of: {', '.join(sorts)}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("Order must be asc or desc")
+
+    sort_column = sorts[sort]
+    descending = order == 'desc'
+
+    paged = 'limit' in args or 'cursor' in args
+    limit = None
+    if paged:
+        try:
+            limit = int(args.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise ValueError("Limit must be an integer")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"Limit must be between 1 and {MAX_LIMIT}")
+
+    if args.get('cursor'):
+        value, last_id = decode_cursor(args['cursor'], sort_column)
+        if sort_column is model.id:
+            query = query.filter(model.id < last_id if descending else model.id > last_id)
+        elif descending:
+            query = query.filter(or_(
+                sort_column < value,
+                and_(sort_column == value, model.id < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > value,
+                and_(sort_column == value, model.id > last_id)
+            ))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), model.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), model.id.asc())
+
+    if limit:
+        query = query.limit(limit + 1)
+
+    fields = None
+    if args.get('fields'):
+        fields = [f.strip() for f in args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in model.__table__.c]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        columns = [model.__table__.c[f] for f in fields]
+        rows = query.with_entities(*columns, sort_column, model.id).all()
+        keys = [(row[-2], row[-1]) for row in rows]
+        data = [
+            {f: serialize_value(v) for f, v in zip(fields, row)}
+            for row in rows
+        ]
+    elif serializer or serializer_for(model):
+        serializer = serializer or serializer_for(model)
+        rows = db.session.execute(serializer.select_from(query, sort_column, model.id)).all()
+        keys = [(row[-2], row[-1]) for row in rows]
+        data = serializer.serialize_rows(rows)
+    else:
+        objects = query.all()
+        keys = [(getattr(obj, sort_column.key), obj.id) for obj in objects]
+        data = [obj.to_dict() for obj in objects]
+
+    if not paged:
+        return data
+
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        next_cursor = encode_cursor(*keys[limit - 1])
+
+    return {
+        'data': data,
+        'next_cursor': next_cursor,
+        'limit': limit
+    }
@@ -0,0 +1,215 @@
+"""
+Order building shared by the single and batch purchase order endpoints
+
+Referenced items and suppliers are resolved with one IN query per chunk,
+lines and totals are computed in a single pass, and batch inserts go
+through executemany inside the caller's transaction.
+"""
+
+from datetime import datetime
+from sqlalchemy import select, insert
+from backend.app import db
+from backend.app.models import Item, Supplier, PurchaseOrder, PurchaseOrderItem
+from backend.app.reports import rollups
+
+# Keep IN lists well below SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
+
+MAX_BATCH_ORDERS = 1000
+
+
+def chunks(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def load_item_factors(item_ids):
+    """
+    Look up co2_per_unit for a set of item ids.
+
+    Returns:
+        dict: item_id -> co2_per_unit (unknown ids are missing)
+    """
+
+    factors = {}
+    for chunk in chunks(set(item_ids)):
+        factors.update(db.session.execute(
+            select(Item.id, Item.co2_per_unit).where(Item.id.in_(chunk))
+        ).all())
+    return factors
+
+
+def load_supplier_ids(supplier_ids):
+    """Return the subset of supplier ids that exist."""
+    found = set()
+    for chunk in chunks(set(supplier_ids)):
+        found.update(db.session.execute(
+            select(Supplier.id).where(Supplier.id.in_(chunk))
+        ).scalars())
+    return found
+
+
+def line_item_ids(items_data):
+    """Integer item ids referenced by request lines (anything else is reported by build_lines)."""
+    if not isinstance(items_data, list):
+        return []
+    return [
+        line.get('item_id') for line in items_data
+        if isinstance(line, dict) and is_integer(line.get('item_id'))
+    ]
+
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def build_lines(items_data, factors):
+    """
+    Compute order lines and totals from request data.
+
+    Args:
+        items_data (list): [{'item_id', 'quantity', 'unit_price'}, ...]
+        factors (dict): item_id -> co2_per_unit from load_item_factors
+
+    Returns:
+        (lines, total_amount, total_co2, errors) where lines are dicts
+        ready for PurchaseOrderItem and errors is a list of messages
+    """
+
+    lines = []
+    errors = []
+    total_amount = 0
+    total_co2 = 0
+
+    if not isinstance(items_data, list):
+        return lines, total_amount, total_co2, ["Items must be a list"]
+
+    for index, item_data in enumerate(items_data):
+        if not isinstance(item_data, dict):
+            errors.append(f"Line {index} must be an object")
+            continue
+
+        item_id = item_data.get('item_id')
+        quantity = item_data.get('quantity', 1)
+        unit_price = item_data.get('unit_price', 0)
+
+        if not is_integer(item_id):
+            errors.append(f"Line {index}: item_id must be an integer")
+            continue
+        if item_id not in factors:
+            errors.append(f"Line {index}: unknown item {item_id}")
+            continue
+        if not is_integer(quantity) or quantity <= 0:
+            errors.append(f"Line {index}: quantity must be a positive integer")
+            continue
+        if not is_number(unit_price) or unit_price < 0:
+            errors.append(f"Line {index}: unit_price must be a non-negative number")
+            continue
+
+        line_co2 = quantity * factors[item_id]
+        lines.append({
+            'item_id': item_id,
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'line_co2': line_co2
+        })
+        total_amount += quantity * unit_price
+        total_co2 += line_co2
+
+    return lines, total_amount, total_co2, errors
+
+
+def create_orders(orders_data, user_id):
+    """
+    Validate and insert many purchase orders in the current transaction.
+
+    Orders with errors are skipped and reported; the valid ones are
+    inserted with two executemany statements (orders, then lines) and
+    added to the emission rollups. The caller commits.
+
+    Returns:
+        (created, errors): created is [{'index', 'id'}], errors is
+        [{'index', 'errors': [...]}]
+    """
+
+    orders = [order for order in orders_data if isinstance(order, dict)]
+    factors = load_item_factors(
+        item_id for order in orders for item_id in line_item_ids(order.get('items'))
+    )
+    suppliers = load_supplier_ids(
+        order.get('supplier_id') for order in orders
+        if is_integer(order.get('supplier_id'))
+    )
+
+    now = datetime.utcnow()
+    valid = []
+    errors = []
+
+    for index, data in enumerate(orders_data):
+        if not isinstance(data, dict):
+            errors.append({'index': index, 'errors': ["Order must be an object"]})
+            continue
+        if not data.get('supplier_id') or not data.get('items'):
+            errors.append({'index': index, 'errors': ["Supplier ID and items required"]})
+            continue
+        if not is_integer(data['supplier_id']):
+            errors.append({'index': index, 'errors': ["Supplier ID must be an integer"]})
+            continue
+        if data['supplier_id'] not in suppliers:
+            errors.append({'index': index, 'errors': [f"Unknown supplier {data['supplier_id']}"]})
+            continue
+        status = data.get('status', 'draft')
+        if status not in PurchaseOrder.STATUSES:
+            errors.append({'index': index, 'errors': [f"Status must be one of {', '.join(PurchaseOrder.STATUSES)}"]})
+            continue
+
+        lines, total_amount, total_co2, line_errors = build_lines(data['items'], factors)
+
+        if line_errors:
+            errors.append({'index': index, 'errors': line_errors})
+            continue
+
+        valid.append((index, {
+            'supplier_id': data['supplier_id'],
+            'created_by_user_id': user_id,
+            'status': status,
+            'order_date': now,
+            'total_amount': total_amount,
+            'total_co2': total_co2,
+            'created_at': now
+        }, lines))
+
+    if not valid:
+        return [], errors
+
+    order_ids = db.session.execute(
+        insert(PurchaseOrder).returning(PurchaseOrder.id, sort_by_parameter_order=True),
+        [order for _, order, _ in valid]
+    ).scalars().all()
+
+    all_lines = []
+    for order_id, (_, _, lines) in zip(order_ids, valid):
+        for line in lines:
+            line['purchase_order_id'] = order_id
+        all_lines.extend(lines)
+
+    db.session.execute(insert(PurchaseOrderItem), all_lines)
+
+    rollups.apply_item_lines(
+        (line['item_id'], line['quantity'], line['line_co2']) for line in all_lines
+    )
+    rollups.apply_supplier_orders(
+        (order['supplier_id'], order['order_date'], order['total_co2'], order['total_amount'])
+        for _, order, _ in valid
+    )
+
+    created = [
+        {'index': index, 'id': order_id}
+        for order_id, (index, _, _) in zip(order_ids, valid)
+    ]
+    return created, errors
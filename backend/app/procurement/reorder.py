@@ -0,0 +1,177 @@
+"""
+Reorder engine - suggested quantities and suppliers for low-stock items
+
+Low-stock items come from the ix_items_low_stock partial index. Their
+order history is aggregated per (item, supplier) in one grouped query per
+chunk of items:
+
+    demand    quantity ordered over the last lookback_days, per day, on
+              orders that are no longer open
+    quantity  enough to reach reorder_level plus cover_days of demand,
+              less what open (draft or submitted) orders already bring;
+              items those orders fully cover are left out
+    supplier  lowest average unit price (recent orders when there are
+              any, all orders otherwise), then lowest CO2 per unit
+
+draft_orders turns the suggestions into one draft order per supplier
+through batch.create_orders.
+"""
+
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case, and_, not_
+from backend.app import db
+from backend.app.models import Item, PurchaseOrder, PurchaseOrderItem
+from backend.app.procurement.batch import create_orders, chunks
+from backend.app.reports.rollups import OPEN_ORDER_STATUSES
+
+REORDER_LOOKBACK_DAYS = 90
+REORDER_COVER_DAYS = 30
+
+
+def _supplier_history(item_ids, since):
+    """
+    Order history of some items per supplier.
+
+    Returns:
+        dict: item_id -> list of dicts with supplier_id, recent_quantity,
+        recent_amount, quantity, amount, co2, recent_demand, open_quantity
+    """
+
+    recent = PurchaseOrder.order_date >= since
+    is_open = PurchaseOrder.status.in_(OPEN_ORDER_STATUSES)
+    history = {}
+    for chunk in chunks(item_ids):
+        rows = db.session.execute(
+            select(
+                PurchaseOrderItem.item_id,
+                PurchaseOrder.supplier_id,
+                func.sum(case((recent, PurchaseOrderItem.quantity), else_=0)),
+                func.sum(case((recent, PurchaseOrderItem.quantity * PurchaseOrderItem.unit_price), else_=0.0)),
+                func.sum(PurchaseOrderItem.quantity),
+                func.sum(PurchaseOrderItem.quantity * PurchaseOrderItem.unit_price),
+                func.sum(PurchaseOrderItem.line_co2),
+                func.sum(case((and_(recent, not_(is_open)), PurchaseOrderItem.quantity), else_=0)),
+                func.sum(case((is_open, PurchaseOrderItem.quantity), else_=0))
+            ).join(
+                PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+            ).where(
+                PurchaseOrderItem.item_id.in_(chunk)
+            ).group_by(PurchaseOrderItem.item_id, PurchaseOrder.supplier_id)
+        )
+        for item_id, supplier_id, recent_qty, recent_amount, quantity, amount, co2, demand, open_qty in rows:
+            history.setdefault(item_id, []).append({
+                'supplier_id': supplier_id,
+                'recent_quantity': recent_qty or 0,
+                'recent_amount': recent_amount or 0.0,
+                'quantity': quantity or 0,
+                'amount': amount or 0.0,
+                'co2': co2 or 0.0,
+                'recent_demand': demand or 0,
+                'open_quantity': open_qty or 0
+            })
+    return history
+
+
+def _preferred_supplier(suppliers):
+    """Cheapest supplier by average unit price, then by CO2 per unit."""
+    candidates = []
+    for row in suppliers:
+        if row['recent_quantity'] > 0:
+            price = row['recent_amount'] / row['recent_quantity']
+        elif row['quantity'] > 0:
+            price = row['amount'] / row['quantity']
+        else:
+            continue
+        co2 = row['co2'] / row['quantity'] if row['quantity'] else 0.0
+        candidates.append((price, co2, row['supplier_id']))
+    return min(candidates) if candidates else None
+
+
+def suggest_reorders(criteria=(), lookback_days=REORDER_LOOKBACK_DAYS, cover_days=REORDER_COVER_DAYS):
+    """
+    Reorder suggestions for active items at or below their reorder level.
+
+    Args:
+        criteria: extra filters on Item (e.g. category, id list)
+        lookback_days (int): history window for demand and pricing
+        cover_days (int): days of demand to order on top of reorder_level
+
+    Returns:
+        list of dicts ordered by item id; supplier_id is None when the
+        item has never been ordered. Items whose open orders already
+        cover the target are left out.
+    """
+
+    items = db.session.execute(
+        select(Item.id, Item.sku, Item.name, Item.stock, Item.reorder_level, Item.co2_per_unit)
+        .where(*Item.low_stock_criteria(), *criteria)
+        .order_by(Item.id)
+    ).all()
+    if not items:
+        return []
+
+    history = _supplier_history([item.id for item in items],
+                                datetime.utcnow() - timedelta(days=lookback_days))
+
+    suggestions = []
+    for item in items:
+        suppliers = history.get(item.id, [])
+        # Open orders are supply on the way, not demand
+        daily_demand = sum(row['recent_demand'] for row in suppliers) / lookback_days
+        target = item.reorder_level + math.ceil(daily_demand * cover_days)
+        on_order = sum(row['open_quantity'] for row in suppliers)
+        needed = target - item.stock - on_order
+        if on_order and needed <= 0:
+            continue
+        quantity = max(needed, 1)
+        preferred = _preferred_supplier(suppliers)
+
+        suggestions.append({
+            'item_id': item.id,
+            'sku': item.sku,
+            'name': item.name,
+            'stock': item.stock,
+            'reorder_level': item.reorder_level,
+            'daily_demand': round(daily_demand, 3),
+            'on_order': on_order,
+            'suggested_quantity': quantity,
+            'supplier_id': preferred[2] if preferred else None,
+            'unit_price': round(preferred[0], 4) if preferred else None,
+            'estimated_co2': round(quantity * item.co2_per_unit, 3)
+        })
+
+    return suggestions
+
+
+def draft_orders(suggestions, user_id):
+    """
+    Create one draft purchase order per preferred supplier.
+
+    Runs in the caller's transaction; the caller commits.
+
+    Returns:
+        (created, errors, skipped): created/errors as from
+        batch.create_orders, skipped lists item ids without a supplier
+    """
+
+    by_supplier = {}
+    skipped = []
+    for suggestion in suggestions:
+        if suggestion['supplier_id'] is None:
+            skipped.append(suggestion['item_id'])
+            continue
+        by_supplier.setdefault(suggestion['supplier_id'], []).append({
+            'item_id': suggestion['item_id'],
+            'quantity': suggestion['suggested_quantity'],
+            'unit_price': suggestion['unit_price']
+        })
+
+    if not by_supplier:
+        return [], [], skipped
+
+    created, errors = create_orders([
+        {'supplier_id': supplier_id, 'status': 'draft', 'items': lines}
+        for supplier_id, lines in sorted(by_supplier.items())
+    ], user_id)
+    return created, errors, skipped
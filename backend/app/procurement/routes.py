@@ -1,101 +1,321 @@
 # backend/app/procurement/routes.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend.app.auth.decorators import require_roles
+from backend.app.generations import conditional
+from sqlalchemy import select
+from sqlalchemy.orm.exc import StaleDataError
 from backend.app import db
-from backend.app.models import User, PurchaseOrder, PurchaseOrderItem, Item
+from backend.app.models import PurchaseOrder, PurchaseOrderItem, Item, Supplier
+from backend.app.reports import rollups
+from backend.app.pagination import paginate, date_range_criteria
+from backend.app.serializers import SERIALIZERS, ORDERS_WITHOUT_ITEMS
+from backend.app.exports import stream_export, EXPORT_FORMATS
+from backend.app.procurement import batch, reorder
+from backend.app.items import inventory
 
 procurement_bp = Blueprint('procurement', __name__)
 
+ORDER_SORTS = {
+    'id': PurchaseOrder.id,
+    'order_date': PurchaseOrder.order_date,
+    'total_co2': PurchaseOrder.total_co2,
+    'total_amount': PurchaseOrder.total_amount,
+    'created_at': PurchaseOrder.created_at
+}
+
+
+def order_criteria(args):
+    """
+    Filters shared by the order list and the order/emission exports:
+    ?status=&supplier_id=&from=&to= (on order_date)
+    """
+    criteria = []
+    
+    if args.get('status'):
+        criteria.append(PurchaseOrder.status == args['status'])
+    
+    if args.get('supplier_id'):
+        criteria.append(PurchaseOrder.supplier_id == int(args['supplier_id']))
+    
+    return criteria + date_range_criteria(PurchaseOrder.order_date, args)
+
+
+def _set_order_lines(order, items_data):
+    """
+    Build order lines from request data and recompute the order totals
+    
+    Raises:
+        ValueError: listing every invalid line
+    """
+    factors = batch.load_item_factors(batch.line_item_ids(items_data))
+    lines, total_amount, total_co2, errors = batch.build_lines(items_data, factors)
+    
+    if errors:
+        raise ValueError('; '.join(errors))
+    
+    for line in lines:
+        order.items.append(PurchaseOrderItem(**line))
+    
+    order.total_amount = total_amount
+    order.total_co2 = total_co2
+    
+    rollups.apply_item_lines(
+        (line['item_id'], line['quantity'], line['line_co2']) for line in lines
+    )
+
 @procurement_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional('purchase_orders', 'purchase_order_items', 'suppliers', 'items')
 def get_purchase_orders():
-    """GET /api/purchase-orders"""
-    orders = PurchaseOrder.query.all()
-    return jsonify([o.to_dict() for o in orders]), 200
+    """
+    GET /api/purchase-orders
+    Query: ?status=&supplier_id=&from=&to=&include=items&limit=&cursor=&sort=&order=&fields=
+    
+    Line items are only serialized with include=items.
+    """
+    include_items = 'items' in request.args.get('include', '').split(',')
+    
+    try:
+        query = PurchaseOrder.query.filter(*order_criteria(request.args))
+        
+        return jsonify(paginate(
+            query, PurchaseOrder, ORDER_SORTS,
+            serializer=SERIALIZERS[PurchaseOrder] if include_items else ORDERS_WITHOUT_ITEMS
+        )), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-@procurement_bp.route('', methods=['POST'])
+@procurement_bp.route('/export', methods=['GET'])
 @jwt_required()
+def export_purchase_orders():
+    """
+    GET /api/purchase-orders/export?format=csv|ndjson
+    Streams one row per order line; accepts the list endpoint filters.
+    """
+    fmt = request.args.get('format', 'csv')
+    
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Format must be csv or ndjson"}), 400
+    
+    try:
+        criteria = order_criteria(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    stmt = select(
+        PurchaseOrder.id.label('order_id'),
+        PurchaseOrder.status,
+        PurchaseOrder.order_date,
+        PurchaseOrder.supplier_id,
+        Supplier.name.label('supplier_name'),
+        PurchaseOrder.total_amount,
+        PurchaseOrder.total_co2,
+        PurchaseOrderItem.id.label('line_id'),
+        PurchaseOrderItem.item_id,
+        Item.sku,
+        Item.name.label('item_name'),
+        PurchaseOrderItem.quantity,
+        PurchaseOrderItem.unit_price,
+        PurchaseOrderItem.line_co2
+    ).select_from(PurchaseOrder).join(
+        PurchaseOrderItem, PurchaseOrderItem.purchase_order_id == PurchaseOrder.id
+    ).outerjoin(
+        Supplier, Supplier.id == PurchaseOrder.supplier_id
+    ).outerjoin(
+        Item, Item.id == PurchaseOrderItem.item_id
+    ).where(*criteria).order_by(PurchaseOrder.id, PurchaseOrderItem.id)
+    
+    return stream_export(stmt, fmt, 'purchase_orders')
+
+@procurement_bp.route('', methods=['POST'])
+@require_roles('admin', 'procurement_manager')
 def create_purchase_order():
     """POST /api/purchase-orders"""
     user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role not in ['admin', 'procurement_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
     
     data = request.get_json()
     
     if not data.get('supplier_id') or not data.get('items'):
         return jsonify({"error": "Supplier ID and items required"}), 400
     
+    if not batch.is_integer(data['supplier_id']):
+        return jsonify({"error": "Supplier ID must be an integer"}), 400
+    
+    if data.get('status', 'draft') not in PurchaseOrder.STATUSES:
+        return jsonify({"error": f"Status must be one of {', '.join(PurchaseOrder.STATUSES)}"}), 400
+    
     order = PurchaseOrder(
         supplier_id=data.get('supplier_id'),
         created_by_user_id=user_id,
         status=data.get('status', 'draft')
     )
     
-    total_amount = 0
-    total_co2 = 0
-    
-    for item_data in data.get('items', []):
-        item = Item.query.get(item_data['item_id'])
-        
-        if not item:
-            continue
-        
-        quantity = item_data.get('quantity', 1)
-        unit_price = item_data.get('unit_price', 0)
-        line_co2 = quantity * item.co2_per_unit
-        
-        po_item = PurchaseOrderItem(
-            item_id=item.id,
-            quantity=quantity,
-            unit_price=unit_price,
-            line_co2=line_co2
-        )
-        
-        order.items.append(po_item)
-        total_amount += quantity * unit_price
-        total_co2 += line_co2
-    
-    order.total_amount = total_amount
-    order.total_co2 = total_co2
+    try:
+        _set_order_lines(order, data.get('items', []))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     db.session.add(order)
+    db.session.flush()
+    rollups.apply_supplier_order(order)
     db.session.commit()
     
     return jsonify(order.to_dict()), 201
 
+@procurement_bp.route('/batch', methods=['POST'])
+@require_roles('admin', 'procurement_manager')
+def create_purchase_orders_batch():
+    """
+    POST /api/purchase-orders/batch
+    Body: {"orders": [{"supplier_id": 1, "status": "draft", "items": [...]}, ...]}
+    
+    Valid orders are created in one transaction; invalid ones are
+    reported by their index in the request.
+    """
+    user_id = int(get_jwt_identity())
+    
+    data = request.get_json()
+    orders = data.get('orders') if isinstance(data, dict) else None
+    
+    if not orders or not isinstance(orders, list):
+        return jsonify({"error": "Orders required"}), 400
+    
+    if len(orders) > batch.MAX_BATCH_ORDERS:
+        return jsonify({"error": f"At most {batch.MAX_BATCH_ORDERS} orders per batch"}), 400
+    
+    created, errors = batch.create_orders(orders, user_id)
+    db.session.commit()
+    
+    return jsonify({
+        "created": created,
+        "errors": errors
+    }), 201 if created else 400
+
+def _reorder_params(args):
+    """Item filters and windows shared by the reorder endpoints."""
+    criteria = []
+    if args.get('category'):
+        criteria.append(Item.category == args['category'])
+    item_ids = args.get('item_ids')
+    if item_ids is not None:
+        if not isinstance(item_ids, list) or not all(isinstance(i, int) for i in item_ids):
+            raise ValueError("item_ids must be a list of integers")
+        criteria.append(Item.id.in_(item_ids))
+    
+    lookback_days = int(args.get('lookback_days', reorder.REORDER_LOOKBACK_DAYS))
+    cover_days = int(args.get('cover_days', reorder.REORDER_COVER_DAYS))
+    if lookback_days < 1 or cover_days < 0:
+        raise ValueError("lookback_days must be >= 1 and cover_days >= 0")
+    return criteria, lookback_days, cover_days
+
+@procurement_bp.route('/reorder-suggestions', methods=['GET'])
+@jwt_required()
+def get_reorder_suggestions():
+    """
+    GET /api/purchase-orders/reorder-suggestions
+    Query: ?category=&lookback_days=90&cover_days=30
+    Suggested quantity and preferred supplier for every low-stock item
+    """
+    try:
+        criteria, lookback_days, cover_days = _reorder_params(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(reorder.suggest_reorders(criteria, lookback_days, cover_days)), 200
+
+@procurement_bp.route('/reorder', methods=['POST'])
+@require_roles('admin', 'procurement_manager')
+def draft_reorders():
+    """
+    POST /api/purchase-orders/reorder
+    Body (all optional): {"item_ids": [...], "category": "", "lookback_days": 90, "cover_days": 30}
+    
+    Drafts one purchase order per preferred supplier for the low-stock
+    items; items never ordered before are returned in "skipped".
+    """
+    user_id = int(get_jwt_identity())
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be an object"}), 400
+    
+    try:
+        criteria, lookback_days, cover_days = _reorder_params(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    suggestions = reorder.suggest_reorders(criteria, lookback_days, cover_days)
+    created, errors, skipped = reorder.draft_orders(suggestions, user_id)
+    db.session.commit()
+    
+    return jsonify({
+        "created": created,
+        "errors": errors,
+        "skipped": skipped
+    }), 201 if created else 200
+
 @procurement_bp.route('/<int:order_id>', methods=['GET'])
 @jwt_required()
+@conditional('purchase_orders', 'purchase_order_items', 'suppliers', 'items')
 def get_purchase_order(order_id):
     """GET /api/purchase-orders/<id>"""
-    order = PurchaseOrder.query.get_or_404(order_id)
+    order = PurchaseOrder.query.options(*PurchaseOrder.load_options()).get_or_404(order_id)
     return jsonify(order.to_dict()), 200
 
 @procurement_bp.route('/<int:order_id>', methods=['PUT'])
-@jwt_required()
+@require_roles('admin', 'procurement_manager')
 def update_purchase_order(order_id):
-    """PUT /api/purchase-orders/<id>"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role not in ['admin', 'procurement_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
+    """
+    PUT /api/purchase-orders/<id>
     
+    Optional "version" in the body must match the order's current version
+    (returned by every order endpoint); otherwise the update is rejected
+    with 409. Concurrent updates of the same order are rejected the same
+    way, so a double-submitted receipt adds stock only once.
+    """
     order = PurchaseOrder.query.get_or_404(order_id)
     data = request.get_json()
     
-    new_status = data.get('status', order.status)
+    if data.get('version') is not None and data['version'] != order.version:
+        return jsonify({"error": "Order was modified by another request", "version": order.version}), 409
     
-    # If status changes to 'received', update item stock
-    if new_status == 'received' and order.status != 'received':
-        for po_item in order.items:
-            item = Item.query.get(po_item.item_id)
-            if item:
-                item.stock += po_item.quantity
+    new_status = data.get('status', order.status)
+    if new_status not in PurchaseOrder.STATUSES:
+        return jsonify({"error": f"Status must be one of {', '.join(PurchaseOrder.STATUSES)}"}), 400
     
-    order.status = new_status
-    db.session.commit()
+    try:
+        # Line items can be replaced until the order has been received
+        if data.get('items') is not None:
+            if order.status == 'received':
+                return jsonify({"error": "Received orders cannot be changed"}), 400
+            
+            rollups.apply_item_lines(
+                ((line.item_id, line.quantity, line.line_co2) for line in order.items),
+                sign=-1
+            )
+            rollups.apply_supplier_order(order, sign=-1)
+            order.items = []
+            try:
+                _set_order_lines(order, data['items'])
+            except ValueError as e:
+                db.session.rollback()
+                return jsonify({"error": str(e)}), 400
+            rollups.apply_supplier_order(order)
+        
+        receiving = new_status == 'received' and order.status != 'received'
+        order.status = new_status
+        
+        # The flush runs UPDATE ... WHERE version = ?; it fails if another
+        # request changed the order since it was loaded
+        db.session.flush()
+        
+        if receiving:
+            inventory.receive_order(order.id, int(get_jwt_identity()))
+        
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"error": "Order was modified by another request"}), 409
     
     return jsonify(order.to_dict()), 200
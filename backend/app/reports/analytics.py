@@ -0,0 +1,202 @@
+"""
+Supplier substitution analytics - which items could be bought from a
+lower-emission supplier at an acceptable price
+
+The purchase history is reduced to a sparse item x supplier matrix (one
+entry per pair that has been ordered) holding the observed CO2 per unit,
+price per unit and quantity. For every entry the engine finds, within the
+same item, the supplier with the lowest CO2 per unit whose price is at
+most (1 + max_price_delta) times the entry's price, and values the switch
+as quantity x CO2 difference. Everything runs as NumPy array operations,
+so the cost grows with the number of observed pairs, not items x suppliers.
+
+The matrix is cached on the app and rebuilt when the order tables'
+generation counters move.
+"""
+
+import threading
+from dataclasses import dataclass
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, func
+from backend.app import db
+from backend.app.database import read_engine
+from backend.app.generations import current_generations
+from backend.app.models import PurchaseOrder, PurchaseOrderItem
+
+# Default accepted price increase when switching supplier (0.05 = +5%)
+DEFAULT_MAX_PRICE_DELTA = 0.05
+
+MATRIX_TABLES = ('purchase_orders', 'purchase_order_items')
+
+_matrix_lock = threading.Lock()
+
+
+@dataclass
+class SubstitutionMatrix:
+    """Observed item x supplier pairs in COO form, sorted by (item, price)"""
+    item_ids: np.ndarray        # int64, one per entry
+    supplier_ids: np.ndarray    # int64
+    co2_per_unit: np.ndarray    # float64
+    price_per_unit: np.ndarray  # float64
+    quantity: np.ndarray        # float64
+    group: np.ndarray           # dense item index, non-decreasing
+
+    def __len__(self):
+        return len(self.item_ids)
+
+
+def build_matrix(rows):
+    """
+    Build the matrix from (item_id, supplier_id, quantity, co2, amount)
+    rows, one per ordered pair.
+    """
+
+    data = np.asarray(rows, dtype=np.float64).reshape(-1, 5)
+    data = data[data[:, 2] > 0]
+
+    item_ids = data[:, 0].astype(np.int64)
+    supplier_ids = data[:, 1].astype(np.int64)
+    quantity = data[:, 2]
+    co2_per_unit = data[:, 3] / quantity
+    price_per_unit = data[:, 4] / quantity
+
+    order = np.lexsort((price_per_unit, item_ids))
+    item_ids = item_ids[order]
+    _, group = np.unique(item_ids, return_inverse=True)
+
+    return SubstitutionMatrix(
+        item_ids=item_ids,
+        supplier_ids=supplier_ids[order],
+        co2_per_unit=co2_per_unit[order],
+        price_per_unit=price_per_unit[order],
+        quantity=quantity[order],
+        group=group.astype(np.int64)
+    )
+
+
+def load_matrix():
+    """Aggregate the order lines per (item, supplier) and build the matrix."""
+    stmt = select(
+        PurchaseOrderItem.item_id,
+        PurchaseOrder.supplier_id,
+        func.sum(PurchaseOrderItem.quantity),
+        func.sum(PurchaseOrderItem.line_co2),
+        func.sum(PurchaseOrderItem.quantity * PurchaseOrderItem.unit_price)
+    ).join(
+        PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+    ).group_by(PurchaseOrderItem.item_id, PurchaseOrder.supplier_id)
+
+    with read_engine(db).connect() as conn:
+        rows = conn.execute(stmt).all()
+    return build_matrix(rows)
+
+
+def cached_matrix():
+    """Matrix for the current order history, rebuilt only after order writes."""
+    generations, _ = current_generations(MATRIX_TABLES)
+    key = tuple(generations)
+
+    with _matrix_lock:
+        cached_key, matrix = current_app.extensions.get('substitution_matrix', (None, None))
+        if cached_key != key:
+            matrix = load_matrix()
+            current_app.extensions['substitution_matrix'] = (key, matrix)
+    return matrix
+
+
+def best_substitutes(matrix, max_price_delta=DEFAULT_MAX_PRICE_DELTA):
+    """
+    For every entry, the lowest-CO2 supplier of the same item within the
+    price limit.
+
+    Returns:
+        (index of the best entry, CO2 saved per unit) - the best entry is
+        the entry itself when nothing cleaner is affordable
+    """
+
+    n = len(matrix)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    group = matrix.group
+    co2 = matrix.co2_per_unit
+    price = matrix.price_per_unit
+
+    # Running minimum of CO2 along (item, price) order, reset per item:
+    # shifting each item down by more than the whole CO2 range keeps
+    # earlier items from ever winning
+    span = float(co2.max() - co2.min()) + 1.0
+    shifted = co2 - group * span
+    running = np.minimum.accumulate(shifted)
+    positions = np.where(shifted == running, np.arange(n), 0)
+    argmin = np.maximum.accumulate(positions)
+
+    # Last entry of the same item priced within the limit: search on
+    # item index + price shifted to start at 0 and scaled into [0, 1), so
+    # zero and negative prices keep the keys sorted. The result is also
+    # clamped to the item's own entries, from the entry itself to the last.
+    limit = price * (1.0 + max_price_delta)
+    low = float(min(price.min(), limit.min()))
+    scale = (float(max(price.max(), limit.max())) - low) * 2.0 + 1.0
+    keys = group + (price - low) / scale
+    targets = group + (limit - low) / scale
+    group_last = np.searchsorted(group, group, side='right') - 1
+    last = np.searchsorted(keys, targets, side='right') - 1
+    last = np.clip(last, np.arange(n), group_last)
+
+    best = argmin[last]
+    saved = np.maximum(co2 - co2[best], 0.0)
+    best = np.where(saved > 0, best, np.arange(n))
+    return best, np.where(saved > 0, saved, 0.0)
+
+
+def rank_substitutions(matrix, max_price_delta=DEFAULT_MAX_PRICE_DELTA, limit=3):
+    """
+    Rank items by the CO2 a supplier switch would save.
+
+    Returns:
+        (list of dicts per item with its substitutions, total CO2 of the
+        history, total potential savings)
+    """
+
+    best, saved_per_unit = best_substitutes(matrix, max_price_delta)
+    saved = saved_per_unit * matrix.quantity
+    total_co2 = float((matrix.co2_per_unit * matrix.quantity).sum())
+
+    if not len(matrix) or not saved.any():
+        return [], total_co2, 0.0
+
+    groups = int(matrix.group[-1]) + 1
+    item_savings = np.bincount(matrix.group, weights=saved, minlength=groups)
+    item_co2 = np.bincount(matrix.group, weights=matrix.co2_per_unit * matrix.quantity, minlength=groups)
+
+    candidates = np.flatnonzero(item_savings > 0)
+    top = candidates[np.argsort(-item_savings[candidates], kind='stable')[:limit]]
+
+    ranked = []
+    for g in top:
+        start, end = np.searchsorted(matrix.group, [g, g + 1])
+        entries = start + np.flatnonzero(saved[start:end] > 0)
+        entries = entries[np.argsort(-saved[entries], kind='stable')]
+        first = entries[0]
+        ranked.append({
+            'item_id': int(matrix.item_ids[first]),
+            'total_co2': float(item_co2[g]),
+            'potential_savings': float(item_savings[g]),
+            'substitutions': [
+                {
+                    'from_supplier_id': int(matrix.supplier_ids[e]),
+                    'to_supplier_id': int(matrix.supplier_ids[best[e]]),
+                    'quantity': float(matrix.quantity[e]),
+                    'co2_saved': float(saved[e]),
+                    'price_delta_pct': float(
+                        (matrix.price_per_unit[best[e]] / matrix.price_per_unit[e] - 1.0) * 100
+                        if matrix.price_per_unit[e] else 0.0
+                    )
+                }
+                for e in entries
+            ]
+        })
+
+    return ranked, total_co2, float(saved.sum())
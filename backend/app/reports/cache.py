@@ -0,0 +1,188 @@
+"""
+Report result cache - bounded LRU keyed by endpoint, query parameters and
+the generations of the tables the report reads
+
+The generations are read before the report is computed, so a report that
+overlaps a commit is stored under the old generations and never served
+afterwards. Each entry is also tagged with its tables; when a session
+commits writes to one of them, every entry carrying that tag is dropped
+(see the after_commit hook below) so outdated entries do not fill the cache.
+
+Backends (REPORT_CACHE_BACKEND):
+    'memory'  in-process OrderedDict, per worker
+    'sqlite'  a local SQLite file shared by every worker on the host
+    None      caching disabled
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, has_app_context, request, Response
+from sqlalchemy import event
+from backend.app.database import RoutingSession
+from backend.app.generations import COMMITTED_KEY, current_generations
+
+
+class MemoryBackend:
+    """In-process LRU cache"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, tags):
+        with self._lock:
+            self._entries[key] = (frozenset(tags), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables):
+        tables = set(tables)
+        with self._lock:
+            for key in [k for k, (tags, _) in self._entries.items() if tags & tables]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """LRU cache in a local SQLite file, shared between worker processes"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_cache ("
+                "key TEXT PRIMARY KEY, tags TEXT NOT NULL, "
+                "value BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_report_cache_last_access "
+                "ON report_cache (last_access)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM report_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE report_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def set(self, key, value, tags):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO report_cache (key, tags, value, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, ',' + ','.join(sorted(tags)) + ',', value, time.time())
+            )
+            conn.execute(
+                "DELETE FROM report_cache WHERE key IN ("
+                "SELECT key FROM report_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def invalidate(self, tables):
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM report_cache WHERE tags LIKE ?",
+                [(f'%,{table},%',) for table in tables]
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM report_cache")
+
+
+def init_report_cache(app):
+    """Create the configured backend and store it in app.extensions."""
+    backend = app.config.get('REPORT_CACHE_BACKEND')
+    size = app.config.get('REPORT_CACHE_SIZE', 256)
+
+    if backend == 'memory':
+        cache = MemoryBackend(size)
+    elif backend == 'sqlite':
+        cache = SQLiteBackend(app.config['REPORT_CACHE_PATH'], size)
+    else:
+        cache = None
+
+    app.extensions['report_cache'] = cache
+    return cache
+
+
+def get_report_cache():
+    """Cache backend of the current app (None when disabled)."""
+    return current_app.extensions.get('report_cache')
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_reports(session):
+    tables = session.info.pop(COMMITTED_KEY, None)
+    if tables and has_app_context():
+        cache = get_report_cache()
+        if cache is not None:
+            cache.invalidate(tables)
+
+
+def cached_report(*tables):
+    """
+    Serve a report from the cache, keyed by endpoint, query string and
+    the generations of its tables.
+
+    Args:
+        tables: tables the report reads; a commit to any of them makes
+            the cached result unreachable and drops it
+
+    Only 200 responses are cached. Put it below the auth decorator.
+    """
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            cache = get_report_cache()
+            if cache is None:
+                return fn(*args, **kwargs)
+
+            params = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+            generations, _ = current_generations(tables)
+            key = f"{request.endpoint}:{sorted(kwargs.items())}?{params}|{','.join(map(str, generations))}"
+
+            body = cache.get(key)
+            if body is not None:
+                return Response(body, mimetype='application/json')
+
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(key, response.get_data(), tables)
+            return response
+
+        return decorator
+
+    return wrapper
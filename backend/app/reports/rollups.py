@@ -0,0 +1,279 @@
+"""
+Emission rollups - precomputed totals that the reports read from
+
+The rollup rows are written in the same transaction as the order lines
+they summarise, so a report never sees an order without its emissions.
+
+The dashboard KPI counters (kpi_counters) are kept by SQLite triggers
+instead (migration 10): stock, status and totals change through many
+write paths, including Core UPDATEs and upserts, and a trigger sees all
+of them inside the writing transaction.
+"""
+
+from datetime import datetime, date
+from sqlalchemy import func, insert, select, delete, literal, DateTime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from backend.app import db
+from backend.app.models import (
+    Item, Supplier, ItemEmission, KpiCounter, PurchaseOrder, PurchaseOrderItem, SupplierEmissionBucket
+)
+
+# Bucket sizes kept in supplier_emission_buckets
+GRANULARITIES = ('month', 'quarter')
+
+
+def period_start(value, granularity):
+    """
+    First day of the month or quarter that contains a date.
+
+    Args:
+        value (date or datetime): any day inside the period
+        granularity (str): 'month' or 'quarter'
+
+    Returns:
+        date
+    """
+
+    if granularity == 'quarter':
+        return date(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+    return date(value.year, value.month, 1)
+
+
+def period_label(start, granularity):
+    """Human readable period name, e.g. '2025-03' or '2025-Q1'."""
+    if granularity == 'quarter':
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return start.strftime('%Y-%m')
+
+
+def _upsert_supplier_buckets(rows):
+    """Add bucket deltas onto supplier_emission_buckets."""
+    if not rows:
+        return
+
+    stmt = sqlite_insert(SupplierEmissionBucket)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            SupplierEmissionBucket.supplier_id,
+            SupplierEmissionBucket.granularity,
+            SupplierEmissionBucket.period_start
+        ],
+        set_={
+            'total_co2': SupplierEmissionBucket.total_co2 + stmt.excluded.total_co2,
+            'total_amount': SupplierEmissionBucket.total_amount + stmt.excluded.total_amount,
+            'order_count': SupplierEmissionBucket.order_count + stmt.excluded.order_count
+        }
+    )
+    db.session.execute(stmt, rows)
+
+
+def apply_item_lines(lines, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) order lines from the item rollup.
+
+    Args:
+        lines: iterable of (item_id, quantity, line_co2) tuples
+        sign (int): 1 when lines are created, -1 when they are removed
+    """
+
+    totals = {}
+    for item_id, quantity, line_co2 in lines:
+        row = totals.setdefault(item_id, {
+            'item_id': item_id,
+            'total_co2': 0.0,
+            'total_quantity': 0,
+            'line_count': 0,
+            'updated_at': datetime.utcnow()
+        })
+        row['total_co2'] += sign * line_co2
+        row['total_quantity'] += sign * quantity
+        row['line_count'] += sign
+
+    if not totals:
+        return
+
+    stmt = sqlite_insert(ItemEmission)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ItemEmission.item_id],
+        set_={
+            'total_co2': ItemEmission.total_co2 + stmt.excluded.total_co2,
+            'total_quantity': ItemEmission.total_quantity + stmt.excluded.total_quantity,
+            'line_count': ItemEmission.line_count + stmt.excluded.line_count,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    db.session.execute(stmt, list(totals.values()))
+
+
+def remove_item(item_id):
+    """Drop the rollup row of a deleted item."""
+    db.session.execute(delete(ItemEmission).where(ItemEmission.item_id == item_id))
+
+
+def apply_supplier_orders(orders, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) orders from the supplier buckets.
+
+    Args:
+        orders: iterable of (supplier_id, order_date, total_co2, total_amount)
+        sign (int): 1 when orders are created, -1 when they are removed
+    """
+
+    buckets = {}
+    for supplier_id, order_date, total_co2, total_amount in orders:
+        for granularity in GRANULARITIES:
+            key = (supplier_id, granularity, period_start(order_date, granularity))
+            row = buckets.setdefault(key, {
+                'supplier_id': supplier_id,
+                'granularity': granularity,
+                'period_start': key[2],
+                'total_co2': 0.0,
+                'total_amount': 0.0,
+                'order_count': 0
+            })
+            row['total_co2'] += sign * total_co2
+            row['total_amount'] += sign * total_amount
+            row['order_count'] += sign
+
+    _upsert_supplier_buckets(list(buckets.values()))
+
+
+def apply_supplier_order(order, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) one order from the supplier buckets.
+
+    The order must be flushed so that order_date is populated.
+    """
+
+    apply_supplier_orders(
+        [(order.supplier_id, order.order_date, order.total_co2, order.total_amount)],
+        sign
+    )
+
+
+def rebuild_item_emissions():
+    """
+    Recompute the whole item rollup from purchase_order_items.
+
+    Returns:
+        int: number of rollup rows written
+    """
+
+    db.session.execute(delete(ItemEmission))
+
+    totals = select(
+        PurchaseOrderItem.item_id,
+        func.sum(PurchaseOrderItem.line_co2),
+        func.sum(PurchaseOrderItem.quantity),
+        func.count(PurchaseOrderItem.id),
+        literal(datetime.utcnow(), DateTime)
+    ).group_by(PurchaseOrderItem.item_id)
+
+    result = db.session.execute(
+        insert(ItemEmission).from_select(
+            ['item_id', 'total_co2', 'total_quantity', 'line_count', 'updated_at'],
+            totals
+        )
+    )
+    db.session.commit()
+
+    return result.rowcount
+
+
+def rebuild_supplier_buckets():
+    """
+    Recompute all supplier buckets from purchase_orders.
+
+    Orders are grouped per month in SQLite; quarters are summed from the
+    monthly rows so the order table is scanned only once.
+
+    Returns:
+        int: number of bucket rows written
+    """
+
+    db.session.execute(delete(SupplierEmissionBucket))
+
+    months = db.session.execute(
+        select(
+            PurchaseOrder.supplier_id,
+            func.strftime('%Y-%m', PurchaseOrder.order_date),
+            func.sum(PurchaseOrder.total_co2),
+            func.sum(PurchaseOrder.total_amount),
+            func.count(PurchaseOrder.id)
+        ).group_by(
+            PurchaseOrder.supplier_id,
+            func.strftime('%Y-%m', PurchaseOrder.order_date)
+        )
+    )
+
+    buckets = {}
+    for supplier_id, month, total_co2, total_amount, order_count in months:
+        start = datetime.strptime(month, '%Y-%m').date()
+        for granularity in GRANULARITIES:
+            key = (supplier_id, granularity, period_start(start, granularity))
+            row = buckets.setdefault(key, {
+                'supplier_id': supplier_id,
+                'granularity': granularity,
+                'period_start': key[2],
+                'total_co2': 0.0,
+                'total_amount': 0.0,
+                'order_count': 0
+            })
+            row['total_co2'] += total_co2
+            row['total_amount'] += total_amount
+            row['order_count'] += order_count
+
+    _upsert_supplier_buckets(list(buckets.values()))
+    db.session.commit()
+
+    return len(buckets)
+
+
+# Statuses counted as open orders (also hard-coded in the migration 10 triggers)
+OPEN_ORDER_STATUSES = ('draft', 'submitted')
+
+# KPI counter name -> type returned by the dashboard
+KPIS = {
+    'items': int,
+    'low_stock_items': int,
+    'suppliers': int,
+    'open_orders': int,
+    'total_co2': float,
+}
+
+
+def read_kpis():
+    """Dashboard KPIs from kpi_counters (one read of a handful of rows)."""
+    values = dict(db.session.execute(select(KpiCounter.name, KpiCounter.value)).all())
+    return {
+        name: kind(round(values.get(name) or 0, 6))
+        for name, kind in KPIS.items()
+    }
+
+
+def rebuild_kpis():
+    """
+    Recompute the KPI counters from the tables they count, e.g. to drop
+    the rounding drift total_co2 gathers from many small changes.
+
+    Returns:
+        dict: the recomputed KPIs
+    """
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    values = {
+        'items': count(Item),
+        'low_stock_items': count(Item, *Item.low_stock_criteria()),
+        'suppliers': count(Supplier),
+        'open_orders': count(PurchaseOrder, PurchaseOrder.status.in_(OPEN_ORDER_STATUSES)),
+        'total_co2': select(func.coalesce(func.sum(PurchaseOrder.total_co2), 0.0)).scalar_subquery(),
+    }
+
+    db.session.execute(delete(KpiCounter))
+    for name, value in values.items():
+        db.session.execute(insert(KpiCounter).from_select(['name', 'value'], select(literal(name), value)))
+    db.session.commit()
+
+    return read_kpis()
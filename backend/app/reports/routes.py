@@ -1,62 +1,218 @@
 # backend/app/reports/routes.py
-from flask import Blueprint, jsonify
+import click
+from datetime import datetime
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db 
-from backend.app.models import User, Item, PurchaseOrder, PurchaseOrderItem, Supplier
-from sqlalchemy import func
+from backend.app.auth.decorators import require_roles
+from backend.app.generations import conditional
+from backend.app.jobs.runner import job_handler, accepted
+from backend.app import db
+from backend.app.models import (
+    Item, PurchaseOrder, PurchaseOrderItem, Supplier, ItemEmission, SupplierEmissionBucket
+)
+from backend.app.reports import rollups, analytics
+from backend.app.reports.cache import cached_report
+from backend.app.exports import stream_export, EXPORT_FORMATS
+from backend.app.procurement.routes import order_criteria
+from sqlalchemy import func, select
 
 reports_bp = Blueprint('reports', __name__)
 
-@reports_bp.route('/emissions-by-item', methods=['GET'])
+# Sort keys accepted by /emissions-by-item
+ITEM_EMISSION_SORTS = {
+    'item_id': Item.id,
+    'name': Item.name,
+    'sku': Item.sku,
+    'total_co2': func.coalesce(ItemEmission.total_co2, 0.0)
+}
+
+
+def _parse_period(value):
+    """Parse a YYYY-MM-DD or YYYY-MM query value into a date (or None)."""
+    if not value:
+        return None
+    if len(value) == 7:
+        return datetime.strptime(value, '%Y-%m').date()
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+@reports_bp.cli.command('rebuild-item-emissions')
+def rebuild_item_emissions_command():
+    """Rebuild the item emissions rollup from all order lines."""
+    count = rollups.rebuild_item_emissions()
+    click.echo(f"Rebuilt emissions for {count} items")
+
+
+@reports_bp.cli.command('rebuild-supplier-buckets')
+def rebuild_supplier_buckets_command():
+    """Rebuild the monthly/quarterly supplier emission buckets."""
+    count = rollups.rebuild_supplier_buckets()
+    click.echo(f"Rebuilt {count} supplier buckets")
+
+
+@reports_bp.cli.command('rebuild-kpis')
+def rebuild_kpis_command():
+    """Recompute the dashboard KPI counters."""
+    kpis = rollups.rebuild_kpis()
+    click.echo(', '.join(f"{name}={value}" for name, value in kpis.items()))
+
+
+@reports_bp.route('/rebuild', methods=['POST'])
+@require_roles('admin')
+def rebuild_reports():
+    """
+    POST /api/reports/rebuild - Rebuild the emission rollups in the background
+    Returns 202 with the job; poll GET /api/jobs/<id>
+    """
+    return accepted('reports.rebuild', user_id=int(get_jwt_identity()))
+
+
+@job_handler('reports.rebuild')
+def rebuild_reports_job(ctx):
+    """Rebuild item emissions, supplier buckets and the KPI counters."""
+    items = rollups.rebuild_item_emissions()
+    ctx.progress(0.5)
+    buckets = rollups.rebuild_supplier_buckets()
+    ctx.progress(0.9)
+    rollups.rebuild_kpis()
+    return {'item_emissions': items, 'supplier_buckets': buckets}
+
+
+@reports_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@conditional('items', 'suppliers', 'purchase_orders', 'kpi_counters')
+def dashboard():
+    """
+    GET /api/reports/dashboard - Item, supplier, open order and low-stock
+    counts and total order CO2 in one response
+
+    Read from the kpi_counters rows, so the cost does not grow with the
+    tables.
+    """
+    return jsonify(rollups.read_kpis()), 200
+
+
+@reports_bp.route('/emissions-by-item', methods=['GET'])
+@require_roles('admin', 'sustainability_manager')
+@conditional('items', 'item_emissions')
+@cached_report('items', 'purchase_order_items', 'item_emissions')
 def emissions_by_item():
-    """GET /api/reports/emissions-by-item"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    """
+    GET /api/reports/emissions-by-item
+    Query: ?category=<name>&sort=item_id|name|sku|total_co2&order=asc|desc
+    """
+    sort = request.args.get('sort', 'item_id')
+    order = request.args.get('order', 'asc')
     
-    if user.role not in ['admin', 'sustainability_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
+    if sort not in ITEM_EMISSION_SORTS or order not in ('asc', 'desc'):
+        return jsonify({"error": "Invalid sort"}), 400
     
-    items = Item.query.all()
+    sort_column = ITEM_EMISSION_SORTS[sort]
     
-    data = []
-    for item in items:
-        po_items = PurchaseOrderItem.query.filter_by(item_id=item.id).all()
-        total_co2 = sum(poi.line_co2 for poi in po_items)
-        
-        data.append({
-            'item_id': item.id,
-            'item_name': item.name,
-            'sku': item.sku,
-            'co2_per_unit': item.co2_per_unit,
+    query = db.session.query(
+        Item.id,
+        Item.name,
+        Item.sku,
+        Item.category,
+        Item.co2_per_unit,
+        func.coalesce(ItemEmission.total_co2, 0.0)
+    ).outerjoin(ItemEmission, ItemEmission.item_id == Item.id)
+    
+    if request.args.get('category'):
+        query = query.filter(Item.category == request.args['category'])
+    
+    query = query.order_by(
+        sort_column.desc() if order == 'desc' else sort_column.asc(),
+        Item.id
+    )
+    
+    data = [
+        {
+            'item_id': item_id,
+            'item_name': name,
+            'sku': sku,
+            'category': category,
+            'co2_per_unit': co2_per_unit,
             'total_co2_from_orders': total_co2
-        })
+        }
+        for item_id, name, sku, category, co2_per_unit, total_co2 in query
+    ]
     
     return jsonify(data), 200
 
 @reports_bp.route('/emissions-by-supplier', methods=['GET'])
-@jwt_required()
+@require_roles('admin', 'sustainability_manager')
+@conditional('supplier_emission_buckets', 'suppliers')
+@cached_report('purchase_orders', 'supplier_emission_buckets', 'suppliers')
 def emissions_by_supplier():
-    """GET /api/reports/emissions-by-supplier"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    """
+    GET /api/reports/emissions-by-supplier
+    Query: ?from=2025-01-01&to=2025-03-31&granularity=month|quarter
+    
+    Sums the precomputed supplier buckets whose period overlaps the range.
+    With a granularity the per-period breakdown is returned as well.
+    """
+    granularity = request.args.get('granularity')
+    
+    if granularity is not None and granularity not in rollups.GRANULARITIES:
+        return jsonify({"error": "Granularity must be month or quarter"}), 400
     
-    if user.role not in ['admin', 'sustainability_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
+    bucket_size = granularity or 'month'
     
-    orders = PurchaseOrder.query.all()
+    try:
+        date_from = _parse_period(request.args.get('from'))
+        date_to = _parse_period(request.args.get('to'))
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD or YYYY-MM"}), 400
+    
+    query = db.session.query(
+        SupplierEmissionBucket.supplier_id,
+        Supplier.name,
+        SupplierEmissionBucket.period_start,
+        SupplierEmissionBucket.total_co2,
+        SupplierEmissionBucket.total_amount,
+        SupplierEmissionBucket.order_count
+    ).outerjoin(
+        Supplier, Supplier.id == SupplierEmissionBucket.supplier_id
+    ).filter(
+        SupplierEmissionBucket.granularity == bucket_size,
+        SupplierEmissionBucket.order_count > 0
+    )
+    
+    if date_from:
+        query = query.filter(
+            SupplierEmissionBucket.period_start >= rollups.period_start(date_from, bucket_size)
+        )
+    if date_to:
+        query = query.filter(SupplierEmissionBucket.period_start <= date_to)
+    
+    query = query.order_by(SupplierEmissionBucket.supplier_id, SupplierEmissionBucket.period_start)
     
     supplier_emissions = {}
-    for order in orders:
-        supplier_id = order.supplier_id
+    for supplier_id, name, start, total_co2, total_amount, order_count in query:
         if supplier_id not in supplier_emissions:
             supplier_emissions[supplier_id] = {
-                'supplier_name': order.supplier.name,
+                'supplier_name': name,
                 'total_co2': 0,
+                'total_amount': 0,
                 'order_count': 0
             }
-        supplier_emissions[supplier_id]['total_co2'] += order.total_co2
-        supplier_emissions[supplier_id]['order_count'] += 1
+            if granularity:
+                supplier_emissions[supplier_id]['periods'] = []
+        
+        totals = supplier_emissions[supplier_id]
+        totals['total_co2'] += total_co2
+        totals['total_amount'] += total_amount
+        totals['order_count'] += order_count
+        
+        if granularity:
+            totals['periods'].append({
+                'period': rollups.period_label(start, granularity),
+                'period_start': start.isoformat(),
+                'total_co2': total_co2,
+                'total_amount': total_amount,
+                'order_count': order_count
+            })
     
     data = [
         {'supplier_id': k, **v}
@@ -65,44 +221,121 @@ def emissions_by_supplier():
     
     return jsonify(data), 200
 
+@reports_bp.route('/emissions/export', methods=['GET'])
+@require_roles('admin', 'sustainability_manager')
+def export_emissions():
+    """
+    GET /api/reports/emissions/export?format=csv|ndjson
+    Streams the emissions of every order line.
+    Query: ?category=&status=&supplier_id=&from=&to=
+    """
+    fmt = request.args.get('format', 'csv')
+    
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Format must be csv or ndjson"}), 400
+    
+    try:
+        criteria = order_criteria(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if request.args.get('category'):
+        criteria.append(Item.category == request.args['category'])
+    
+    stmt = select(
+        PurchaseOrder.id.label('order_id'),
+        PurchaseOrder.order_date,
+        PurchaseOrder.supplier_id,
+        Supplier.name.label('supplier_name'),
+        PurchaseOrderItem.item_id,
+        Item.sku,
+        Item.name.label('item_name'),
+        Item.category,
+        PurchaseOrderItem.quantity,
+        PurchaseOrderItem.line_co2
+    ).select_from(PurchaseOrderItem).join(
+        PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+    ).outerjoin(
+        Supplier, Supplier.id == PurchaseOrder.supplier_id
+    ).outerjoin(
+        Item, Item.id == PurchaseOrderItem.item_id
+    ).where(*criteria).order_by(PurchaseOrderItem.id)
+    
+    return stream_export(stmt, fmt, 'emissions')
+
 @reports_bp.route('/ai-recommendations', methods=['GET'])
 @jwt_required()
+@conditional('purchase_orders', 'purchase_order_items', 'items', 'suppliers')
+@cached_report('purchase_orders', 'purchase_order_items', 'items', 'suppliers')
 def ai_recommendations():
-    """🤖 AI Module - FIXED VERSION"""
+    """
+    Supplier substitution recommendations
+    GET /api/reports/ai-recommendations
+    
+    Query params:
+        max_price_delta (float): accepted price increase, default 0.05 (+5%)
+        limit (int): number of items to return, default 3
     
-    # ✅ SIMPLIFIED: Get ANY orders with emissions
-    orders_with_emissions = db.session.query(PurchaseOrder).filter(
-        PurchaseOrder.total_co2 > 0
-    ).order_by(PurchaseOrder.total_co2.desc()).limit(3).all()
+    Ranks items by the CO2 that moving their purchases to a cleaner
+    supplier (within the price limit) would have saved, based on the
+    order history. See reports/analytics.py.
+    """
+    
+    try:
+        max_price_delta = float(request.args.get('max_price_delta', analytics.DEFAULT_MAX_PRICE_DELTA))
+        limit = int(request.args.get('limit', 3))
+    except ValueError:
+        return jsonify({"error": "max_price_delta and limit must be numbers"}), 400
+    if max_price_delta < 0 or not 1 <= limit <= 50:
+        return jsonify({"error": "max_price_delta must be >= 0 and limit between 1 and 50"}), 400
+    
+    matrix = analytics.cached_matrix()
+    ranked, total_co2, total_savings = analytics.rank_substitutions(matrix, max_price_delta, limit)
+    
+    item_ids = {r['item_id'] for r in ranked}
+    supplier_ids = {s[key] for r in ranked for s in r['substitutions'] for key in ('from_supplier_id', 'to_supplier_id')}
+    items = {i.id: i for i in Item.query.filter(Item.id.in_(item_ids))} if item_ids else {}
+    suppliers = dict(
+        db.session.query(Supplier.id, Supplier.name).filter(Supplier.id.in_(supplier_ids))
+    ) if supplier_ids else {}
     
     recommendations = []
-    for order in orders_with_emissions:
-        reco = {
-            'high_emission_item': f"Order #{order.id} ({order.supplier.name})",
-            'total_co2': float(order.total_co2 or 0),
+    for row in ranked:
+        item = items.get(row['item_id'])
+        for sub in row['substitutions']:
+            sub['from_supplier'] = suppliers.get(sub['from_supplier_id'])
+            sub['to_supplier'] = suppliers.get(sub['to_supplier_id'])
+        recommendations.append({
+            'item_id': row['item_id'],
+            'high_emission_item': f"{item.name} ({item.sku})" if item else f"Item #{row['item_id']}",
+            'total_co2': round(row['total_co2'], 3),
             'suggestions': [
-                "✅ Switch to low-CO2 suppliers",
-                "✅ Review high-emission purchase orders", 
-                f"✅ Target 20% reduction ({order.total_co2*0.2:.1f} kg CO2e)"
+                f"Move {sub['quantity']:g} units from {sub['from_supplier']} to {sub['to_supplier']}: "
+                f"-{sub['co2_saved']:.1f} kg CO2e at {sub['price_delta_pct']:+.1f}% price"
+                for sub in row['substitutions']
             ],
-            'potential_savings': float(order.total_co2 * 0.3)
-        }
-        recommendations.append(reco)
+            'substitutions': row['substitutions'],
+            'potential_savings': round(row['potential_savings'], 3)
+        })
     
-    # ✅ If no orders, show generic advice
+    # ✅ If no substitution is possible, show generic advice
     if not recommendations:
         recommendations = [{
-            'high_emission_item': 'No Data Yet',
-            'total_co2': 0,
+            'high_emission_item': 'No Data Yet' if not len(matrix) else 'No cleaner supplier found',
+            'total_co2': round(total_co2, 3),
             'suggestions': [
-                "📈 Create purchase orders to unlock AI insights",
+                "📈 Order the same items from several suppliers to compare them",
                 "✅ Add items with CO2 factors first",
-                "💡 AI analyzes your real procurement data"
+                f"💡 Or accept a larger price difference than {max_price_delta:.0%}"
             ],
+            'substitutions': [],
             'potential_savings': 0
         }]
     
     return jsonify({
         'recommendations': recommendations,
-        'ai_score': len(orders_with_emissions) * 20  # Dynamic score
+        # Share of the purchased CO2 the suggested switches would save (0-100)
+        'ai_score': round(100 * total_savings / total_co2) if total_co2 else 0,
+        'total_potential_savings': round(total_savings, 3),
+        'max_price_delta': max_price_delta
     }), 200
@@ -0,0 +1,2 @@
+# backend/app/search/__init__.py
+"""Search module"""
@@ -0,0 +1,87 @@
+# backend/app/search/routes.py
+import re
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import text
+from backend.app.generations import conditional
+from backend.app import db
+from backend.app.models import Item, Supplier
+from backend.app.serializers import serializer_for
+
+search_bp = Blueprint('search', __name__)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Searchable types: FTS5 table (see migration 7), model and bm25 weights
+# of the indexed columns in order
+SEARCH_TYPES = {
+    'items': ('items_fts', Item, (10.0, 5.0, 1.0)),              # name, sku, category
+    'suppliers': ('suppliers_fts', Supplier, (10.0, 2.0, 1.0)),  # name, certifications, address
+}
+
+
+def match_expression(query):
+    """
+    Turn user input into an FTS5 query: every word must match the start
+    of a token, e.g. 'recy ste' -> '"recy"* "ste"*'. Quoting each word
+    keeps FTS5 operators and punctuation in the input inert.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search_table(kind, match, limit):
+    """Ranked matches of one type as to_dict()-shaped rows with a score."""
+    table, model, weights = SEARCH_TYPES[kind]
+    
+    ranked = db.session.execute(
+        text(
+            f"SELECT rowid, bm25({table}, {', '.join(map(str, weights))}) AS score "
+            f"FROM {table} WHERE {table} MATCH :match ORDER BY score LIMIT :limit"
+        ),
+        {'match': match, 'limit': limit}
+    ).all()
+    if not ranked:
+        return []
+    
+    objects = {
+        row['id']: row
+        for row in serializer_for(model).all(model.query.filter(model.id.in_([row[0] for row in ranked])))
+    }
+    # bm25 is lower-is-better; report higher-is-better
+    return [
+        {**objects[row_id], 'score': round(-score, 4)}
+        for row_id, score in ranked
+        if row_id in objects
+    ]
+
+
+@search_bp.route('', methods=['GET'])
+@jwt_required()
+@conditional('items', 'suppliers')
+def search():
+    """
+    GET /api/search - Typeahead search over items and suppliers
+    Query: ?q=&type=items|suppliers (default both)&limit=20
+    Words match by prefix; results are ranked best first.
+    """
+    match = match_expression(request.args.get('q', ''))
+    if not match:
+        return jsonify({"error": "Search text required"}), 400
+    
+    kinds = [request.args['type']] if request.args.get('type') else list(SEARCH_TYPES)
+    if any(kind not in SEARCH_TYPES for kind in kinds):
+        return jsonify({"error": f"type must be one of {', '.join(SEARCH_TYPES)}"}), 400
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_SEARCH_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_LIMIT}"}), 400
+    
+    results = {'query': request.args['q']}
+    for kind in kinds:
+        results[kind] = search_table(kind, match, limit)
+    
+    return jsonify(results), 200
@@ -0,0 +1,251 @@
+"""
+Row serializers - JSON dicts straight from column tuples
+
+List endpoints select plain columns with a Core statement and turn each
+row into the same dict the model's to_dict() returns, without building
+ORM objects or registering them in the session.
+
+Each RowSerializer turns its field list once into a function that zips
+the keys with an operator.itemgetter over the row, then runs the few
+per-column converters (iso_datetime for DateTime columns) and computed
+fields such as a line's line_total.
+
+DateTime columns are selected as the raw text SQLite stores
+('2026-01-01 09:30:00.000000') and rewritten to isoformat() by string
+slicing instead of being parsed into datetime objects first.
+"""
+
+from datetime import datetime
+from operator import itemgetter, mul
+from sqlalchemy import select, String, Date, DateTime, type_coerce
+from backend.app import db
+from backend.app.models import User, Item, Supplier, PurchaseOrder, PurchaseOrderItem, InventoryMovement
+
+# Rows per SELECT ... IN when loading order lines (as selectinload does)
+IN_CHUNK = 500
+
+
+def iso_datetime(value):
+    """isoformat() of a stored datetime, given as SQLite text or a datetime."""
+    if value is None:
+        return None
+    if value.__class__ is not str:
+        return value.isoformat()
+    # SQLAlchemy's storage format always has the microseconds;
+    # isoformat() leaves them out when they are zero
+    if len(value) == 26 and value[10] == ' ' and value[19] == '.':
+        if value.endswith('.000000'):
+            return f"{value[:10]}T{value[11:19]}"
+        return f"{value[:10]}T{value[11:]}"
+    return datetime.fromisoformat(value).isoformat()
+
+
+class RowSerializer:
+    """
+    Row -> dict function for one to_dict() layout.
+
+    Args:
+        fields: (key, value) pairs in to_dict() order. value is a column
+            to select, a (function, key, ...) tuple computed from the
+            values of other keys (e.g. (operator.mul, 'quantity',
+            'unit_price')), or None for a key the caller fills in
+            afterwards
+        joins: (target, onclause) pairs outer joined for the columns of
+            other tables
+    """
+
+    def __init__(self, fields, joins=()):
+        self.joins = list(joins)
+        self.keys = [key for key, _ in fields]
+        self.columns = []
+        column_keys = []
+        converters = []
+        computed = []
+
+        for key, value in fields:
+            if value is None:
+                continue
+            if isinstance(value, tuple):
+                function, *arguments = value
+                computed.append((key, function, _tuple_getter(arguments)))
+                continue
+            column_keys.append(key)
+            if isinstance(value.type, (DateTime, Date)):
+                # Raw text; Date is already stored in isoformat
+                self.columns.append(type_coerce(value, String).label(key))
+                converters.append(iso_datetime if isinstance(value.type, DateTime) else None)
+            else:
+                self.columns.append(value.label(key))
+                converters.append(None)
+
+        self.function = _row_function(self.keys, column_keys, converters, computed)
+
+    def __call__(self, row):
+        return self.function(row)
+
+    def select_from(self, query, *extra):
+        """
+        Core select of this serializer's columns (then extra ones) with the
+        filters of an ORM query.
+        """
+        stmt = query.with_entities(*self.columns, *extra).statement
+        for target, onclause in self.joins:
+            stmt = stmt.outerjoin(target, onclause)
+        return stmt
+
+    def serialize_rows(self, rows):
+        """Dicts for selected rows (columns beyond this serializer's are ignored)."""
+        return list(map(self.function, rows))
+
+    def all(self, query):
+        """Serialize every row of an ORM query."""
+        return self.serialize_rows(db.session.execute(self.select_from(query)))
+
+
+def _tuple_getter(items):
+    """itemgetter that returns a tuple even for a single item."""
+    items = tuple(items)
+    if len(items) == 1:
+        get = itemgetter(items[0])
+        return lambda obj: (get(obj),)
+    return itemgetter(*items)
+
+
+def _row_function(keys, column_keys, converters, computed):
+    """
+    Build the row -> dict function: an itemgetter picks the columns, the
+    converters (None keeps the value) fix them up in the same order.
+    """
+    getter = _tuple_getter(range(len(column_keys)))
+    converted = tuple((key, convert) for key, convert in zip(column_keys, converters) if convert is not None)
+    column_keys = tuple(column_keys)
+    computed = tuple(computed)
+
+    # Every key a column in to_dict() order, or else start from all the
+    # keys so the dict keeps that order
+    ordered = list(column_keys) == keys
+    template = dict.fromkeys(keys)
+
+    if ordered and not converted and not computed:
+        return lambda row: dict(zip(column_keys, getter(row)))
+
+    def serialize(row):
+        if ordered:
+            result = dict(zip(column_keys, getter(row)))
+        else:
+            result = template.copy()
+            result.update(zip(column_keys, getter(row)))
+        for key, convert in converted:
+            result[key] = convert(result[key])
+        for key, function, arguments in computed:
+            result[key] = function(*arguments(result))
+        return result
+
+    return serialize
+
+
+class OrderSerializer(RowSerializer):
+    """PurchaseOrder.to_dict(), with the lines loaded in SELECT ... IN batches"""
+
+    def __init__(self, include_items=True):
+        fields = [
+            ('id', PurchaseOrder.id),
+            ('supplier_id', PurchaseOrder.supplier_id),
+            ('supplier_name', Supplier.name),
+            ('created_by_user_id', PurchaseOrder.created_by_user_id),
+            ('status', PurchaseOrder.status),
+            ('order_date', PurchaseOrder.order_date),
+            ('total_amount', PurchaseOrder.total_amount),
+            ('total_co2', PurchaseOrder.total_co2),
+            ('version', PurchaseOrder.version),
+        ]
+        if include_items:
+            fields.append(('items', None))
+        fields.append(('created_at', PurchaseOrder.created_at))
+
+        super().__init__(fields, joins=[(Supplier, Supplier.id == PurchaseOrder.supplier_id)])
+        self.include_items = include_items
+
+    def serialize_rows(self, rows):
+        orders = super().serialize_rows(rows)
+        if not self.include_items:
+            return orders
+
+        by_id = {}
+        for order in orders:
+            order['items'] = []
+            by_id[order['id']] = order
+
+        ids = list(by_id)
+        for start in range(0, len(ids), IN_CHUNK):
+            stmt = (
+                select(*LINE.columns)
+                .select_from(PurchaseOrderItem)
+                .outerjoin(Item, Item.id == PurchaseOrderItem.item_id)
+                .where(PurchaseOrderItem.purchase_order_id.in_(ids[start:start + IN_CHUNK]))
+                .order_by(PurchaseOrderItem.purchase_order_id, PurchaseOrderItem.id)
+            )
+            for line in LINE.serialize_rows(db.session.execute(stmt)):
+                by_id[line['purchase_order_id']]['items'].append(line)
+        return orders
+
+
+LINE = RowSerializer([
+    ('id', PurchaseOrderItem.id),
+    ('purchase_order_id', PurchaseOrderItem.purchase_order_id),
+    ('item_id', PurchaseOrderItem.item_id),
+    ('item_name', Item.name),
+    ('quantity', PurchaseOrderItem.quantity),
+    ('unit_price', PurchaseOrderItem.unit_price),
+    ('line_co2', PurchaseOrderItem.line_co2),
+    ('line_total', (mul, 'quantity', 'unit_price')),
+], joins=[(Item, Item.id == PurchaseOrderItem.item_id)])
+
+SERIALIZERS = {
+    User: RowSerializer([
+        ('id', User.id),
+        ('username', User.username),
+        ('role', User.role),
+        ('created_at', User.created_at),
+    ]),
+    Item: RowSerializer([
+        ('id', Item.id),
+        ('name', Item.name),
+        ('sku', Item.sku),
+        ('category', Item.category),
+        ('unit', Item.unit),
+        ('stock', Item.stock),
+        ('reorder_level', Item.reorder_level),
+        ('co2_per_unit', Item.co2_per_unit),
+        ('is_active', Item.is_active),
+        ('created_at', Item.created_at),
+    ]),
+    Supplier: RowSerializer([
+        ('id', Supplier.id),
+        ('name', Supplier.name),
+        ('contact_email', Supplier.contact_email),
+        ('phone', Supplier.phone),
+        ('address', Supplier.address),
+        ('sustainability_score', Supplier.sustainability_score),
+        ('certifications', Supplier.certifications),
+        ('created_at', Supplier.created_at),
+    ]),
+    InventoryMovement: RowSerializer([
+        ('id', InventoryMovement.id),
+        ('item_id', InventoryMovement.item_id),
+        ('quantity', InventoryMovement.quantity),
+        ('reason', InventoryMovement.reason),
+        ('purchase_order_id', InventoryMovement.purchase_order_id),
+        ('user_id', InventoryMovement.user_id),
+        ('created_at', InventoryMovement.created_at),
+    ]),
+    PurchaseOrderItem: LINE,
+    PurchaseOrder: OrderSerializer(include_items=True),
+}
+
+ORDERS_WITHOUT_ITEMS = OrderSerializer(include_items=False)
+
+
+def serializer_for(model):
+    """Row serializer matching model.to_dict(), or None."""
+    return SERIALIZERS.get(model)
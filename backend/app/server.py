@@ -0,0 +1,140 @@
+"""
+Production server lifecycle - hooks for the pre-forking server (gunicorn)
+
+backend/gunicorn.conf.py loads the app once in the master process
+(preload_app) and calls these hooks:
+
+    warm_up        master, before forking: configure the mappers and build
+                   the shared caches, so workers inherit them copy-on-write;
+                   clear the previous run's metrics snapshots and fail the
+                   jobs it left unfinished
+    init_worker    each worker, right after fork: drop the inherited
+                   database connections, job, password hashing and batch pools,
+                   start the metrics flusher, then open the worker's own
+                   pools before it accepts requests
+    stop_worker    each worker, on exit: let running jobs finish and save
+                   the worker's metrics
+    worker_exited  master, after a worker exited: keep its metrics
+
+serve() is what 'python run.py' runs with FLASK_ENV=production.
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+from backend.app import db
+from backend.app.metrics import reset_metrics_dir, retire_worker
+
+logger = logging.getLogger(__name__)
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def warm_up(app):
+    """Prepare everything workers share, then close the master's connections."""
+    configure_mappers()
+    reset_metrics_dir(app)
+
+    with app.app_context():
+        from backend.app.reports import analytics
+        try:
+            analytics.cached_matrix()
+        except SQLAlchemyError:
+            # e.g. pending migrations; workers build the caches on demand
+            logger.warning("Skipping cache warm-up", exc_info=True)
+
+        # No worker runs yet: unfinished jobs belong to the previous run
+        try:
+            failed = app.extensions['jobs'].fail_abandoned(datetime.utcnow())
+            db.session.commit()
+            if failed:
+                logger.warning("Marked %d unfinished jobs of the previous run as failed", failed)
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.warning("Skipping job recovery", exc_info=True)
+
+        # Connections must not cross fork(); the master keeps none
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def _open_pool(engine):
+    """Open up to pool_size connections so their PRAGMAs run before traffic."""
+    size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connection.execute(text('SELECT 1'))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def init_worker(app):
+    """Give a freshly forked worker its own connections, thread pools and metrics flusher."""
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: the parent's connections belong to the parent
+            engine.dispose(close=False)
+
+        from backend.app.jobs.runner import init_jobs
+        init_jobs(app)
+
+        from backend.app.auth.passwords import init_password_hasher
+        init_password_hasher(app)
+
+        from backend.app.batch.dispatch import init_batch
+        init_batch(app)
+
+        metrics = app.extensions.get('metrics')
+        if metrics is not None:
+            metrics.start_flusher()
+
+        for engine in db.engines.values():
+            _open_pool(engine)
+
+
+def stop_worker(app):
+    """Wait for this worker's running jobs and save its metrics before it exits."""
+    runner = app.extensions.get('jobs')
+    if runner is not None:
+        runner.shutdown()
+
+    metrics = app.extensions.get('metrics')
+    if metrics is not None:
+        metrics.stop_flusher()
+        metrics.flush()
+
+
+def worker_exited(app, pid):
+    """Fold an exited worker's metrics into the retired totals."""
+    retire_worker(app, pid)
+
+
+def serve(argv=None):
+    """
+    Run the production server (gunicorn with backend/gunicorn.conf.py).
+
+    Extra command-line options are passed on to gunicorn. gunicorn does
+    not run on Windows; there the app falls back to the threaded
+    Werkzeug server without the debugger or reloader.
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        logger.warning("gunicorn is not available; serving with the Werkzeug server")
+        from backend.wsgi import app
+        app.run(host='127.0.0.1', port=5000, debug=False, threaded=True)
+        return
+
+    sys.argv = ['gunicorn', '-c', GUNICORN_CONF, *argv]
+    WSGIApplication('%(prog)s [OPTIONS] [APP_MODULE]').run()
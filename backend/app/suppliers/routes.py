@@ -1,28 +1,42 @@
 # backend/app/suppliers/routes.py
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from backend.app.auth.decorators import require_roles
+from backend.app.generations import conditional
 from backend.app import db
-from backend.app.models import User, Supplier
+from backend.app.models import Supplier
+from backend.app.pagination import paginate
 
 suppliers_bp = Blueprint('suppliers', __name__)
 
+SUPPLIER_SORTS = {
+    'id': Supplier.id,
+    'name': Supplier.name,
+    'created_at': Supplier.created_at
+}
+
 @suppliers_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional('suppliers')
 def get_suppliers():
-    """GET /api/suppliers"""
-    suppliers = Supplier.query.all()
-    return jsonify([s.to_dict() for s in suppliers]), 200
+    """
+    GET /api/suppliers
+    Query: ?min_score=&limit=&cursor=&sort=&order=&fields=
+    """
+    try:
+        query = Supplier.query
+        
+        if request.args.get('min_score'):
+            query = query.filter(Supplier.sustainability_score >= float(request.args['min_score']))
+        
+        return jsonify(paginate(query, Supplier, SUPPLIER_SORTS)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @suppliers_bp.route('', methods=['POST'])
-@jwt_required()
+@require_roles('admin', 'procurement_manager')
 def create_supplier():
     """POST /api/suppliers"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role not in ['admin', 'procurement_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
-    
     data = request.get_json()
     
     if not data.get('name'):
@@ -44,21 +58,16 @@ def create_supplier():
 
 @suppliers_bp.route('/<int:supplier_id>', methods=['GET'])
 @jwt_required()
+@conditional('suppliers')
 def get_supplier(supplier_id):
     """GET /api/suppliers/<id>"""
     supplier = Supplier.query.get_or_404(supplier_id)
     return jsonify(supplier.to_dict()), 200
 
 @suppliers_bp.route('/<int:supplier_id>', methods=['PUT'])
-@jwt_required()
+@require_roles('admin', 'procurement_manager')
 def update_supplier(supplier_id):
     """PUT /api/suppliers/<id>"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role not in ['admin', 'procurement_manager']:
-        return jsonify({"error": "Unauthorized"}), 403
-    
     supplier = Supplier.query.get_or_404(supplier_id)
     data = request.get_json()
     
@@ -74,15 +83,9 @@ def update_supplier(supplier_id):
     return jsonify(supplier.to_dict()), 200
 
 @suppliers_bp.route('/<int:supplier_id>', methods=['DELETE'])
-@jwt_required()
+@require_roles('admin')
 def delete_supplier(supplier_id):
     """DELETE /api/suppliers/<id>"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({"error": "Unauthorized"}), 403
-    
     supplier = Supplier.query.get_or_404(supplier_id)
     db.session.delete(supplier)
     db.session.commit()
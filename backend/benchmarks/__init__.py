@@ -0,0 +1,12 @@
+"""Benchmarks module
+
+Synthetic data and an endpoint benchmark harness. From the repository root:
+
+    python -m backend.benchmarks generate --scale large
+    python -m backend.benchmarks run --output before.json
+    python -m backend.benchmarks compare before.json after.json
+    python -m backend.benchmarks serialize
+
+The commands use the 'benchmark' config (instance/benchmark.db, or
+BENCHMARK_DATABASE_URL).
+"""
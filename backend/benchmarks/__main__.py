@@ -0,0 +1,109 @@
+# backend/benchmarks/__main__.py
+"""
+Benchmark command line - python -m backend.benchmarks <command>
+
+    generate  fill the benchmark database with synthetic data
+    run       benchmark every endpoint and save the results as JSON
+    compare   compare two saved results
+    serialize time ORM objects + to_dict() against the row serializers
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_app
+from backend.benchmarks import datagen, harness, serialization
+from backend.config import INSTANCE_PATH
+
+
+@click.group()
+def cli():
+    """Synthetic data and endpoint benchmarks (config 'benchmark')."""
+
+
+@cli.command()
+@click.option('--scale', type=click.Choice(sorted(datagen.SCALES)), default='small', show_default=True)
+@click.option('--seed', type=int, default=datagen.DEFAULT_SEED, show_default=True)
+@click.option('--until', type=click.DateTime(['%Y-%m-%d']), default=datagen.DEFAULT_UNTIL.strftime('%Y-%m-%d'),
+              show_default=True, help='Newest order date')
+def generate(scale, seed, until):
+    """Fill the (empty) benchmark database with a deterministic dataset."""
+    app = create_app('benchmark')
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            counts = datagen.generate(scale, seed, until, log=click.echo)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    click.echo(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+
+
+@cli.command()
+@click.option('--iterations', type=click.IntRange(1), default=20, show_default=True)
+@click.option('--warm-cache', is_flag=True, help='Keep the report cache between requests')
+@click.option('--only', help='Only cases whose name contains this text')
+@click.option('--output', type=click.Path(dir_okay=False), help='Result file (default: instance/benchmarks/<time>.json)')
+def run(iterations, warm_cache, only, output):
+    """Benchmark every endpoint and save the results as JSON."""
+    app = create_app('benchmark')
+    cases = [case for case in harness.CASES if not only or only in case.name]
+    result = harness.run_benchmarks(app, iterations, warm_cache, cases, log=lambda name: click.echo(name, err=True))
+
+    click.echo(f"{'case':<52} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'SQL':>5} {'peak KB':>9}")
+    for name, row in result['results'].items():
+        flag = '  !' if row['errors'] else ''
+        click.echo(f"{name:<52} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                   f"{row['statements']:>5} {row['peak_memory_kb']:>9.1f}{flag}")
+    if only is None and result['uncovered']:
+        click.echo(f"Endpoints without a case: {', '.join(result['uncovered'])}", err=True)
+
+    if output is None:
+        os.makedirs(os.path.join(INSTANCE_PATH, 'benchmarks'), exist_ok=True)
+        output = os.path.join(INSTANCE_PATH, 'benchmarks', datetime.utcnow().strftime('%Y%m%dT%H%M%S.json'))
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    click.echo(f"Saved {output}")
+
+
+@cli.command()
+@click.argument('before', type=click.File())
+@click.argument('after', type=click.File())
+@click.option('--threshold', type=float, default=0.10, show_default=True, help='p50 growth counted as a regression')
+def compare(before, after, threshold):
+    """Compare two saved results; exits 1 when something regressed."""
+    rows = harness.compare(json.load(before), json.load(after), threshold)
+
+    click.echo(f"{'case':<52} {'p50 before':>11} {'p50 after':>10} {'change':>8} {'SQL':>9}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        click.echo(f"{row['name']:<52} {row['p50_before']:>11.2f} {row['p50_after']:>10.2f} "
+                   f"{row['change']:>+8.1%} {row['statements_before']:>4}->{row['statements_after']:<4}{flag}")
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--repeat', type=click.IntRange(1), default=3, show_default=True, help='Best of this many runs')
+def serialize(repeat):
+    """Time ORM objects + to_dict() against the row serializers on full lists."""
+    app = create_app('benchmark')
+    rows = serialization.compare_paths(app, repeat, log=lambda name: click.echo(name, err=True))
+
+    click.echo(f"{'list':<40} {'rows':>8} {'ORM ms':>9} {'Core ms':>9} {'speedup':>8}")
+    for row in rows:
+        flag = '' if row['same'] else '  OUTPUT DIFFERS'
+        click.echo(f"{row['name']:<40} {row['rows']:>8} {row['orm_ms']:>9.1f} {row['core_ms']:>9.1f} "
+                   f"{row['speedup']:>7.2f}x{flag}")
+    if not all(row['same'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    cli()
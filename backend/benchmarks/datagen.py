@@ -0,0 +1,223 @@
+"""
+Deterministic synthetic dataset
+
+generate() fills an empty, migrated database with the demo users,
+suppliers, items, purchase orders and order lines. All values come from
+one random.Random(seed) and dates count back from a fixed `until`, so a
+given scale and seed always produce the same rows.
+
+Rows are written with executemany INSERTs of INSERT_CHUNK rows on the
+session's connection (order and line ids are assigned here, so nothing is
+read back). The opening stock is booked as 'initial' ledger movements,
+and the emission rollups are then rebuilt set-based. The FTS indexes
+follow through their triggers.
+
+Each item is sold by a few suppliers at its own price and CO2 factor per
+supplier, so the substitution analytics have something to find.
+"""
+
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, func, literal
+from werkzeug.security import generate_password_hash
+from backend.app import db
+from backend.app.generations import mark_changed
+from backend.app.models import (
+    User, Item, Supplier, PurchaseOrder, PurchaseOrderItem, InventoryMovement
+)
+from backend.app.reports import rollups
+
+SCALES = {
+    'tiny': {'suppliers': 5, 'items': 40, 'orders': 60, 'lines_per_order': 4},
+    'small': {'suppliers': 50, 'items': 1_000, 'orders': 2_000, 'lines_per_order': 5},
+    'medium': {'suppliers': 1_000, 'items': 20_000, 'orders': 50_000, 'lines_per_order': 8},
+    # 2.5 million order lines
+    'large': {'suppliers': 5_000, 'items': 100_000, 'orders': 250_000, 'lines_per_order': 10},
+}
+
+INSERT_CHUNK = 10_000
+
+DEFAULT_SEED = 42
+DEFAULT_UNTIL = datetime(2026, 1, 1)
+HISTORY_DAYS = 730
+
+DEMO_USERS = (
+    ('admin', 'admin123', 'admin'),
+    ('proc_mgr', 'proc123', 'procurement_manager'),
+    ('sust_mgr', 'sust123', 'sustainability_manager'),
+)
+
+CATEGORIES = ('metal', 'timber', 'plastic', 'textile', 'chemical', 'electronics', 'packaging', 'glass')
+UNITS = ('kg', 'pcs', 'm', 'l', 'box')
+ADJECTIVES = ('Recycled', 'Organic', 'Reinforced', 'Galvanised', 'Low-carbon', 'Bio-based', 'Coated', 'Raw')
+NOUNS = ('beam', 'sheet', 'panel', 'pipe', 'fabric', 'resin', 'board', 'cable', 'pallet', 'bottle')
+CERTIFICATIONS = ('ISO 14001', 'FSC', 'Fairtrade', 'B Corp', 'EMAS', 'Cradle to Cradle')
+STATUSES = (('received', 0.6), ('submitted', 0.25), ('draft', 0.15))
+
+
+def _insert(conn, table, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        conn.execute(table.insert(), rows[start:start + INSERT_CHUNK])
+
+
+def _suppliers(rng, count, until):
+    return [
+        {
+            'id': i,
+            'name': f"Supplier {i:05d} {rng.choice(('Ltd', 'GmbH', 'Inc', 'SA', 'Co'))}",
+            'contact_email': f"sales{i}@supplier{i}.example",
+            'phone': f"+1-555-{rng.randrange(10_000):04d}",
+            'address': f"{rng.randrange(1, 999)} Industrial Road, Unit {i}",
+            'sustainability_score': round(rng.uniform(0, 100), 1),
+            'certifications': ', '.join(rng.sample(CERTIFICATIONS, rng.randrange(0, 3))),
+            'created_at': until - timedelta(days=HISTORY_DAYS + rng.randrange(365))
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _items(rng, count, until):
+    return [
+        {
+            'id': i,
+            'name': f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            'sku': f"SKU-{i:06d}",
+            'category': rng.choice(CATEGORIES),
+            'unit': rng.choice(UNITS),
+            'stock': rng.randrange(0, 500),
+            'reorder_level': rng.randrange(5, 60),
+            'co2_per_unit': round(rng.lognormvariate(0, 1), 3),
+            'is_active': rng.random() > 0.05,
+            'created_at': until - timedelta(days=HISTORY_DAYS + rng.randrange(365))
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _catalogues(rng, items, supplier_count):
+    """supplier id -> list of (item_id, unit price, CO2 per unit) it sells"""
+    catalogues = {supplier_id: [] for supplier_id in range(1, supplier_count + 1)}
+    for item in items:
+        base_price = rng.uniform(1, 200)
+        for supplier_id in rng.sample(range(1, supplier_count + 1), min(3, supplier_count)):
+            catalogues[supplier_id].append((
+                item['id'],
+                round(base_price * rng.uniform(0.85, 1.2), 2),
+                item['co2_per_unit'] * rng.uniform(0.6, 1.3)
+            ))
+    # Suppliers that drew no items still sell something
+    for supplier_id, catalogue in catalogues.items():
+        if not catalogue:
+            item = rng.choice(items)
+            catalogue.append((item['id'], round(rng.uniform(1, 200), 2), item['co2_per_unit']))
+    return catalogues
+
+
+def generate(scale='small', seed=DEFAULT_SEED, until=DEFAULT_UNTIL, log=None):
+    """
+    Fill an empty database with a synthetic dataset.
+
+    Args:
+        scale: name from SCALES or a dict with suppliers, items, orders
+            and lines_per_order
+        seed (int): random seed; same seed and scale -> same rows
+        until (datetime): newest order date
+        log: optional callable(str) for progress messages
+
+    Returns:
+        dict: number of rows written per table
+    """
+
+    sizes = SCALES[scale] if isinstance(scale, str) else scale
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+
+    if db.session.execute(select(func.count()).select_from(Item)).scalar():
+        raise ValueError("The database already has items; generate into an empty one")
+
+    conn = db.session.connection()
+
+    log("users")
+    if not db.session.execute(select(func.count()).select_from(User)).scalar():
+        _insert(conn, User.__table__, [
+            {'username': name, 'password_hash': generate_password_hash(password), 'role': role,
+             'created_at': until - timedelta(days=HISTORY_DAYS)}
+            for name, password, role in DEMO_USERS
+        ])
+    user_ids = list(db.session.execute(select(User.id).order_by(User.id)).scalars())
+
+    log(f"{sizes['suppliers']} suppliers")
+    _insert(conn, Supplier.__table__, _suppliers(rng, sizes['suppliers'], until))
+
+    log(f"{sizes['items']} items")
+    items = _items(rng, sizes['items'], until)
+    _insert(conn, Item.__table__, items)
+    conn.execute(insert(InventoryMovement).from_select(
+        ['item_id', 'quantity', 'reason', 'created_at'],
+        select(Item.id, Item.stock, literal('initial'), Item.created_at).where(Item.stock != 0)
+    ))
+
+    catalogues = _catalogues(rng, items, sizes['suppliers'])
+    del items
+
+    statuses, weights = zip(*STATUSES)
+    line_id = 0
+    orders, lines = [], []
+    total_lines = 0
+    log(f"{sizes['orders']} orders")
+
+    for order_id in range(1, sizes['orders'] + 1):
+        supplier_id = rng.randrange(1, sizes['suppliers'] + 1)
+        catalogue = catalogues[supplier_id]
+        line_count = min(len(catalogue), rng.randint(1, sizes['lines_per_order'] * 2 - 1))
+        total_amount = total_co2 = 0.0
+        for item_id, price, co2 in rng.sample(catalogue, line_count):
+            quantity = rng.randint(1, 100)
+            line_id += 1
+            line_co2 = quantity * co2
+            lines.append({
+                'id': line_id,
+                'purchase_order_id': order_id,
+                'item_id': item_id,
+                'quantity': quantity,
+                'unit_price': price,
+                'line_co2': line_co2
+            })
+            total_amount += quantity * price
+            total_co2 += line_co2
+
+        order_date = until - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        orders.append({
+            'id': order_id,
+            'supplier_id': supplier_id,
+            'created_by_user_id': rng.choice(user_ids),
+            'status': rng.choices(statuses, weights)[0],
+            'order_date': order_date,
+            'total_amount': total_amount,
+            'total_co2': total_co2,
+            'version': 1,
+            'created_at': order_date
+        })
+
+        if len(lines) >= INSERT_CHUNK * 5 or order_id == sizes['orders']:
+            _insert(conn, PurchaseOrder.__table__, orders)
+            _insert(conn, PurchaseOrderItem.__table__, lines)
+            total_lines += len(lines)
+            orders, lines = [], []
+            log(f"  {order_id} orders, {total_lines} lines")
+
+    mark_changed(db.session, User.__tablename__, Supplier.__tablename__, Item.__tablename__,
+                 InventoryMovement.__tablename__, PurchaseOrder.__tablename__, PurchaseOrderItem.__tablename__)
+    db.session.commit()
+
+    log("rollups")
+    rollups.rebuild_item_emissions()
+    rollups.rebuild_supplier_buckets()
+
+    return {
+        'users': len(user_ids),
+        'suppliers': sizes['suppliers'],
+        'items': sizes['items'],
+        'purchase_orders': sizes['orders'],
+        'purchase_order_items': total_lines
+    }
@@ -0,0 +1,319 @@
+"""
+Endpoint benchmark harness
+
+Every blueprint endpoint has at least one Case. run_benchmarks() sends
+each case through the Flask test client: one warm-up request, then
+`iterations` timed requests (latency and SQL statement count per
+request), then one request under tracemalloc for the peak Python memory
+it allocates. Setup work a case needs (e.g. creating the row a DELETE
+removes) runs outside the timer.
+
+The report cache is cleared before every request unless warm_cache is
+set, so report timings measure the queries, not the cache.
+
+Results are plain dicts, saved as JSON by the CLI; compare() lines up two
+result files.
+"""
+
+import math
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from sqlalchemy import event, select, func
+from sqlalchemy.engine import Engine
+from backend.app import db
+from backend.app.models import Item, Supplier, PurchaseOrder, PurchaseOrderItem
+from backend.app.reports.cache import get_report_cache
+
+# Endpoints deliberately left out
+SKIPPED = {
+    'auth.init_users': 'one-time setup, fails once users exist',
+    'static': 'static files',
+}
+
+
+@dataclass
+class Case:
+    """One request to benchmark"""
+    endpoint: str
+    method: str
+    path: str                       # may use {i}, {tag} and keys returned by setup
+    body: object = None             # dict, str, or callable(i, tag) returning one
+    variant: str = ''               # tells apart cases of the same endpoint
+    content_type: str = None
+    auth: bool = True
+    setup: object = None            # callable(client, headers, i, tag) -> dict, untimed
+    expect: tuple = field(default=(200, 201, 202))
+
+    @property
+    def name(self):
+        return f"{self.endpoint}[{self.variant}]" if self.variant else self.endpoint
+
+    def request(self, client, headers, i, tag):
+        """Path and client.open() keyword arguments for iteration i."""
+        values = self.setup(client, headers, i, tag) if self.setup else {}
+        body = self.body(i, tag) if callable(self.body) else self.body
+        kwargs = {'method': self.method, 'headers': headers if self.auth else {}}
+        if isinstance(body, str):
+            kwargs['data'] = body
+            kwargs['content_type'] = self.content_type or 'text/plain'
+        elif body is not None:
+            kwargs['json'] = body
+        return self.path.format(i=i, tag=tag, **values), kwargs
+
+
+def _new_item(client, headers, i, tag):
+    item = client.post('/api/items', json={'name': f'Setup item {i}', 'sku': f'SETUP-{tag}-{i}'},
+                       headers=headers).get_json()
+    return {'id': item['id']}
+
+
+def _new_supplier(client, headers, i, tag):
+    supplier = client.post('/api/suppliers', json={'name': f'Setup supplier {tag} {i}'}, headers=headers).get_json()
+    return {'id': supplier['id']}
+
+
+def _new_order(client, headers, i, tag):
+    order = client.post('/api/purchase-orders', json={'supplier_id': 1, 'items': [
+        {'item_id': item_id, 'quantity': 5, 'unit_price': 2.5} for item_id in range(1, 6)
+    ]}, headers=headers).get_json()
+    return {'id': order['id']}
+
+
+def _new_job(client, headers, i, tag):
+    job = client.post('/api/items/import?async=true', data=f"sku,name\nJOB-{tag}-{i},Job item\n",
+                      headers={**headers, 'Content-Type': 'text/csv'}).get_json()
+    return {'id': job['id']}
+
+
+def _import_csv(i, tag):
+    rows = '\n'.join(f"IMP-{tag}-{i}-{k},Imported item {k},packaging,pcs,{k},10,0.5" for k in range(100))
+    return "sku,name,category,unit,stock,reorder_level,co2_per_unit\n" + rows + "\n"
+
+
+def _order_body(i, tag):
+    return {'supplier_id': 1, 'items': [
+        {'item_id': item_id, 'quantity': 3, 'unit_price': 4.0} for item_id in range(1, 11)
+    ]}
+
+
+CASES = (
+    Case('ping', 'GET', '/ping', auth=False),
+    Case('prometheus_metrics', 'GET', '/metrics', auth=False),
+
+    Case('auth.login', 'POST', '/api/auth/login', auth=False,
+         body={'username': 'admin', 'password': 'admin123'}),
+    Case('auth.get_current_user', 'GET', '/api/auth/me'),
+
+    Case('items.get_items', 'GET', '/api/items'),
+    Case('items.get_items', 'GET', '/api/items?category=metal&limit=500', variant='category'),
+    Case('items.get_item', 'GET', '/api/items/1'),
+    Case('items.create_item', 'POST', '/api/items',
+         body=lambda i, tag: {'name': f'Bench item {i}', 'sku': f'BENCH-{tag}-{i}', 'stock': 5}),
+    Case('items.update_item', 'PUT', '/api/items/2', body=lambda i, tag: {'reorder_level': 10 + i % 2}),
+    Case('items.delete_item', 'DELETE', '/api/items/{id}', setup=_new_item),
+    Case('items.get_item_movements', 'GET', '/api/items/1/movements'),
+    Case('items.create_item_movement', 'POST', '/api/items/3/movements', body={'quantity': 1, 'reason': 'adjustment'}),
+    Case('items.import_items_csv', 'POST', '/api/items/import', body=_import_csv, content_type='text/csv'),
+    Case('items.get_low_stock_items', 'GET', '/api/items/low-stock'),
+    Case('items.get_stock_as_of', 'GET', '/api/items/stock?as_of=2025-06-30&category=metal'),
+
+    Case('suppliers.get_suppliers', 'GET', '/api/suppliers'),
+    Case('suppliers.get_supplier', 'GET', '/api/suppliers/1'),
+    Case('suppliers.create_supplier', 'POST', '/api/suppliers',
+         body=lambda i, tag: {'name': f'Bench supplier {tag} {i}', 'sustainability_score': 50}),
+    Case('suppliers.update_supplier', 'PUT', '/api/suppliers/2',
+         body=lambda i, tag: {'sustainability_score': 60 + i % 2}),
+    Case('suppliers.delete_supplier', 'DELETE', '/api/suppliers/{id}', setup=_new_supplier),
+
+    Case('procurement.get_purchase_orders', 'GET', '/api/purchase-orders'),
+    Case('procurement.get_purchase_orders', 'GET', '/api/purchase-orders?include=items', variant='items'),
+    Case('procurement.get_purchase_order', 'GET', '/api/purchase-orders/1'),
+    Case('procurement.create_purchase_order', 'POST', '/api/purchase-orders', body=_order_body),
+    Case('procurement.update_purchase_order', 'PUT', '/api/purchase-orders/{id}',
+         body={'status': 'received'}, setup=_new_order),
+    Case('procurement.create_purchase_orders_batch', 'POST', '/api/purchase-orders/batch',
+         body=lambda i, tag: {'orders': [_order_body(i, tag) for _ in range(10)]}),
+    Case('procurement.export_purchase_orders', 'GET', '/api/purchase-orders/export?format=csv&status=received'),
+    Case('procurement.get_reorder_suggestions', 'GET', '/api/purchase-orders/reorder-suggestions'),
+    Case('procurement.draft_reorders', 'POST', '/api/purchase-orders/reorder',
+         body={'item_ids': list(range(1, 51))}),
+
+    Case('reports.emissions_by_item', 'GET', '/api/reports/emissions-by-item?sort=total_co2&order=desc'),
+    Case('reports.emissions_by_supplier', 'GET', '/api/reports/emissions-by-supplier'),
+    Case('reports.emissions_by_supplier', 'GET', '/api/reports/emissions-by-supplier?granularity=month',
+         variant='month'),
+    Case('reports.ai_recommendations', 'GET', '/api/reports/ai-recommendations'),
+    Case('reports.export_emissions', 'GET', '/api/reports/emissions/export?format=csv&category=metal'),
+    Case('reports.rebuild_reports', 'POST', '/api/reports/rebuild'),
+    Case('reports.dashboard', 'GET', '/api/reports/dashboard'),
+
+    Case('search.search', 'GET', '/api/search?q=recy'),
+    Case('search.search', 'GET', '/api/search?q=galvanised%20pipe&type=items', variant='two words'),
+
+    Case('batch.run_batch', 'POST', '/api/batch', body={'requests': [
+        {'id': 'orders', 'url': '/api/purchase-orders?limit=50'},
+        {'id': 'suppliers', 'url': '/api/suppliers?limit=50'},
+        {'id': 'items', 'url': '/api/items?limit=50'},
+    ]}),
+
+    Case('jobs.get_job', 'GET', '/api/jobs/{id}', setup=_new_job),
+    Case('jobs.cancel_job', 'POST', '/api/jobs/{id}/cancel', setup=_new_job, expect=(202, 409)),
+)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def uncovered_endpoints(app, cases=CASES):
+    """Endpoints of the app with no case and no SKIPPED entry."""
+    covered = {case.endpoint for case in cases} | set(SKIPPED)
+    return sorted({rule.endpoint for rule in app.url_map.iter_rules()} - covered)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _dataset():
+    return {
+        model.__tablename__: db.session.execute(select(func.count()).select_from(model)).scalar()
+        for model in (Item, Supplier, PurchaseOrder, PurchaseOrderItem)
+    }
+
+
+def run_benchmarks(app, iterations=20, warm_cache=False, cases=CASES, log=None):
+    """
+    Benchmark every case.
+
+    Returns:
+        dict with 'meta', 'results' (case name -> p50_ms, p95_ms, p99_ms,
+        mean_ms, statements, peak_memory_kb, statuses, errors) and
+        'uncovered' (endpoints without a case)
+    """
+
+    log = log or (lambda message: None)
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    if response.status_code != 200:
+        raise RuntimeError("Cannot log in as admin; generate the dataset first")
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    tag = uuid.uuid4().hex[:8]
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    def send(case, i):
+        path, kwargs = case.request(client, headers, i, tag)
+        if not warm_cache:
+            with app.app_context():
+                cache = get_report_cache()
+                if cache is not None:
+                    cache.clear()
+        statements[0] = 0
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        response = client.open(path, **kwargs)
+        response.get_data()     # streamed exports finish here
+        return response, time.perf_counter() - started
+
+    results = {}
+    event.listen(Engine, 'before_cursor_execute', count_statement)
+    try:
+        for case in cases:
+            log(case.name)
+            send(case, 0)       # warm-up
+
+            latencies, counts, statuses = [], [], Counter()
+            for i in range(1, iterations + 1):
+                response, elapsed = send(case, i)
+                latencies.append(elapsed * 1000)
+                counts.append(statements[0])
+                statuses[response.status_code] += 1
+
+            tracemalloc.start()
+            try:
+                send(case, iterations + 1)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            results[case.name] = {
+                'method': case.method,
+                'path': case.path,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'mean_ms': round(sum(latencies) / len(latencies), 3),
+                'statements': percentile(counts, 50),
+                'peak_memory_kb': round(peak / 1024, 1),
+                'statuses': {str(code): n for code, n in sorted(statuses.items())},
+                'errors': sum(n for code, n in statuses.items() if code not in case.expect)
+            }
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count_statement)
+
+    with app.app_context():
+        dataset = _dataset()
+
+    return {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'],
+            'dataset': dataset,
+            'iterations': iterations,
+            'warm_cache': warm_cache
+        },
+        'results': results,
+        'uncovered': uncovered_endpoints(app, cases)
+    }
+
+
+def compare(before, after, threshold=0.10):
+    """
+    Line up two benchmark results.
+
+    Returns:
+        list of dicts per case in both runs: name, p50/p95 before and after,
+        change (p50 ratio - 1), statements before/after and a 'regression'
+        flag when p50 grew by more than threshold or statements went up
+    """
+
+    rows = []
+    for name, new in after['results'].items():
+        old = before['results'].get(name)
+        if old is None:
+            continue
+        change = new['p50_ms'] / old['p50_ms'] - 1 if old['p50_ms'] else 0.0
+        rows.append({
+            'name': name,
+            'p50_before': old['p50_ms'],
+            'p50_after': new['p50_ms'],
+            'p95_before': old['p95_ms'],
+            'p95_after': new['p95_ms'],
+            'change': change,
+            'statements_before': old['statements'],
+            'statements_after': new['statements'],
+            'regression': change > threshold or new['statements'] > old['statements']
+        })
+    return rows
@@ -0,0 +1,82 @@
+"""
+ORM objects + to_dict() versus the row serializers
+
+For each list, times loading the rows as ORM objects and calling
+to_dict() (the old read path) against selecting column tuples and running
+the row serializer (app/serializers.py), and checks both give
+the same output.
+"""
+
+import time
+from backend.app import db
+from backend.app.models import Item, Supplier, PurchaseOrder, InventoryMovement
+from backend.app.serializers import SERIALIZERS, ORDERS_WITHOUT_ITEMS
+
+# name -> (query, ORM path, row serializer); orders with lines are capped
+# so the comparison stays in seconds on the large dataset
+CASES = {
+    'items': (
+        lambda: Item.query.order_by(Item.id),
+        lambda query: [obj.to_dict() for obj in query],
+        SERIALIZERS[Item]
+    ),
+    'suppliers': (
+        lambda: Supplier.query.order_by(Supplier.id),
+        lambda query: [obj.to_dict() for obj in query],
+        SERIALIZERS[Supplier]
+    ),
+    'inventory_movements': (
+        lambda: InventoryMovement.query.order_by(InventoryMovement.id),
+        lambda query: [obj.to_dict() for obj in query],
+        SERIALIZERS[InventoryMovement]
+    ),
+    'purchase_orders': (
+        lambda: PurchaseOrder.query.order_by(PurchaseOrder.id),
+        lambda query: [obj.to_dict(include_items=False)
+                       for obj in query.options(*PurchaseOrder.load_options(False))],
+        ORDERS_WITHOUT_ITEMS
+    ),
+    'purchase_orders?include=items (10k)': (
+        lambda: PurchaseOrder.query.order_by(PurchaseOrder.id).limit(10_000),
+        lambda query: [obj.to_dict() for obj in query.options(*PurchaseOrder.load_options())],
+        SERIALIZERS[PurchaseOrder]
+    ),
+}
+
+
+def _best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        data = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, data
+
+
+def compare_paths(app, repeat=3, cases=None, log=None):
+    """
+    Time both read paths for each case (best of `repeat`).
+
+    Returns:
+        list of dicts: name, rows, orm_ms, core_ms, speedup, same
+    """
+
+    log = log or (lambda name: None)
+    results = []
+    with app.app_context():
+        for name, (query, orm_path, serializer) in (cases or CASES).items():
+            log(name)
+            orm_seconds, expected = _best_of(lambda: orm_path(query()), repeat)
+            core_seconds, data = _best_of(lambda: serializer.all(query()), repeat)
+            results.append({
+                'name': name,
+                'rows': len(data),
+                'orm_ms': round(orm_seconds * 1000, 1),
+                'core_ms': round(core_seconds * 1000, 1),
+                'speedup': round(orm_seconds / core_seconds, 2) if core_seconds else None,
+                'same': data == expected
+            })
+        db.session.remove()
+    return results
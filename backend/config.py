@@ -16,10 +16,56 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(INSTANCE_PATH, "green_erp.db")}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Apply pending schema migrations when the app starts
+    AUTO_MIGRATE = False
+    
+    # PRAGMAs run on every new SQLite connection (see app/database.py)
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000
+    }
+    
     # JWT configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'dev-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
+    # Seconds a user's role is cached before require_roles re-reads it
+    ROLE_CACHE_TTL = 60
+    
+    # Password hashing (see app/auth/passwords.py): Werkzeug method for new
+    # hashes (older ones are upgraded at the next login), checks running at
+    # once and waiting beyond that before a login gets 429
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_QUEUE = 32
+    
+    # Failed logins in a row that lock a username, and for how many seconds
+    LOGIN_MAX_FAILURES = 5
+    LOGIN_LOCKOUT_SECONDS = 300
+    
+    # Report result cache (see app/reports/cache.py): 'memory', 'sqlite' or None
+    REPORT_CACHE_BACKEND = 'memory'
+    REPORT_CACHE_SIZE = 256
+    REPORT_CACHE_PATH = os.path.join(INSTANCE_PATH, 'report_cache.db')    # sqlite backend
+    
+    # Background jobs (see app/jobs/runner.py): running at once, waiting
+    # beyond that, and seconds a finished job's result is kept
+    JOB_WORKERS = 2
+    JOB_QUEUE_LIMIT = 20
+    JOB_RESULT_TTL = 24 * 3600
+    
+    # POST /api/batch (see app/batch/dispatch.py): sub-requests per batch and
+    # threads serving consecutive read sub-requests at once
+    BATCH_MAX_REQUESTS = 20
+    BATCH_WORKERS = 4
+    
+    # Request metrics (see app/metrics.py). METRICS_DIR collects the
+    # snapshots of all worker processes; None keeps them in-process
+    METRICS_ENABLED = True
+    METRICS_DIR = None
+    METRICS_FLUSH_SECONDS = 5
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SLOW_QUERY_MS = 200
+    
     # App settings
     JSON_SORT_KEYS = False
 
@@ -27,21 +73,91 @@ class DevelopmentConfig(Config):
     """Development environment."""
     DEBUG = True
     TESTING = False
+    AUTO_MIGRATE = True
 
 class TestingConfig(Config):
     """Testing environment."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    AUTO_MIGRATE = True
+    # Jobs run inline: the in-memory database is one shared connection
+    JOB_WORKERS = 0
+    # Batch reads run in order: threads cannot share the in-memory database
+    BATCH_WORKERS = 0
+    # Cheap hashes keep the suite fast
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
 
 class ProductionConfig(Config):
     """Production environment."""
     DEBUG = False
     TESTING = False
+    
+    # WAL lets readers run while a write is in progress; NORMAL sync is
+    # safe in WAL mode and avoids an fsync per commit
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -65536,       # 64 MB page cache per connection
+        'mmap_size': 268435456,     # 256 MB memory-mapped I/O
+        'temp_store': 'MEMORY'
+    }
+    
+    # Writer: one connection per process, so writes queue in the pool
+    # instead of contending for the SQLite write lock
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 1,
+        'max_overflow': 0,
+        'pool_timeout': 30
+    }
+    
+    # Readers: GET requests use this pool (same file, PRAGMA query_only)
+    SQLALCHEMY_BINDS = {
+        'read': {
+            'url': Config.SQLALCHEMY_DATABASE_URI,
+            'pool_size': 8,
+            'max_overflow': 8,
+            'pool_timeout': 30
+        }
+    }
+    
+    # Workers share one cache file, so a commit in any worker clears
+    # stale reports for all of them
+    REPORT_CACHE_BACKEND = 'sqlite'
+    
+    # Every gunicorn worker writes its metrics here for /metrics to merge
+    METRICS_DIR = os.path.join(INSTANCE_PATH, 'metrics')
+    
+    # Per worker process. A login holds its request thread while it hashes
+    # or waits for a hashing slot, so WORKERS + QUEUE stays one below
+    # gunicorn's threads (4: two hash, one waits): the last thread keeps
+    # serving other requests and further logins get 429
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 4))
+    PASSWORD_HASH_WORKERS = min(2, max(GUNICORN_THREADS - 1, 1))
+    PASSWORD_HASH_QUEUE = max(GUNICORN_THREADS - 1 - PASSWORD_HASH_WORKERS, 0)
+
+class BenchmarkConfig(ProductionConfig):
+    """Benchmarks (backend/benchmarks): production engine profile on its own file."""
+    SQLALCHEMY_DATABASE_URI = (
+        os.environ.get('BENCHMARK_DATABASE_URL')
+        or f'sqlite:///{os.path.join(INSTANCE_PATH, "benchmark.db")}'
+    )
+    SQLALCHEMY_BINDS = {
+        'read': {**ProductionConfig.SQLALCHEMY_BINDS['read'], 'url': SQLALCHEMY_DATABASE_URI}
+    }
+    AUTO_MIGRATE = True
+    
+    # One process: in-memory cache and metrics, jobs timed inline
+    REPORT_CACHE_BACKEND = 'memory'
+    METRICS_DIR = None
+    JOB_WORKERS = 0
 
 # Default config
 config = {
     'development': DevelopmentConfig,
     'testing': TestingConfig,
     'production': ProductionConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,66 @@
+# backend/gunicorn.conf.py
+"""
+Production server settings (gunicorn)
+
+Command (from the repository root):
+    FLASK_ENV=production python backend/run.py
+    gunicorn -c backend/gunicorn.conf.py          # same thing
+
+Every setting can be overridden with the environment variable named next
+to it. 'kill -HUP <master pid>' replaces the workers gracefully (new ones
+start before the old ones finish their requests); 'kill -TERM' stops
+the server after in-flight requests.
+"""
+
+import multiprocessing
+import os
+
+# Repository root, so 'backend' is importable
+chdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+wsgi_app = 'backend.wsgi:app'
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:5000')
+
+# SQLite has one writer per database, so more processes stop helping
+# early; threads overlap the I/O within each worker
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Load the app once in the master and fork it (see app/server.py)
+preload_app = True
+
+# Report and export endpoints can stream for a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 60))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then so memory growth cannot accumulate
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = 200
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+
+def when_ready(server):
+    from backend.app.server import warm_up
+    from backend.wsgi import app
+    warm_up(app)
+
+
+def post_fork(server, worker):
+    from backend.app.server import init_worker
+    from backend.wsgi import app
+    init_worker(app)
+
+
+def worker_exit(server, worker):
+    from backend.app.server import stop_worker
+    from backend.wsgi import app
+    stop_worker(app)
+
+
+def child_exit(server, worker):
+    from backend.app.server import worker_exited
+    from backend.wsgi import app
+    worker_exited(app, worker.pid)
@@ -1,9 +1,11 @@
 # backend/run.py
 """
-Entry point - starts Flask development server
+Entry point - starts the backend
 Run this file to start the backend
 
 Command: python run.py
+    development (default): Flask development server with the debugger
+    FLASK_ENV=production: gunicorn with pre-forked workers (gunicorn.conf.py)
 """
 
 import os
@@ -12,9 +14,16 @@ import sys
 # Add parent directory to Python path so we can import backend
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+CONFIG_NAME = os.environ.get('FLASK_ENV', 'development')
+
+if __name__ == '__main__' and CONFIG_NAME == 'production':
+    from backend.app.server import serve
+    serve()
+    sys.exit(0)
+
 from backend.app import create_app
 
-app = create_app(config_name=os.environ.get('FLASK_ENV', 'development'))
+app = create_app(config_name=CONFIG_NAME)
 
 if __name__ == '__main__':
-    app.run(host='127.0.0.1', port=5000, debug=True)
+    app.run(host='127.0.0.1', port=5000, debug=app.config['DEBUG'])
@@ -0,0 +1,99 @@
+# backend/tests/conftest.py
+"""
+Shared pytest fixtures - an in-memory app, a test client and logged-in headers -
+and helpers the test modules import with `from conftest import ...`
+"""
+
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# Add the repository root to the path so we can import backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app import create_app, db
+from backend.app.auth.decorators import invalidate_role
+
+
+@pytest.fixture
+def app():
+    """Flask app on an in-memory SQLite database"""
+    app = create_app('testing')
+    invalidate_role()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    """Test client with the demo users created"""
+    client = app.test_client()
+    client.post('/api/auth/init-users')
+    return client
+
+
+def login(client, username, password):
+    """Log in and return the Authorization header"""
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client):
+    return login(client, 'admin', 'admin123')
+
+
+@pytest.fixture
+def sust_headers(client):
+    return login(client, 'sust_mgr', 'sust123')
+
+
+@contextmanager
+def count_queries(app):
+    """Count the SQL statements executed inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def create_orders(client, headers, count):
+    """Create `count` orders, each with two lines on its own supplier and items"""
+    for n in range(count):
+        supplier = client.post('/api/suppliers', json={'name': f'Supplier {n}'}, headers=headers).get_json()
+        lines = []
+        for k in range(2):
+            item = client.post('/api/items', json={
+                'name': f'Item {n}-{k}', 'sku': f"SKU-{supplier['id']}-{k}", 'co2_per_unit': 1.5
+            }, headers=headers).get_json()
+            lines.append({'item_id': item['id'], 'quantity': 2, 'unit_price': 3})
+        response = client.post('/api/purchase-orders', json={
+            'supplier_id': supplier['id'], 'items': lines
+        }, headers=headers)
+        assert response.status_code == 201
+
+
+def sample(text, name, **labels):
+    """Value of one series in a Prometheus text exposition"""
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ''))
+        if all(found.get(k) == str(v) for k, v in labels.items()):
+            return float(match.group(3))
+    return None
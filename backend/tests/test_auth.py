@@ -0,0 +1,118 @@
+# backend/tests/test_auth.py
+"""Authentication and role check tests"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import decode_token
+from sqlalchemy import select, update
+from werkzeug.security import generate_password_hash
+
+from backend.app import db
+from backend.app.auth.decorators import invalidate_role
+from backend.app.models import User
+from conftest import count_queries
+
+
+def test_login_puts_role_in_token(app, client, admin_headers):
+    token = admin_headers['Authorization'].split()[1]
+    with app.app_context():
+        assert decode_token(token)['role'] == 'admin'
+
+
+def test_role_check_uses_cache(app, client, admin_headers, sust_headers):
+    assert client.post('/api/suppliers', json={'name': 'A'}, headers=sust_headers).status_code == 403
+    assert client.post('/api/suppliers', json={'name': 'A'}, headers=admin_headers).status_code == 201
+
+    with count_queries(app) as statements:
+        client.post('/api/suppliers', json={'name': 'B'}, headers=admin_headers)
+    assert not any('FROM users' in s for s in statements)
+
+
+def test_role_change_rejects_old_tokens(app, client, sust_headers):
+    client.get('/api/reports/emissions-by-item', headers=sust_headers)
+
+    with app.app_context():
+        user = User.query.filter_by(username='sust_mgr').first()
+        user.role = 'procurement_manager'
+        db.session.commit()
+        invalidate_role(user.id)
+
+    response = client.get('/api/reports/emissions-by-item', headers=sust_headers)
+    assert response.status_code == 401
+    assert response.get_json()['code'] == 'role_changed'
+
+
+def test_login_upgrades_stale_hash(app, client):
+    with app.app_context():
+        db.session.execute(update(User).where(User.username == 'admin')
+                           .values(password_hash=generate_password_hash('admin123', 'pbkdf2:sha256:500')))
+        db.session.commit()
+
+    assert client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).status_code == 200
+
+    with app.app_context():
+        stored = db.session.execute(select(User.password_hash).where(User.username == 'admin')).scalar()
+        assert stored.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    assert client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).status_code == 200
+
+
+def test_repeated_failures_lock_username_before_hashing(app, client, monkeypatch):
+    hasher = app.extensions['passwords']
+    for _ in range(app.config['LOGIN_MAX_FAILURES']):
+        response = client.post('/api/auth/login', json={'username': 'proc_mgr', 'password': 'wrong'})
+        assert response.status_code == 401
+
+    monkeypatch.setattr(hasher, 'verify', lambda *args: pytest.fail("hashed a locked username"))
+    response = client.post('/api/auth/login', json={'username': 'proc_mgr', 'password': 'proc123'})
+    assert response.status_code == 429
+    assert 0 < int(response.headers['Retry-After']) <= app.config['LOGIN_LOCKOUT_SECONDS'] + 1
+    monkeypatch.undo()
+
+    # Lockout over: the failures count from the start again
+    with app.app_context():
+        db.session.execute(update(User).where(User.username == 'proc_mgr')
+                           .values(last_failed_login=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+    assert client.post('/api/auth/login', json={'username': 'proc_mgr', 'password': 'wrong'}).status_code == 401
+    assert client.post('/api/auth/login', json={'username': 'proc_mgr', 'password': 'proc123'}).status_code == 200
+    with app.app_context():
+        assert User.query.filter_by(username='proc_mgr').first().failed_logins == 0
+
+
+def test_attempts_are_counted_before_hashing(app, client, monkeypatch):
+    hasher = app.extensions['passwords']
+    verify = hasher.verify
+    counted = []
+
+    def counting_verify(*args):
+        # What a concurrent attempt would see while this one hashes
+        with app.app_context():
+            counted.append(User.query.filter_by(username='proc_mgr').first().failed_logins)
+        return verify(*args)
+
+    monkeypatch.setattr(hasher, 'verify', counting_verify)
+    for password in ('wrong', 'wrong', 'proc123'):
+        client.post('/api/auth/login', json={'username': 'proc_mgr', 'password': password})
+
+    assert counted == [1, 2, 3]
+    with app.app_context():
+        assert User.query.filter_by(username='proc_mgr').first().failed_logins == 0
+
+
+def test_full_hash_pool_answers_429(app, client):
+    hasher = app.extensions['passwords']
+    taken = 0
+    while hasher.slots.acquire(blocking=False):
+        taken += 1
+    try:
+        response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    finally:
+        for _ in range(taken):
+            hasher.slots.release()
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    with app.app_context():
+        assert User.query.filter_by(username='admin').first().failed_logins == 0
+    assert client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).status_code == 200
@@ -0,0 +1,132 @@
+# backend/tests/test_batch.py
+"""POST /api/batch tests"""
+
+import threading
+
+from flask_jwt_extended import JWTManager
+
+from backend.app import create_app
+from backend.app.batch.dispatch import BatchDispatcher, SUB_REQUEST_KEY
+from backend.app.metrics import render
+from backend.config import config, TestingConfig
+from conftest import login, sample
+
+
+def batch(client, headers, *requests):
+    response = client.post('/api/batch', json={'requests': list(requests)}, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return {r['id']: r for r in response.get_json()['responses']}
+
+
+def test_sub_requests_run_in_order_with_their_own_status(client, admin_headers, sust_headers):
+    first = client.get('/api/suppliers', headers=admin_headers)
+
+    results = batch(
+        client, admin_headers,
+        {'id': 'before', 'url': '/api/suppliers', 'headers': {'If-None-Match': first.headers['ETag']}},
+        {'id': 'create', 'method': 'POST', 'url': '/api/suppliers', 'body': {'name': 'Batch Co'}},
+        {'id': 'after', 'url': '/api/suppliers?fields=id,name'},
+        {'id': 'missing', 'url': '/api/items/999'},
+        {'id': 'bad', 'url': '/api/items?sort=colour'},
+    )
+
+    assert results['before']['status'] == 304 and results['before']['body'] is None
+    assert results['create']['status'] == 201
+    assert results['after']['body'] == [{'id': results['create']['body']['id'], 'name': 'Batch Co'}]
+    assert results['after']['headers']['ETag'] != first.headers['ETag']
+    assert results['missing']['status'] == 404
+    assert results['bad']['status'] == 400 and 'Invalid sort' in results['bad']['body']['error']
+
+    # The caller's token and roles apply to every sub-request
+    denied = batch(client, sust_headers, {'id': 0, 'method': 'POST', 'url': '/api/suppliers', 'body': {'name': 'X'}})
+    assert denied[0]['status'] == 403
+
+
+def test_invalid_batches_are_rejected(app, client, admin_headers):
+    assert client.post('/api/batch', json={'requests': [{'url': '/api/items'}]}).status_code == 401
+
+    for body in (
+        {},
+        {'requests': []},
+        {'requests': [{'url': 'api/items'}]},
+        {'requests': [{'method': 'TRACE', 'url': '/api/items'}]},
+        {'requests': [{'url': '/api/batch', 'method': 'POST'}]},
+        {'requests': [{'url': '/api/%62atch', 'method': 'POST'}]},
+        {'requests': [{'url': '/api/b%61tch?x=1', 'method': 'POST'}]},
+        {'requests': [{'url': '/ping'}] * (app.config['BATCH_MAX_REQUESTS'] + 1)},
+    ):
+        response = client.post('/api/batch', json=body, headers=admin_headers)
+        assert response.status_code == 400, body
+
+    # A sub-request that reaches the batch endpoint anyway is refused
+    response = client.post('/api/batch', json={'requests': [{'url': '/ping'}]}, headers=admin_headers,
+                           environ_base={SUB_REQUEST_KEY: True})
+    assert response.status_code == 400 and 'nested' in response.get_json()['error']
+
+
+def test_token_is_decoded_once_per_batch(client, admin_headers, monkeypatch):
+    decoded = []
+    decode = JWTManager._decode_jwt_from_config
+
+    def counting_decode(self, *args, **kwargs):
+        decoded.append(args[0])
+        return decode(self, *args, **kwargs)
+
+    monkeypatch.setattr(JWTManager, '_decode_jwt_from_config', counting_decode)
+
+    results = batch(
+        client, admin_headers,
+        {'id': 'items', 'url': '/api/items'},
+        {'id': 'create', 'method': 'POST', 'url': '/api/suppliers', 'body': {'name': 'Once Co'}},
+        {'id': 'suppliers', 'url': '/api/suppliers'},
+    )
+
+    assert [results[key]['status'] for key in ('items', 'create', 'suppliers')] == [200, 201, 200]
+    assert len(decoded) == 1
+
+    # A token a sub-request brings itself is never taken in place of the batch's
+    results = batch(client, admin_headers, {'id': 0, 'url': '/api/items', 'headers': {'Authorization': 'Bearer x'}})
+    assert results[0]['status'] == 200 and len(decoded) == 2
+
+
+def test_consecutive_reads_run_concurrently(tmp_path, monkeypatch):
+    class BatchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'batch.db'}"
+        BATCH_WORKERS = 3
+
+    monkeypatch.setitem(config, 'batch_testing', BatchConfig)
+    app = create_app('batch_testing')
+    client = app.test_client()
+    client.post('/api/auth/init-users')
+    headers = login(client, 'admin', 'admin123')
+
+    threads = {}
+    dispatch = BatchDispatcher.dispatch
+
+    def recording_dispatch(self, environ):
+        threads[environ['REQUEST_METHOD'], environ['PATH_INFO']] = threading.current_thread().name
+        return dispatch(self, environ)
+
+    monkeypatch.setattr(BatchDispatcher, 'dispatch', recording_dispatch)
+
+    results = batch(
+        client, headers,
+        {'id': 'items', 'url': '/api/items'},
+        {'id': 'suppliers', 'url': '/api/suppliers'},
+        {'id': 'orders', 'url': '/api/purchase-orders'},
+        {'id': 'create', 'method': 'POST', 'url': '/api/items', 'body': {'name': 'Bolt', 'sku': 'B-1'}},
+    )
+
+    assert [results[key]['status'] for key in ('items', 'suppliers', 'orders', 'create')] == [200, 200, 200, 201]
+    assert all(threads['GET', path].startswith('batch')
+               for path in ('/api/items', '/api/suppliers', '/api/purchase-orders'))
+    # Writes stay on the batch's own thread
+    assert threads['POST', '/api/items'] == threading.current_thread().name
+    assert client.get('/api/items', headers=headers).get_json()[0]['sku'] == 'B-1'
+
+    # Sub-requests are measured as their own endpoints
+    text = render(app.extensions['metrics'].registry)
+    assert sample(text, 'http_requests_total', endpoint='suppliers.get_suppliers', method='GET', status=200) == 1
+    assert sample(text, 'http_requests_total', endpoint='batch.run_batch', method='POST', status=200) == 1
+
+    app.extensions['batch'].shutdown()
@@ -0,0 +1,60 @@
+# backend/tests/test_benchmarks.py
+"""Synthetic data and benchmark harness tests"""
+
+from sqlalchemy import select
+
+from backend.app import create_app, db
+from backend.app.models import Item, PurchaseOrder, PurchaseOrderItem
+from backend.benchmarks import datagen, harness, serialization
+
+
+def dataset_rows():
+    return (
+        db.session.execute(select(Item.sku, Item.category, Item.stock, Item.co2_per_unit).order_by(Item.id)).all(),
+        db.session.execute(select(PurchaseOrder.supplier_id, PurchaseOrder.order_date, PurchaseOrder.total_co2)
+                           .order_by(PurchaseOrder.id)).all(),
+        db.session.execute(select(PurchaseOrderItem.item_id, PurchaseOrderItem.quantity)
+                           .order_by(PurchaseOrderItem.id)).all()
+    )
+
+
+def test_generator_is_deterministic(app):
+    with app.app_context():
+        counts = datagen.generate('tiny', seed=7)
+        first = dataset_rows()
+    assert counts['items'] == 40
+    assert counts['purchase_order_items'] == len(first[2]) > 0
+
+    other = create_app('testing')
+    with other.app_context():
+        datagen.generate('tiny', seed=7)
+        assert dataset_rows() == first
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_harness_covers_every_endpoint(app):
+    with app.app_context():
+        datagen.generate('tiny')
+
+    result = harness.run_benchmarks(app, iterations=2)
+
+    assert result['uncovered'] == []
+    assert result['meta']['dataset']['items'] >= 40
+    for name, row in result['results'].items():
+        assert row['errors'] == 0, (name, row['statuses'])
+        assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms']
+    assert result['results']['reports.emissions_by_item']['statements'] >= 1
+
+    rows = harness.compare(result, result)
+    assert not any(row['regression'] for row in rows)
+
+
+def test_serialization_paths_agree(app):
+    with app.app_context():
+        datagen.generate('tiny')
+
+    rows = serialization.compare_paths(app, repeat=1)
+
+    assert {row['name'] for row in rows} == set(serialization.CASES)
+    assert all(row['same'] and row['rows'] > 0 for row in rows)
@@ -0,0 +1,97 @@
+# backend/tests/test_database.py
+"""SQLite engine profile tests"""
+
+import os
+
+from sqlalchemy import event
+
+from backend.app import create_app, db
+from backend.app.migrations import upgrade
+from backend.app.models import Job
+from backend.app.server import warm_up, init_worker, stop_worker
+from backend.config import config, ProductionConfig
+from conftest import login
+
+
+def make_production_app(tmp_path, monkeypatch):
+    """Production profile pointed at a temporary database file"""
+    uri = f"sqlite:///{tmp_path / 'prod.db'}"
+
+    class TmpProductionConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_BINDS = {'read': {**ProductionConfig.SQLALCHEMY_BINDS['read'], 'url': uri}}
+        REPORT_CACHE_PATH = str(tmp_path / 'report_cache.db')
+        METRICS_DIR = str(tmp_path / 'metrics')
+
+    monkeypatch.setitem(config, 'tmp_production', TmpProductionConfig)
+    app = create_app('tmp_production')
+    with app.app_context():
+        upgrade()
+    return app
+
+
+def test_production_pragmas(tmp_path, monkeypatch):
+    app = make_production_app(tmp_path, monkeypatch)
+
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        with db.engines['read'].connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+
+
+def test_get_requests_use_read_pool(tmp_path, monkeypatch):
+    app = make_production_app(tmp_path, monkeypatch)
+    client = app.test_client()
+    client.post('/api/auth/init-users')
+    headers = login(client, 'admin', 'admin123')
+
+    used = {'read': 0, 'write': 0}
+    with app.app_context():
+        read, write = db.engines['read'], db.engine
+
+    def counter(key):
+        def before_cursor_execute(*args):
+            used[key] += 1
+        return before_cursor_execute
+
+    event.listen(read, 'before_cursor_execute', counter('read'))
+    event.listen(write, 'before_cursor_execute', counter('write'))
+
+    assert client.post('/api/suppliers', json={'name': 'Acme'}, headers=headers).status_code == 201
+    writes = used['write']
+    assert writes > 0
+
+    assert client.get('/api/suppliers', headers=headers).get_json()[0]['name'] == 'Acme'
+    assert used['write'] == writes
+    assert used['read'] > 0
+
+
+def test_forked_worker_opens_its_own_pools(tmp_path, monkeypatch):
+    app = make_production_app(tmp_path, monkeypatch)
+    runner = app.extensions['jobs']
+    with app.app_context():
+        db.session.add(Job(id='orphan', kind='reports.rebuild', status='running'))
+        db.session.commit()
+
+    warm_up(app)
+    with app.app_context():
+        # Left unfinished by the previous server run
+        assert db.session.get(Job, 'orphan').status == 'failed'
+    with app.app_context():
+        assert db.engines['read'].pool.checkedin() == 0
+
+    init_worker(app)
+    assert app.extensions['jobs'] is not runner
+    with app.app_context():
+        assert db.engines['read'].pool.checkedin() == ProductionConfig.SQLALCHEMY_BINDS['read']['pool_size']
+        assert db.engine.pool.checkedin() == 1
+
+    client = app.test_client()
+    client.post('/api/auth/init-users')
+    assert client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).status_code == 200
+    stop_worker(app)
+    assert os.listdir(tmp_path / 'metrics') == [f'{os.getpid()}.json']
+    assert app.extensions['metrics'].stopped.is_set()
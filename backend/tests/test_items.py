@@ -0,0 +1,160 @@
+# backend/tests/test_items.py
+"""Item endpoint tests"""
+
+import io
+from datetime import datetime
+
+from sqlalchemy import update, delete
+
+from backend.app import db
+from backend.app.items import inventory
+from backend.app.models import Item, InventoryMovement
+
+
+def test_import_upserts_on_sku(client, admin_headers):
+    client.post('/api/items', json={'name': 'Steel', 'sku': 'S1', 'co2_per_unit': 2.0}, headers=admin_headers)
+
+    csv_data = (
+        "sku,name,category,co2_per_unit,is_active\n"
+        "S1,Steel v2,metal,2.5,yes\n"
+        "W1,Wood,timber,0.4,\n"
+        ",No SKU,misc,1,1\n"
+        "G1,Glass,glass,abc,1\n"
+    )
+    response = client.post(
+        '/api/items/import',
+        data={'file': (io.BytesIO(csv_data.encode()), 'catalogue.csv')},
+        headers=admin_headers,
+        content_type='multipart/form-data'
+    )
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert (summary['inserted'], summary['updated'], summary['rejected']) == (1, 1, 2)
+    assert [e['line'] for e in summary['errors']] == [4, 5]
+
+    items = {i['sku']: i for i in client.get('/api/items', headers=admin_headers).get_json()}
+    assert items['S1']['name'] == 'Steel v2'
+    assert items['S1']['co2_per_unit'] == 2.5
+    assert items['W1']['category'] == 'timber'
+    assert items['W1']['reorder_level'] == 10
+
+
+def test_import_blank_cells_keep_existing_values(client, admin_headers):
+    client.post('/api/items', json={'name': 'Steel', 'sku': 'S1', 'category': 'metal', 'reorder_level': 7,
+                                    'stock': 5}, headers=admin_headers)
+
+    csv_data = (
+        "sku,name,category,reorder_level,stock\n"
+        "S1,Steel v2,,,\n"
+        "W1,Wood,,,\n"
+        "G1,Glass,glass,3,4\n"
+    )
+    response = client.post('/api/items/import', data=csv_data, headers={**admin_headers, 'Content-Type': 'text/csv'})
+    assert response.get_json()['inserted'] == 2
+
+    items = {i['sku']: i for i in client.get('/api/items', headers=admin_headers).get_json()}
+    assert (items['S1']['name'], items['S1']['category'], items['S1']['reorder_level'], items['S1']['stock']) \
+        == ('Steel v2', 'metal', 7, 5)
+    assert (items['W1']['category'], items['W1']['reorder_level'], items['W1']['stock']) == ('', 10, 0)
+    assert (items['G1']['category'], items['G1']['reorder_level'], items['G1']['stock']) == ('glass', 3, 4)
+
+
+def test_import_requires_sku_and_name_columns(client, admin_headers):
+    response = client.post('/api/items/import', data="sku,price\nS1,3\n",
+                           headers={**admin_headers, 'Content-Type': 'text/csv'})
+    assert response.status_code == 400
+
+
+def test_items_list_answers_conditional_get(client, admin_headers):
+    client.post('/api/items', json={'name': 'Steel', 'sku': 'S1'}, headers=admin_headers)
+
+    first = client.get('/api/items', headers=admin_headers)
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+
+    again = client.get('/api/items', headers={**admin_headers, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+    other_query = client.get('/api/items?category=x', headers={**admin_headers, 'If-None-Match': etag})
+    assert other_query.status_code == 200
+
+    # Bulk writes outside the ORM unit of work bump the generation too
+    client.post('/api/items/import', data="sku,name\nS2,Wood\n",
+                headers={**admin_headers, 'Content-Type': 'text/csv'})
+    changed = client.get('/api/items', headers={**admin_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(changed.get_json()) == 2
+
+
+def test_stock_changes_are_booked_in_the_ledger(app, client, admin_headers):
+    item = client.post('/api/items', json={'name': 'Steel', 'sku': 'S1', 'stock': 5},
+                       headers=admin_headers).get_json()
+    supplier = client.post('/api/suppliers', json={'name': 'S'}, headers=admin_headers).get_json()
+    order = client.post('/api/purchase-orders', json={
+        'supplier_id': supplier['id'], 'items': [{'item_id': item['id'], 'quantity': 10}]
+    }, headers=admin_headers).get_json()
+
+    client.put(f"/api/items/{item['id']}", json={'stock': 8}, headers=admin_headers)
+    for stock in ('abc', 1.9, True):
+        rejected = client.put(f"/api/items/{item['id']}", json={'name': 'Renamed', 'stock': stock},
+                              headers=admin_headers)
+        assert rejected.status_code == 400
+        assert client.post('/api/items', json={'name': 'Bad', 'sku': 'B1', 'stock': stock},
+                           headers=admin_headers).status_code == 400
+    assert client.get(f"/api/items/{item['id']}", headers=admin_headers).get_json()['name'] == 'Steel'
+    client.post(f"/api/items/{item['id']}/movements", json={'quantity': -2, 'reason': 'consumption'},
+                headers=admin_headers)
+    client.put(f"/api/purchase-orders/{order['id']}", json={'status': 'received'}, headers=admin_headers)
+    client.post('/api/items/import', data="sku,name,stock\nS1,Steel,20\n",
+                headers={**admin_headers, 'Content-Type': 'text/csv'})
+
+    movements = client.get(f"/api/items/{item['id']}/movements", headers=admin_headers).get_json()
+    assert [(m['reason'], m['quantity']) for m in movements] == [
+        ('initial', 5), ('adjustment', 3), ('consumption', -2), ('receipt', 10), ('import', 4)
+    ]
+    assert client.get(f"/api/items/{item['id']}", headers=admin_headers).get_json()['stock'] == 20
+
+    with app.app_context():
+        db.session.execute(update(Item).values(stock=0))
+        db.session.commit()
+        assert inventory.rebuild_stock() == 1
+        assert db.session.get(Item, item['id']).stock == 20
+
+    # A count is booked against the stored stock, not the loaded one
+    with app.app_context():
+        loaded = db.session.get(Item, item['id'])
+        with app.app_context():
+            inventory.record_movements([(item['id'], 5)], 'receipt')
+            db.session.commit()
+        assert loaded.stock == 20
+        assert inventory.set_stock(loaded.id, 30) == 1
+        db.session.commit()
+        latest = InventoryMovement.query.order_by(InventoryMovement.id.desc()).first()
+        assert (latest.reason, latest.quantity) == ('adjustment', 5)
+        assert db.session.get(Item, item['id']).stock == 30
+
+
+def test_stock_as_of_reads_snapshot_plus_delta(app, client, admin_headers):
+    item = client.post('/api/items', json={'name': 'Steel', 'sku': 'S1', 'stock': 5, 'co2_per_unit': 2.0},
+                       headers=admin_headers).get_json()
+
+    with app.app_context():
+        taken = inventory.take_snapshot(datetime.utcnow())
+        # The snapshot stands in for the history before it
+        db.session.execute(delete(InventoryMovement))
+        db.session.commit()
+
+    client.put(f"/api/items/{item['id']}", json={'stock': 7}, headers=admin_headers)
+
+    now = client.get('/api/items/stock?as_of=2999-01-01', headers=admin_headers).get_json()
+    assert now == [{'item_id': item['id'], 'sku': 'S1', 'name': 'Steel', 'co2_per_unit': 2.0,
+                    'stock': 7, 'stock_co2': 14.0}]
+
+    at_snapshot = client.get(f'/api/items/stock?as_of={taken.isoformat()}', headers=admin_headers).get_json()
+    assert at_snapshot[0]['stock'] == 5
+
+    before = client.get('/api/items/stock?as_of=2000-01-01', headers=admin_headers).get_json()
+    assert before[0]['stock'] == 0
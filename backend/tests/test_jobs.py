@@ -0,0 +1,107 @@
+# backend/tests/test_jobs.py
+"""Background job tests"""
+
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from conftest import login
+from backend.app import create_app, db
+from backend.app.jobs.runner import JOB_HANDLERS, get_runner
+from backend.app.models import Job
+from backend.config import config, TestingConfig
+
+
+def test_import_job_runs_and_reports_result(app, client, admin_headers, sust_headers):
+    response = client.post('/api/items/import?async=true', data="sku,name,stock\nS1,Steel,5\nS2,Wood,\n",
+                           headers={**admin_headers, 'Content-Type': 'text/csv'})
+    assert response.status_code == 202
+    assert response.headers['Location'].endswith(f"/api/jobs/{response.get_json()['id']}")
+
+    job = client.get(response.headers['Location'], headers=admin_headers).get_json()
+    assert job['status'] == 'succeeded'
+    assert job['progress'] == 1.0
+    assert job['result']['inserted'] == 2
+    assert 'expires_at' in job
+
+    # Jobs are private to their owner (and admins)
+    assert client.get(response.headers['Location'], headers=sust_headers).status_code == 404
+    assert client.post(f"{response.headers['Location']}/cancel", headers=admin_headers).status_code == 409
+
+
+def test_finished_jobs_are_purged_after_retention(app, client, admin_headers):
+    first = client.post('/api/reports/rebuild', headers=admin_headers).get_json()
+    assert first['status'] == 'succeeded'
+
+    with app.app_context():
+        db.session.execute(update(Job).where(Job.id == first['id']).values(
+            finished_at=datetime.utcnow() - timedelta(seconds=app.config['JOB_RESULT_TTL'] + 1)
+        ))
+        db.session.commit()
+
+    # A job its crashed process never finished
+    with app.app_context():
+        db.session.add(Job(id='lost', kind='reports.rebuild', status='running', created_by_user_id=1,
+                           created_at=datetime.utcnow() - timedelta(seconds=app.config['JOB_RESULT_TTL'] + 1)))
+        db.session.commit()
+
+    # Submitting a job purges expired ones and fails abandoned ones
+    client.post('/api/reports/rebuild', headers=admin_headers)
+    assert client.get(f"/api/jobs/{first['id']}", headers=admin_headers).status_code == 404
+    lost = client.get('/api/jobs/lost', headers=admin_headers).get_json()
+    assert lost['status'] == 'failed' and lost['error']
+
+
+def test_running_job_can_be_cancelled(tmp_path, monkeypatch):
+    class WorkerConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'jobs.db'}"
+        JOB_WORKERS = 1
+        JOB_QUEUE_LIMIT = 0
+
+    monkeypatch.setitem(config, 'job_testing', WorkerConfig)
+    app = create_app('job_testing')
+    client = app.test_client()
+    client.post('/api/auth/init-users')
+    headers = login(client, 'admin', 'admin123')
+
+    started = threading.Event()
+
+    def loop(ctx):
+        started.set()
+        for step in range(500):
+            ctx.progress((step + 1) / 500)
+            time.sleep(0.01)
+
+    monkeypatch.setitem(JOB_HANDLERS, 'test.loop', loop)
+
+    with app.app_context():
+        job_id = get_runner().submit('test.loop', user_id=1).id
+    assert started.wait(5)
+
+    # One worker and no queue: another job is turned away
+    busy = client.post('/api/reports/rebuild', headers=headers)
+    assert busy.status_code == 503
+    assert busy.headers['Retry-After']
+
+    # ... and an upload it turns away does not stay on disk
+    uploads = tmp_path / 'uploads'
+    uploads.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(uploads))
+    busy = client.post('/api/items/import?async=true', data="sku,name\nS1,Steel\n",
+                       headers={**headers, 'Content-Type': 'text/csv'})
+    assert busy.status_code == 503
+    assert list(uploads.iterdir()) == []
+
+    assert client.post(f'/api/jobs/{job_id}/cancel', headers=headers).status_code == 202
+    for _ in range(200):
+        body = client.get(f'/api/jobs/{job_id}', headers=headers).get_json()
+        if body['status'] == 'cancelled':
+            break
+        time.sleep(0.02)
+    assert body['status'] == 'cancelled'
+    assert 0 < body['progress'] < 1
+
+    app.extensions['jobs'].executor.shutdown(wait=True)
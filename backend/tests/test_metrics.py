@@ -0,0 +1,84 @@
+# backend/tests/test_metrics.py
+"""Request metrics tests"""
+
+import json
+import logging
+
+import pytest
+from flask import request
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend.app import db
+from backend.app.metrics import retire_worker, _STATE_KEY
+from conftest import sample
+
+
+def test_requests_are_timed_and_their_statements_counted(client, admin_headers):
+    client.post('/api/suppliers', json={'name': 'Acme'}, headers=admin_headers)
+    for _ in range(3):
+        client.get('/api/suppliers', headers=admin_headers)
+    client.get('/api/no-such-route')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    assert sample(text, 'http_requests_total', endpoint='suppliers.get_suppliers', method='GET', status=200) == 3
+    assert sample(text, 'http_requests_total', endpoint='unmatched', status=404) == 1
+    assert sample(text, 'http_request_duration_seconds_count', blueprint='suppliers',
+                  endpoint='suppliers.get_suppliers', method='GET') == 3
+    assert sample(text, 'http_request_duration_seconds_bucket', endpoint='suppliers.get_suppliers', le='+Inf') == 3
+
+    statements = sample(text, 'db_statements_per_request_sum', endpoint='suppliers.create_supplier')
+    assert statements >= 1
+    assert sample(text, 'db_statements_per_request_count', endpoint='suppliers.create_supplier') == 1
+
+
+def test_slow_statements_are_logged(app, client, admin_headers, caplog):
+    app.config['SLOW_QUERY_MS'] = 0
+    with caplog.at_level(logging.WARNING, logger='backend.app.metrics.slow'):
+        client.get('/api/suppliers?name=Acme', headers=admin_headers)
+
+    assert any('suppliers.get_suppliers' in r.getMessage() and 'SELECT' in r.getMessage()
+               for r in caplog.records)
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample(text, 'db_slow_statements_total', endpoint='suppliers.get_suppliers') >= 1
+
+
+def test_failed_statements_are_timed(app):
+    with app.test_request_context('/api/items'):
+        app.extensions['metrics'].before_request()
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+
+        # Nothing left behind on the pooled connection, and the time counts
+        assert not connection.info.get('_metrics_started')
+        state = request.environ[_STATE_KEY]
+        assert state[1] == 1 and state[2] > 0
+        db.session.rollback()
+
+
+def test_metrics_add_up_worker_snapshots(app, client, tmp_path):
+    app.config['METRICS_DIR'] = app.extensions['metrics'].directory = str(tmp_path)
+    (tmp_path / '1.json').write_text(json.dumps({
+        'http_requests_total': [[['', 'ping', 'GET', '200'], 5.0]]
+    }))
+
+    client.get('/ping')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample(text, 'http_requests_total', endpoint='ping', status=200) == 6
+
+    # An exited worker's totals are kept in retired.json
+    retire_worker(app, 1)
+    assert not (tmp_path / '1.json').exists()
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample(text, 'http_requests_total', endpoint='ping', status=200) == 6
+
+
+def test_metrics_token(app, client):
+    app.config['METRICS_TOKEN'] = 'secret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
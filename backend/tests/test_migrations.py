@@ -0,0 +1,99 @@
+# backend/tests/test_migrations.py
+"""Schema migration and query plan tests"""
+
+from sqlalchemy import create_engine, inspect, select
+
+from backend.app import create_app, db
+from backend.app.migrations import upgrade, current_version
+from backend.app.migrations.plans import check_query_plans
+from backend.app.migrations.versions import MIGRATIONS
+from backend.app.models import ItemEmission, SupplierEmissionBucket
+from backend.app.reports import rollups
+from backend.config import config, TestingConfig
+
+
+def test_app_starts_at_latest_version(app):
+    with app.app_context():
+        assert current_version() == MIGRATIONS[-1][0]
+        assert upgrade() == []
+
+
+def test_upgrade_adopts_database_created_without_migrations(app, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in MIGRATIONS[0][2]:
+            conn.exec_driver_sql(statement)
+
+    with app.app_context():
+        applied = upgrade(engine)
+
+    assert [step for step, _ in applied] == [step for step, _, _ in MIGRATIONS]
+    assert 'ix_purchase_orders_total_co2' in {
+        index['name'] for index in inspect(engine).get_indexes('purchase_orders')
+    }
+
+
+def test_upgrade_backfills_emission_rollups(tmp_path, monkeypatch):
+    path = tmp_path / 'legacy.db'
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for statement in MIGRATIONS[0][2]:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql("INSERT INTO users VALUES (1, 'admin', 'x', 'admin', '2025-01-01 00:00:00.000000')")
+        conn.exec_driver_sql("INSERT INTO suppliers (id, name, created_at) VALUES "
+                             "(1, 'A', '2025-01-01 00:00:00.000000'), (2, 'B', '2025-01-01 00:00:00.000000')")
+        conn.exec_driver_sql("INSERT INTO items (id, name, sku, category, unit, stock, reorder_level, co2_per_unit, "
+                             "is_active, created_at) VALUES (1, 'Steel', 'S1', '', '', 0, 10, 1.5, 1, "
+                             "'2025-01-01 00:00:00.000000'), (2, 'Wood', 'W1', '', '', 0, 10, 0.5, 1, "
+                             "'2025-01-01 00:00:00.000000')")
+        for order_id, supplier_id, day in ((1, 1, '2025-01-15'), (2, 1, '2025-02-03'), (3, 1, '2025-04-01'),
+                                           (4, 2, '2025-12-30')):
+            conn.exec_driver_sql(
+                f"INSERT INTO purchase_orders (id, supplier_id, created_by_user_id, status, order_date, "
+                f"total_amount, total_co2, created_at) VALUES ({order_id}, {supplier_id}, 1, 'received', "
+                f"'{day} 09:30:00.000000', {order_id * 10.0}, {order_id * 1.5}, '{day} 09:30:00.000000')"
+            )
+            conn.exec_driver_sql(
+                f"INSERT INTO purchase_order_items (purchase_order_id, item_id, quantity, unit_price, line_co2) "
+                f"VALUES ({order_id}, {1 + order_id % 2}, {order_id}, 10.0, {order_id * 1.5})"
+            )
+
+    class LegacyConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    monkeypatch.setitem(config, 'legacy_testing', LegacyConfig)
+    app = create_app('legacy_testing')
+
+    def rollup_rows():
+        items = db.session.execute(select(
+            ItemEmission.item_id, ItemEmission.total_co2, ItemEmission.total_quantity, ItemEmission.line_count
+        ).order_by(ItemEmission.item_id)).all()
+        buckets = db.session.execute(select(SupplierEmissionBucket.__table__).order_by(
+            SupplierEmissionBucket.supplier_id, SupplierEmissionBucket.granularity, SupplierEmissionBucket.period_start
+        )).all()
+        return items, buckets
+
+    with app.app_context():
+        migrated = rollup_rows()
+        assert len(migrated[0]) == 2 and len(migrated[1]) == 3 + 2 + 2
+        rollups.rebuild_item_emissions()
+        rollups.rebuild_supplier_buckets()
+        assert rollup_rows() == migrated
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_report_and_list_queries_use_indexes(app):
+    with app.app_context():
+        assert check_query_plans() == []
+
+
+def test_plan_check_reports_missing_index(app, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'no_indexes.db'}")
+    with app.app_context():
+        upgrade(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_purchase_orders_status")
+        problems = check_query_plans(engine)
+
+    assert ('orders by status', 'SCAN purchase_orders') in problems
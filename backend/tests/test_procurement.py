@@ -0,0 +1,218 @@
+# backend/tests/test_procurement.py
+"""Purchase order endpoint tests"""
+
+import base64
+import json
+import threading
+
+from backend.app import create_app, db
+from backend.config import config, TestingConfig
+from conftest import login, count_queries, create_orders
+
+
+def test_order_list_query_count_is_constant(app, client, admin_headers):
+    counts = []
+    for new_orders, page_size in ((2, 2), (8, 10)):
+        create_orders(client, admin_headers, new_orders)
+        with count_queries(app) as statements:
+            response = client.get(f'/api/purchase-orders?include=items&limit={page_size}', headers=admin_headers)
+        assert response.status_code == 200
+        page = response.get_json()['data']
+        assert len(page) == page_size
+        assert all(len(order['items']) == 2 and order['items'][0]['item_name'] for order in page)
+        assert all(order['supplier_name'] for order in page)
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_order_list_skips_items_unless_included(client, admin_headers):
+    create_orders(client, admin_headers, 1)
+
+    orders = client.get('/api/purchase-orders', headers=admin_headers).get_json()
+    assert 'items' not in orders[0]
+
+    orders = client.get('/api/purchase-orders?include=items', headers=admin_headers).get_json()
+    assert len(orders[0]['items']) == 2
+
+
+def test_export_streams_one_row_per_line(client, admin_headers):
+    create_orders(client, admin_headers, 3)
+
+    response = client.get('/api/purchase-orders/export?format=csv', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith('order_id,status,order_date')
+    assert len(lines) == 1 + 3 * 2
+
+    response = client.get('/api/purchase-orders/export?format=ndjson&supplier_id=1', headers=admin_headers)
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+
+
+def test_batch_create_reports_errors_per_order(client, admin_headers):
+    create_orders(client, admin_headers, 1)
+    item_ids = [line['item_id'] for line in
+                client.get('/api/purchase-orders/1', headers=admin_headers).get_json()['items']]
+
+    response = client.post('/api/purchase-orders/batch', json={'orders': [
+        {'supplier_id': 1, 'items': [{'item_id': item_ids[0], 'quantity': 4, 'unit_price': 2}]},
+        {'supplier_id': 1, 'items': [{'item_id': 999, 'quantity': 1}]},
+        {'supplier_id': 42, 'items': [{'item_id': item_ids[1]}]},
+        5,
+        {'supplier_id': 1, 'items': [5]},
+        {'supplier_id': 1, 'items': 'abc'},
+        {'supplier_id': 1, 'items': [{'item_id': item_ids[0], 'unit_price': 'x'}]},
+        {'supplier_id': 1, 'items': [{'item_id': item_ids[0], 'unit_price': -5}]},
+        {'supplier_id': 1, 'status': 'shipped', 'items': [{'item_id': item_ids[0]}]},
+        {'supplier_id': [1], 'items': [{'item_id': item_ids[0]}]},
+        {'supplier_id': 1, 'items': [{'item_id': [item_ids[0]]}]},
+        {'supplier_id': 1, 'items': [{'item_id': item_ids[0], 'quantity': 1.5}]},
+    ]}, headers=admin_headers)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [c['index'] for c in body['created']] == [0]
+    assert [e['index'] for e in body['errors']] == [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+
+    # The single-order endpoints share the line checks
+    for data in ({'supplier_id': 1, 'items': [{'item_id': item_ids[0], 'unit_price': -5}]},
+                 {'supplier_id': 1, 'status': 'shipped', 'items': [{'item_id': item_ids[0]}]},
+                 {'supplier_id': [1], 'items': [{'item_id': item_ids[0]}]},
+                 {'supplier_id': 1, 'items': [{'item_id': item_ids[0], 'quantity': 1.5}]}):
+        assert client.post('/api/purchase-orders', json=data, headers=admin_headers).status_code == 400
+    assert client.put('/api/purchase-orders/1', json={'status': 'shipped'}, headers=admin_headers).status_code == 400
+    assert client.post('/api/purchase-orders/batch', json=[5], headers=admin_headers).status_code == 400
+
+    order = client.get(f"/api/purchase-orders/{body['created'][0]['id']}", headers=admin_headers).get_json()
+    assert order['total_amount'] == 8
+    assert order['total_co2'] == 6.0
+    assert len(order['items']) == 1
+
+
+def test_malformed_cursors_are_rejected(client, admin_headers):
+    create_orders(client, admin_headers, 3)
+    page = client.get('/api/purchase-orders?limit=2&sort=created_at', headers=admin_headers).get_json()
+    rest = client.get(f"/api/purchase-orders?limit=2&sort=created_at&cursor={page['next_cursor']}",
+                      headers=admin_headers).get_json()
+    assert len(rest['data']) == 1
+
+    def b64(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+    for url in (
+        '/api/suppliers?cursor=%25%25',
+        f"/api/suppliers?cursor={b64([1, [2]])}",
+        f"/api/suppliers?cursor={b64([[1], 2])}",
+        f"/api/suppliers?cursor={b64(['a', 'x'])}",
+        f"/api/purchase-orders?sort=created_at&cursor={b64([5, 1])}",
+        f"/api/purchase-orders?sort=created_at&cursor={b64(['yesterday', 1])}",
+    ):
+        assert client.get(url, headers=admin_headers).status_code == 400, url
+
+
+def test_stale_version_is_rejected(client, admin_headers):
+    create_orders(client, admin_headers, 1)
+    order = client.get('/api/purchase-orders/1', headers=admin_headers).get_json()
+
+    ok = client.put('/api/purchase-orders/1', json={'status': 'submitted', 'version': order['version']},
+                    headers=admin_headers)
+    assert ok.status_code == 200
+    assert ok.get_json()['version'] == order['version'] + 1
+
+    stale = client.put('/api/purchase-orders/1', json={'status': 'received', 'version': order['version']},
+                       headers=admin_headers)
+    assert stale.status_code == 409
+
+
+def test_concurrent_receipts_add_stock_once(tmp_path, monkeypatch):
+    class FileTestingConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'stress.db'}"
+
+    monkeypatch.setitem(config, 'file_testing', FileTestingConfig)
+    app = create_app('file_testing')
+    client = app.test_client()
+    client.post('/api/auth/init-users')
+    headers = login(client, 'admin', 'admin123')
+
+    supplier = client.post('/api/suppliers', json={'name': 'S'}, headers=headers).get_json()
+    items = [
+        client.post('/api/items', json={'name': f'Item {k}', 'sku': f'K{k}'}, headers=headers).get_json()
+        for k in range(2)
+    ]
+    order_ids = [
+        client.post('/api/purchase-orders', json={'supplier_id': supplier['id'], 'items': [
+            {'item_id': items[0]['id'], 'quantity': 3},
+            {'item_id': items[0]['id'], 'quantity': 2},
+            {'item_id': items[1]['id'], 'quantity': 7},
+        ]}, headers=headers).get_json()['id']
+        for _ in range(6)
+    ]
+
+    # Every order is received twice at the same time
+    barrier = threading.Barrier(len(order_ids) * 2)
+    statuses = []
+
+    def receive(order_id):
+        worker = app.test_client()
+        barrier.wait()
+        response = worker.put(f'/api/purchase-orders/{order_id}', json={'status': 'received'}, headers=headers)
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=receive, args=(order_id,)) for order_id in order_ids * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(statuses) <= {200, 409}
+    stock = {i['id']: i['stock'] for i in client.get('/api/items', headers=headers).get_json()}
+    assert stock[items[0]['id']] == items[0]['stock'] + 5 * len(order_ids)
+    assert stock[items[1]['id']] == items[1]['stock'] + 7 * len(order_ids)
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_reorder_drafts_orders_from_cheapest_supplier(client, admin_headers):
+    low = client.post('/api/items', json={'name': 'Low', 'sku': 'L1', 'stock': 0, 'reorder_level': 10,
+                                          'co2_per_unit': 1.0}, headers=admin_headers).get_json()
+    client.post('/api/items', json={'name': 'Full', 'sku': 'F1', 'stock': 500, 'reorder_level': 10},
+                headers=admin_headers)
+    client.post('/api/items', json={'name': 'Unknown', 'sku': 'U1', 'stock': 1}, headers=admin_headers)
+    cheap = client.post('/api/suppliers', json={'name': 'Cheap'}, headers=admin_headers).get_json()
+    dear = client.post('/api/suppliers', json={'name': 'Dear'}, headers=admin_headers).get_json()
+    for supplier, price in ((dear, 4.0), (cheap, 3.0)):
+        order = client.post('/api/purchase-orders', json={'supplier_id': supplier['id'], 'items': [
+            {'item_id': low['id'], 'quantity': 90, 'unit_price': price}
+        ]}, headers=admin_headers).get_json()
+        client.put(f"/api/purchase-orders/{order['id']}", json={'status': 'received'}, headers=admin_headers)
+    # ... and used up since
+    client.put(f"/api/items/{low['id']}", json={'stock': 0}, headers=admin_headers)
+
+    low_stock = client.get('/api/items/low-stock', headers=admin_headers).get_json()
+    assert [i['sku'] for i in low_stock] == ['L1', 'U1']
+
+    suggestions = client.get('/api/purchase-orders/reorder-suggestions', headers=admin_headers).get_json()
+    first = suggestions[0]
+    assert (first['supplier_id'], first['unit_price']) == (cheap['id'], 3.0)
+    # 180 units over 90 days -> 2/day; reorder_level 10 + 30 days of cover
+    assert first['suggested_quantity'] == 70
+
+    response = client.post('/api/purchase-orders/reorder', json={}, headers=admin_headers)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert len(body['created']) == 1
+    assert body['skipped'] == [suggestions[1]['item_id']]
+
+    draft = client.get(f"/api/purchase-orders/{body['created'][0]['id']}", headers=admin_headers).get_json()
+    assert (draft['status'], draft['supplier_id'], draft['items'][0]['quantity']) == ('draft', cheap['id'], 70)
+
+    # The draft covers the shortfall: asking again drafts nothing more
+    suggestions = client.get('/api/purchase-orders/reorder-suggestions', headers=admin_headers).get_json()
+    assert low['id'] not in [s['item_id'] for s in suggestions]
+    again = client.post('/api/purchase-orders/reorder', json={}, headers=admin_headers)
+    assert again.status_code == 200 and again.get_json()['created'] == []
+
+    assert client.post('/api/purchase-orders/reorder', json=[1], headers=admin_headers).status_code == 400
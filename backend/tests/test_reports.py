@@ -0,0 +1,139 @@
+# backend/tests/test_reports.py
+"""Report endpoint tests"""
+
+from flask import jsonify
+
+from backend.app.reports import analytics, rollups
+from backend.app.reports.cache import SQLiteBackend, cached_report
+from conftest import count_queries, create_orders
+
+
+def test_report_cache_serves_repeats_until_orders_commit(app, client, admin_headers):
+    create_orders(client, admin_headers, 2)
+
+    first = client.get('/api/reports/emissions-by-item', headers=admin_headers)
+    assert first.status_code == 200
+
+    with count_queries(app) as statements:
+        again = client.get('/api/reports/emissions-by-item', headers=admin_headers)
+    assert again.get_json() == first.get_json()
+    assert not [s for s in statements if 'item_emissions.total_co2' in s]
+
+    # A committed order clears the cached report
+    create_orders(client, admin_headers, 1)
+    changed = client.get('/api/reports/emissions-by-item', headers=admin_headers).get_json()
+    assert len(changed) == len(first.get_json()) + 2
+
+
+def test_report_computed_across_a_commit_is_not_served_after_it(app, client, admin_headers):
+    runs = []
+
+    @cached_report('suppliers')
+    def report():
+        runs.append(len(runs))
+        if len(runs) == 1:
+            # Another request commits while this report is being computed
+            assert client.post('/api/suppliers', json={'name': 'Late'}, headers=admin_headers).status_code == 201
+        return jsonify(runs[-1]), 200
+
+    for expected in (0, 1, 1):
+        with app.test_request_context('/api/reports/test'):
+            assert report().get_json() == expected
+
+
+def test_sqlite_cache_is_shared_and_bounded(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    writer, reader = SQLiteBackend(path, 2), SQLiteBackend(path, 2)
+
+    writer.set('a', b'1', ['items'])
+    writer.set('b', b'2', ['suppliers'])
+    assert reader.get('a') == b'1'
+
+    writer.set('c', b'3', ['items'])
+    assert reader.get('b') is None
+
+    reader.invalidate(['items'])
+    assert writer.get('a') is None and writer.get('c') is None
+
+
+def test_substitutes_respect_price_limit():
+    # item 1: supplier 10 is dirty, 20 is cleaner at +4%, 30 cleanest at +50%
+    matrix = analytics.build_matrix([
+        (1, 10, 100, 500.0, 1000.0),
+        (1, 20, 50, 100.0, 520.0),
+        (1, 30, 10, 10.0, 150.0),
+        (2, 10, 5, 5.0, 10.0),
+    ])
+
+    ranked, total_co2, savings = analytics.rank_substitutions(matrix, max_price_delta=0.05)
+    assert [r['item_id'] for r in ranked] == [1]
+    sub = ranked[0]['substitutions'][0]
+    assert (sub['from_supplier_id'], sub['to_supplier_id']) == (10, 20)
+    assert sub['co2_saved'] == 300.0
+    assert total_co2 == 615.0 and savings == 300.0
+
+    ranked, _, _ = analytics.rank_substitutions(matrix, max_price_delta=0.6)
+    assert ranked[0]['substitutions'][0]['to_supplier_id'] == 30
+
+    # Zero and negative prices never borrow another item's supplier
+    matrix = analytics.build_matrix([
+        (1, 10, 10, 500.0, 100.0),
+        (2, 20, 10, 10.0, -10000.0),
+        (2, 30, 10, 400.0, 0.0),
+        (2, 40, 10, 300.0, 50.0),
+    ])
+    best, saved = analytics.best_substitutes(matrix, max_price_delta=0.05)
+    assert best[0] == 0 and saved[0] == 0.0
+    assert all(matrix.item_ids[best] == matrix.item_ids)
+
+
+def test_ai_recommendations_rank_supplier_switches(client, admin_headers):
+    item = client.post('/api/items', json={'name': 'Steel', 'sku': 'S1', 'co2_per_unit': 4.0},
+                       headers=admin_headers).get_json()
+    dirty = client.post('/api/suppliers', json={'name': 'Dirty'}, headers=admin_headers).get_json()
+    clean = client.post('/api/suppliers', json={'name': 'Clean'}, headers=admin_headers).get_json()
+
+    def order(supplier):
+        client.post('/api/purchase-orders', json={
+            'supplier_id': supplier['id'],
+            'items': [{'item_id': item['id'], 'quantity': 10, 'unit_price': 5.0}]
+        }, headers=admin_headers)
+
+    order(dirty)
+    client.put(f"/api/items/{item['id']}", json={'co2_per_unit': 1.0}, headers=admin_headers)
+    order(clean)
+
+    body = client.get('/api/reports/ai-recommendations', headers=admin_headers).get_json()
+    reco = body['recommendations'][0]
+    assert reco['item_id'] == item['id']
+    assert reco['potential_savings'] == 30.0
+    assert reco['substitutions'][0]['to_supplier'] == 'Clean'
+    assert body['ai_score'] == 60
+
+
+def test_dashboard_counters_follow_every_write_path(app, client, admin_headers, sust_headers):
+    assert client.get('/api/reports/dashboard', headers=sust_headers).get_json() == {
+        'items': 0, 'low_stock_items': 0, 'suppliers': 0, 'open_orders': 0, 'total_co2': 0.0
+    }
+
+    create_orders(client, admin_headers, 3)
+    orders = client.get('/api/purchase-orders', headers=admin_headers).get_json()
+    # Receiving adds stock through the ledger; an import and a stock
+    # movement change stock with Core statements
+    client.put(f"/api/purchase-orders/{orders[0]['id']}", json={'status': 'received'}, headers=admin_headers)
+    client.post('/api/items/import', data='sku,name,stock,reorder_level\nSKU-9,Bolt,0,5\n',
+                content_type='text/csv', headers=admin_headers)
+    client.post('/api/items/1/movements', json={'quantity': 40, 'reason': 'adjustment'}, headers=admin_headers)
+    spare = client.post('/api/suppliers', json={'name': 'Spare'}, headers=admin_headers).get_json()
+    client.delete(f"/api/suppliers/{spare['id']}", headers=admin_headers)
+
+    with count_queries(app) as statements:
+        kpis = client.get('/api/reports/dashboard', headers=admin_headers).get_json()
+    assert len(statements) <= 3
+
+    with app.app_context():
+        assert kpis == rollups.rebuild_kpis()
+    assert kpis['items'] == 7 and kpis['suppliers'] == 3
+    assert kpis['open_orders'] == 2
+    assert kpis['total_co2'] == 3 * 2 * 2 * 1.5
+    assert kpis['low_stock_items'] == 6
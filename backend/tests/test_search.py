@@ -0,0 +1,34 @@
+# backend/tests/test_search.py
+"""Full-text search tests"""
+
+
+def test_search_ranks_prefix_matches_and_follows_writes(client, admin_headers):
+    steel = client.post('/api/items', json={'name': 'Recycled steel beam', 'sku': 'ST-100', 'category': 'metal'},
+                        headers=admin_headers).get_json()
+    client.post('/api/items', json={'name': 'Oak plank', 'sku': 'WD-1', 'category': 'recycled timber'},
+                headers=admin_headers)
+    client.post('/api/suppliers', json={'name': 'Green Metals', 'certifications': 'ISO 14001, recycled'},
+                headers=admin_headers)
+
+    body = client.get('/api/search?q=recy', headers=admin_headers).get_json()
+    # A name match outranks a category match
+    assert [i['sku'] for i in body['items']] == ['ST-100', 'WD-1']
+    assert [s['name'] for s in body['suppliers']] == ['Green Metals']
+
+    assert client.get('/api/search?q=st-10&type=items', headers=admin_headers).get_json()['items'][0]['id'] == steel['id']
+
+    # Triggers keep the index in step with updates, bulk upserts and deletes
+    client.put(f"/api/items/{steel['id']}", json={'name': 'Aluminium beam'}, headers=admin_headers)
+    client.post('/api/items/import', data="sku,name\nWD-1,Birch plank\n",
+                headers={**admin_headers, 'Content-Type': 'text/csv'})
+    assert client.get('/api/search?q=recycled steel&type=items', headers=admin_headers).get_json()['items'] == []
+    assert client.get('/api/search?q=birch&type=items', headers=admin_headers).get_json()['items'][0]['sku'] == 'WD-1'
+
+    client.delete(f"/api/items/{steel['id']}", headers=admin_headers)
+    assert client.get('/api/search?q=alu&type=items', headers=admin_headers).get_json()['items'] == []
+
+
+def test_search_rejects_bad_parameters(client, admin_headers):
+    assert client.get('/api/search?q=%22*', headers=admin_headers).status_code == 400
+    assert client.get('/api/search?q=a&type=orders', headers=admin_headers).status_code == 400
+    assert client.get('/api/search?q=a&limit=0', headers=admin_headers).status_code == 400
@@ -0,0 +1,81 @@
+# backend/tests/test_serializers.py
+"""Row serializers must produce exactly what the models' to_dict() does"""
+
+import json
+from datetime import datetime
+from operator import neg
+
+from sqlalchemy import update
+
+from backend.app import db
+from backend.app.models import User, Item, Supplier, PurchaseOrder, PurchaseOrderItem, InventoryMovement
+from backend.app.serializers import RowSerializer, SERIALIZERS, ORDERS_WITHOUT_ITEMS, iso_datetime
+from backend.benchmarks import datagen
+
+
+def as_json(data):
+    # Compares key order too, so the dicts are built like to_dict() builds them
+    return json.dumps(data)
+
+
+def test_iso_datetime_matches_isoformat():
+    for value in (datetime(2026, 1, 1), datetime(2026, 1, 1, 9, 30, 5, 120), datetime(2025, 12, 31, 23, 59, 59)):
+        assert iso_datetime(value.strftime('%Y-%m-%d %H:%M:%S.%f')) == value.isoformat()
+        assert iso_datetime(value) == value.isoformat()
+    assert iso_datetime('2026-01-01 09:30:00') == '2026-01-01T09:30:00'
+    assert iso_datetime(None) is None
+
+
+def test_serializers_match_to_dict(app):
+    with app.app_context():
+        datagen.generate('tiny')
+        # A supplier without a score, timestamps with and without microseconds
+        db.session.execute(update(Supplier).where(Supplier.id == 1).values(sustainability_score=None))
+        db.session.execute(update(Item).where(Item.id == 1).values(created_at=datetime(2025, 3, 1, 8, 0, 0, 42)))
+        db.session.commit()
+
+        for model in (User, Item, Supplier, InventoryMovement, PurchaseOrderItem):
+            expected = [obj.to_dict() for obj in model.query.order_by(model.id)]
+            assert as_json(SERIALIZERS[model].all(model.query.order_by(model.id))) == as_json(expected), model
+
+        query = PurchaseOrder.query.order_by(PurchaseOrder.id)
+        assert as_json(SERIALIZERS[PurchaseOrder].all(query)) == as_json([o.to_dict() for o in query])
+        assert as_json(ORDERS_WITHOUT_ITEMS.all(query)) == as_json([o.to_dict(include_items=False) for o in query])
+
+
+def test_row_serializer_fields():
+    serializer = RowSerializer([
+        ('extra', None),
+        ('stock', Item.stock),
+        ('shortfall', (neg, 'stock')),
+        ('created_at', Item.created_at),
+    ])
+
+    row = (5, '2026-01-01 09:30:00.000000', 'ignored')
+    assert as_json(serializer(row)) == as_json(
+        {'extra': None, 'stock': 5, 'shortfall': -5, 'created_at': '2026-01-01T09:30:00'}
+    )
+    assert RowSerializer([('stock', Item.stock)])((7,)) == {'stock': 7}
+
+
+def test_list_endpoints_return_to_dict_output(app, client, admin_headers):
+    with app.app_context():
+        datagen.generate('tiny')
+        expected = {
+            '/api/items': [i.to_dict() for i in Item.query.order_by(Item.id)],
+            '/api/suppliers?sort=name&order=desc': [
+                s.to_dict() for s in Supplier.query.order_by(Supplier.name.desc(), Supplier.id.desc())
+            ],
+            '/api/purchase-orders?include=items&status=received': [
+                o.to_dict() for o in PurchaseOrder.query.filter_by(status='received').order_by(PurchaseOrder.id)
+            ],
+        }
+
+    for url, rows in expected.items():
+        assert client.get(url, headers=admin_headers).get_json() == rows, url
+
+    page = client.get('/api/purchase-orders?limit=7&sort=order_date', headers=admin_headers).get_json()
+    with app.app_context():
+        first = PurchaseOrder.query.order_by(PurchaseOrder.order_date, PurchaseOrder.id).limit(7)
+        assert page['data'] == [o.to_dict(include_items=False) for o in first]
+    assert page['next_cursor']
@@ -0,0 +1,13 @@
+# backend/wsgi.py
+"""
+WSGI entry point for production servers (see gunicorn.conf.py)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app
+
+app = create_app(config_name=os.environ.get('FLASK_ENV', 'production'))
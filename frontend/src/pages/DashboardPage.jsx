@@ -8,22 +8,22 @@ const DashboardPage = () => {
   const { user, logout } = useAuth();
   const navigate = useNavigate();
 
-  const [metrics, setMetrics] = useState({ total_emissions: 0 });
+  const [metrics, setMetrics] = useState(null);
 
+  // All KPIs in one request, read from precomputed counters
   useEffect(() => {
-    reportsAPI.getEmissionsByItem()
-      .then(data => {
-        const total = data.reduce((sum, item) => sum + (item.total_co2_from_orders || 0), 0);
-        setMetrics({ total_emissions: total });
-      })
-      .catch(() => setMetrics({ total_emissions: 0 }));
+    reportsAPI.getDashboard()
+      .then(setMetrics)
+      .catch(() => setMetrics(null));
   }, []);
 
   const modules = [
     {
       id: 'items',
       title: 'Inventory',
-      description: 'Manage items',
+      description: metrics
+        ? `${metrics.items} items · ${metrics.low_stock_items} low on stock`
+        : 'Manage items',
       icon: '📦',
       route: '/items',
       roles: ['admin', 'procurement_manager'],
@@ -31,7 +31,7 @@ const DashboardPage = () => {
     {
       id: 'suppliers',
       title: 'Suppliers',
-      description: 'Manage vendors',
+      description: metrics ? `${metrics.suppliers} vendors` : 'Manage vendors',
       icon: '🏭',
       route: '/suppliers',
       roles: ['admin', 'procurement_manager'],
@@ -39,7 +39,7 @@ const DashboardPage = () => {
     {
       id: 'orders',
       title: 'Purchase Orders',
-      description: 'Create and track orders',
+      description: metrics ? `${metrics.open_orders} open orders` : 'Create and track orders',
       icon: '📋',
       route: '/purchase-orders',
       roles: ['admin', 'procurement_manager'],
@@ -47,7 +47,7 @@ const DashboardPage = () => {
     {
       id: 'reports',
       title: 'Reports',
-      description: `${metrics.total_emissions.toFixed(1)} kg CO₂e`,  // ✅ Fixed
+      description: `${(metrics?.total_co2 ?? 0).toFixed(1)} kg CO₂e`,
       icon: '📊',
       route: '/reports',
       roles: ['admin', 'sustainability_manager'],
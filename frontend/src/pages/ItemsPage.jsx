@@ -1,7 +1,7 @@
 // frontend/src/pages/ItemsPage.jsx
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { itemsAPI } from '../services/api';
+import { itemsAPI, searchAPI } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import '../styles/ItemsPage.css';
 import '../styles/Pages.css';
@@ -12,6 +12,7 @@ const ItemsPage = () => {
   const [error, setError] = useState('');
   const [showForm, setShowForm] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
+  const [lowStockOnly, setLowStockOnly] = useState(false);
 
   const navigate = useNavigate();
   const { user } = useAuth();
@@ -26,15 +27,27 @@ const ItemsPage = () => {
     co2_per_unit: 0,
   });
 
+  // Search runs on the server; wait for a pause in typing
   useEffect(() => {
-    loadItems();
-  }, []);
+    const timer = setTimeout(loadItems, searchTerm ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [lowStockOnly, searchTerm]);
 
   const loadItems = async () => {
     setLoading(true);
     setError('');
     try {
-      const data = await itemsAPI.getItems();
+      let data;
+      if (searchTerm.trim()) {
+        data = (await searchAPI.search(searchTerm, { type: 'items', limit: 100 })).items;
+        if (lowStockOnly) {
+          data = data.filter((item) => item.is_active && item.stock <= item.reorder_level);
+        }
+      } else {
+        data = lowStockOnly
+          ? await itemsAPI.getLowStockItems()
+          : await itemsAPI.getItems();
+      }
       setItems(data);
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load items');
@@ -75,10 +88,6 @@ const ItemsPage = () => {
     }
   };
 
-  const filteredItems = items.filter((item) =>
-    item.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    item.category.toLowerCase().includes(searchTerm.toLowerCase())
-  );
 
   return (
     <div className="items-container">
@@ -99,12 +108,21 @@ const ItemsPage = () => {
           <div className="search-box">
             <input
               type="text"
-              placeholder="Search by name or category..."
+              placeholder="Search by name, SKU or category..."
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
             />
           </div>
 
+          <label className="low-stock-toggle">
+            <input
+              type="checkbox"
+              checked={lowStockOnly}
+              onChange={(e) => setLowStockOnly(e.target.checked)}
+            />
+            Low stock only
+          </label>
+
           {(user?.role === 'admin' || user?.role === 'procurement_manager') && (
             <button
               onClick={() => setShowForm(!showForm)}
@@ -222,11 +240,11 @@ const ItemsPage = () => {
         )}
 
         <section className="items-list">
-          <h2>Items ({filteredItems.length})</h2>
+          <h2>Items ({items.length})</h2>
 
           {loading && <p className="loading">Loading items...</p>}
 
-          {filteredItems.length === 0 && !loading && (
+          {items.length === 0 && !loading && (
             <p className="no-data">No items found. Create your first item!</p>
           )}
 
@@ -243,7 +261,7 @@ const ItemsPage = () => {
               </tr>
             </thead>
             <tbody>
-              {filteredItems.map((item) => (
+              {items.map((item) => (
                 <tr key={item.id}>
                   <td>{item.name}</td>
                   <td>{item.sku}</td>
@@ -251,7 +269,7 @@ const ItemsPage = () => {
                   <td>
                     <span
                       className={
-                        item.stock < item.reorder_level ? 'low-stock' : ''
+                        item.stock <= item.reorder_level ? 'low-stock' : ''
                       }
                     >
                       {item.stock} {item.unit}
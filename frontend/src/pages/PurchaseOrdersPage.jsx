@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { itemsAPI, suppliersAPI, ordersAPI } from '../services/api';
+import { ordersAPI, batchAPI } from '../services/api';
 import '../styles/PurchaseOrdersPage.css';
 import '../styles/Pages.css';
 import { useNavigate } from 'react-router-dom';
@@ -22,14 +22,15 @@ const PurchaseOrdersPage = () => {
   const loadData = async () => {
     try {
       setLoading(true);
-      const [ordersData, suppliersData, itemsData] = await Promise.all([
-        ordersAPI.getPurchaseOrders(),
-        suppliersAPI.getSuppliers(),
-        itemsAPI.getItems(),
-      ]);
-      setOrders(ordersData);
-      setSuppliers(suppliersData);
-      setItems(itemsData);
+      // One round trip for the list and the form's dropdowns
+      const data = await batchAPI.getAll({
+        orders: '/purchase-orders',
+        suppliers: '/suppliers',
+        items: '/items',
+      });
+      setOrders(data.orders);
+      setSuppliers(data.suppliers);
+      setItems(data.items);
       setError('');
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load data');
@@ -7,14 +7,56 @@ const API = axios.create({
   },
 });
 
+// Last ETag and body per GET url, so unchanged collections come back as 304
+const etagCache = new Map();
+
+const cacheKey = (config) => `${config.url}?${new URLSearchParams(config.params || {}).toString()}`;
+
 API.interceptors.request.use((config) => {
   const token = localStorage.getItem('access_token');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  if (config.method === 'get') {
+    const cached = etagCache.get(cacheKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
+    config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+  }
   return config;
 });
 
+API.interceptors.response.use((response) => {
+  if (response.config.method !== 'get') {
+    return response;
+  }
+  const key = cacheKey(response.config);
+  if (response.status === 304) {
+    response.data = etagCache.get(key)?.data;
+  } else if (response.headers.etag) {
+    etagCache.set(key, { etag: response.headers.etag, data: response.data });
+  }
+  return response;
+});
+
+// Paged list helpers: params = { limit, cursor, sort, order, fields, ...filters }
+// Responses look like { data: [...], next_cursor, limit }.
+const getPage = (url, params = {}) =>
+  API.get(url, { params: { limit: 50, ...params } }).then(r => r.data);
+
+// Walk every page of a list endpoint and return the rows as one array.
+const getAllPages = async (url, params = {}) => {
+  const rows = [];
+  let cursor;
+  do {
+    const page = await getPage(url, { ...params, ...(cursor ? { cursor } : {}) });
+    rows.push(...page.data);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return rows;
+};
+
 export const authAPI = {
   initUsers: async () => {
     const response = await API.post('/auth/init-users');
@@ -33,6 +75,7 @@ export const authAPI = {
     return response.data;
   },
   logout: () => {
+    etagCache.clear();
     localStorage.removeItem('access_token');
     localStorage.removeItem('user_role');
   },
@@ -43,6 +86,9 @@ export const authAPI = {
 
 export const itemsAPI = {
   getItems: async () => API.get('/items').then(r => r.data),
+  getItemsPage: async (params) => getPage('/items', params),
+  getAllItems: async (params) => getAllPages('/items', params),
+  getLowStockItems: async (params) => getAllPages('/items/low-stock', params),
   getItem: async (id) => API.get(`/items/${id}`).then(r => r.data),
   createItem: async (itemData) => API.post('/items', itemData).then(r => r.data),
   updateItem: async (id, itemData) => API.put(`/items/${id}`, itemData).then(r => r.data),
@@ -51,6 +97,8 @@ export const itemsAPI = {
 
 export const suppliersAPI = {
   getSuppliers: async () => API.get('/suppliers').then(r => r.data),
+  getSuppliersPage: async (params) => getPage('/suppliers', params),
+  getAllSuppliers: async (params) => getAllPages('/suppliers', params),
   createSupplier: async (data) => API.post('/suppliers', data).then(r => r.data),
   updateSupplier: async (id, data) => API.put(`/suppliers/${id}`, data).then(r => r.data),
   deleteSupplier: async (id) => API.delete(`/suppliers/${id}`).then(r => r.data),
@@ -58,14 +106,60 @@ export const suppliersAPI = {
 
 export const ordersAPI = {
   getPurchaseOrders: async () => API.get('/purchase-orders').then(r => r.data),
+  getPurchaseOrdersPage: async (params) => getPage('/purchase-orders', params),
+  getAllPurchaseOrders: async (params) => getAllPages('/purchase-orders', params),
   createPurchaseOrder: async (data) => API.post('/purchase-orders', data).then(r => r.data),
   updatePurchaseOrder: async (id, data) => API.put(`/purchase-orders/${id}`, data).then(r => r.data),
+  getReorderSuggestions: async (params) => API.get('/purchase-orders/reorder-suggestions', { params }).then(r => r.data),
+  draftReorders: async (data = {}) => API.post('/purchase-orders/reorder', data).then(r => r.data),
 };
 
 export const reportsAPI = {
   getEmissionsByItem: async () => API.get('/reports/emissions-by-item').then(r => r.data),
   getEmissionsBySupplier: async () => API.get('/reports/emissions-by-supplier').then(r => r.data),
   getAIRecommendations: async () => API.get('/reports/ai-recommendations').then(r => r.data),  // ✅ AI
+  rebuild: async () => API.post('/reports/rebuild').then(r => r.data),
+  // { items, low_stock_items, suppliers, open_orders, total_co2 }
+  getDashboard: async () => API.get('/reports/dashboard').then(r => r.data),
+};
+
+export const searchAPI = {
+  search: async (q, params = {}) => API.get('/search', { params: { q, ...params } }).then(r => r.data),
+};
+
+export const jobsAPI = {
+  getJob: async (id) => API.get(`/jobs/${id}`).then(r => r.data),
+  cancelJob: async (id) => API.post(`/jobs/${id}/cancel`).then(r => r.data),
+  // Poll a 202 job until it finishes; resolves with the final job
+  waitFor: async (job, { interval = 1000, onProgress } = {}) => {
+    while (!['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+      await new Promise(resolve => setTimeout(resolve, interval));
+      job = await jobsAPI.getJob(job.id);
+      if (onProgress) onProgress(job);
+    }
+    return job;
+  },
+};
+
+// Several API calls in one round trip (POST /api/batch). Urls are relative
+// to /api like every other call here; consecutive GETs run concurrently.
+export const batchAPI = {
+  // requests: [{ id, method = 'GET', url, body, headers }]
+  // -> [{ id, status, headers, body }] in the same order
+  run: async (requests) => API.post('/batch', {
+    requests: requests.map(({ url, ...rest }) => ({ method: 'GET', ...rest, url: `/api${url}` })),
+  }).then(r => r.data.responses),
+  // { key: url, ... } -> { key: body, ... }; rejects like axios if any GET failed
+  getAll: async (urls) => {
+    const responses = await batchAPI.run(Object.entries(urls).map(([id, url]) => ({ id, url })));
+    const failed = responses.find(r => r.status >= 400);
+    if (failed) {
+      const error = new Error(`Request failed with status code ${failed.status}`);
+      error.response = { status: failed.status, data: failed.body };
+      throw error;
+    }
+    return Object.fromEntries(responses.map(r => [r.id, r.body]));
+  },
 };
 
 export default API;